@@ -1,26 +1,114 @@
-import json
+import asyncio
+import atexit
+import hashlib
 import os
-import re
 import time
 import uuid
-from typing import List, Dict, Any, Optional, Tuple
-from rich.console import Console
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
 from rich.markdown import Markdown
 from rich.panel import Panel
 
 from .llm import OllamaClient
+from .llm.async_client import run_sync
 from .tools import (
     ReadTool, WriteTool, EditTool, GlobTool, GrepTool,
     BashTool, GitTool, TodoTool, ToolResult, ToolStatus
 )
 from .permissions import PermissionManager, PermissionMode
 from .context import FlacoContextLoader
-from .agents import AgentRouter, SpecializedAgent
+from .context.window import COMPACTED_PREFIX, count_tokens, count_message_tokens, truncate_messages, truncate_text
+from .agents import AgentRouter, AgentType, SpecializedAgent
 from .agents.custom_agents import CustomAgentManager
 from .intelligence import AgentSwarm, SwarmTask
 from .analytics import ContributionTracker
 from .analytics.contributions import ActivityType
 from .storage import LocalStorageManager
+from .utils import fastjson
+from .ui import CONSOLE
+
+# Icon and color per tool status, plus the header printed for each result
+_STATUS_STYLE = {
+    ToolStatus.SUCCESS: ("✅", "green"),
+    ToolStatus.ERROR: ("❌", "red"),
+}
+_DEFAULT_STATUS_STYLE = ("⚠️", "yellow")
+_RESULT_HEADER = "\n{icon} [{color}]{tool}[/{color}]"
+
+# Tool result panels, one per border color, reused across tool calls
+_RESULT_PANELS: Dict[str, Panel] = {}
+
+# Tool results at least this large are stored once and referenced by hash
+BLOB_MIN_SIZE = 256
+
+# History budget floor, so an oversized system prompt can't disable truncation
+MIN_HISTORY_TOKENS = 256
+
+
+class _JsonObjectScanner:
+    """Incrementally find top-level balanced {...} substrings in streamed text
+
+    Tracks brace depth plus string/escape state so braces inside JSON strings
+    don't confuse the matcher (unlike a backtracking regex). State carries over
+    between feed() calls, so objects split across chunks are still found.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.depth = 0
+        self.start = -1
+        self.in_string = False
+        self.escape = False
+
+    def feed(self, chunk: str) -> List[str]:
+        """Scan a new chunk and return the objects it completed"""
+        offset = len(self.text)
+        self.text += chunk
+        text = self.text
+        depth, start, in_string, escape = self.depth, self.start, self.in_string, self.escape
+        found = []
+
+        for i, char in enumerate(chunk, offset):
+            if in_string:
+                if escape:
+                    escape = False
+                elif char == "\\":
+                    escape = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                # Quotes only matter inside a candidate object
+                if depth > 0:
+                    in_string = True
+            elif char == "{":
+                if depth == 0:
+                    start = i
+                depth += 1
+            elif char == "}" and depth > 0:
+                depth -= 1
+                if depth == 0:
+                    found.append(text[start:i + 1])
+
+        self.depth, self.start, self.in_string, self.escape = depth, start, in_string, escape
+        return found
+
+
+def _iter_json_candidates(text: str) -> Iterator[str]:
+    """Yield top-level balanced {...} substrings from text in a single pass"""
+    yield from _JsonObjectScanner().feed(text)
+
+
+def _parse_tool_call(json_str: str) -> Optional[Dict[str, Any]]:
+    """Parse a {"name": ..., "arguments": ...} candidate, or None if it isn't one"""
+    # Cheap substring check before paying for a full parse
+    if '"name"' not in json_str:
+        return None
+    try:
+        obj = fastjson.loads(json_str)
+    except ValueError:
+        return None
+    if isinstance(obj, dict) and "name" in obj and "arguments" in obj:
+        return obj
+    return None
 
 
 class FlacoAgent:
@@ -33,7 +121,7 @@ class FlacoAgent:
         permission_mode: PermissionMode = PermissionMode.INTERACTIVE,
         session_id: Optional[str] = None
     ):
-        self.console = Console()
+        self.console = CONSOLE
         self.llm = OllamaClient(base_url=ollama_url, model=model)
         self.permission_manager = PermissionManager(mode=permission_mode)
         self.context_loader = FlacoContextLoader()
@@ -43,6 +131,11 @@ class FlacoAgent:
         self.custom_agent_manager = CustomAgentManager()
         self.current_agent: Optional[SpecializedAgent] = None
         self.current_swarm: Optional[SwarmTask] = None
+        self.swarm_notes = ""
+        # Opt-in: consulting adds a round of LLM requests before the main call
+        self.swarm_consult = os.getenv("FLACO_SWARM_CONSULT", "false").lower() == "true"
+        # Called with each chunk of streamed response text (e.g. for a live preview)
+        self.on_stream: Optional[Callable[[str], None]] = None
 
         # Initialize tools
         self.tools = {
@@ -55,6 +148,8 @@ class FlacoAgent:
             "Git": GitTool(),
             "TodoWrite": TodoTool(),
         }
+        # Tool schemas are static, so build them once instead of per LLM call
+        self._tool_schemas = [tool.get_schema() for tool in self.tools.values()]
 
         # Local storage integration
         self.storage = LocalStorageManager()
@@ -63,7 +158,25 @@ class FlacoAgent:
         # Conversation history
         self.messages: List[Dict[str, Any]] = []
         self.context_limit = int(os.getenv("FLACO_CONTEXT_LIMIT", "120"))
+        # Earliest messages (initial goal + plan) always kept in context
+        self.sink_size = 4
+        # Token budgets (prompt window and per stored tool result)
+        self.max_context_tokens = int(os.getenv("FLACO_CONTEXT_TOKENS", "8192"))
+        self.max_tool_result_tokens = int(os.getenv("FLACO_TOOL_RESULT_TOKENS", "4000"))
+        # Older turns are summarized once history passes this share of the budget
+        self.compact_threshold = 0.8
+        self.compact_keep_recent = 10
         self.base_system_prompt = self._build_base_system_prompt()
+        # Keyed by (name, prompt addition) so an edited custom agent gets a new entry
+        self._agent_prompt_cache: Dict[Tuple[str, str], str] = {}
+
+        # Saves are coalesced: _save_conversation marks dirty, _flush_conversation writes
+        self._dirty = False
+        # Number of messages already on disk (None after history was rewritten)
+        self._persisted_count: Optional[int] = 0
+        # Large tool results by content hash; tool messages hold a content_ref
+        self._blob_store: Dict[str, str] = {}
+        self._pending_blobs: Dict[str, str] = {}
 
         # Load previous conversation if exists
         self._load_conversation()
@@ -162,11 +275,13 @@ Always:
         return base_prompt
 
     def _build_system_prompt(self, agent: SpecializedAgent) -> str:
-        """Build the full system prompt with agent specialization"""
-        full_prompt = self.base_system_prompt
-
-        # Add specialized agent prompt
-        full_prompt += agent.get_system_prompt_addition()
+        """Build the full system prompt with agent specialization (cached per agent)"""
+        key = (agent.name, agent.system_prompt_addition)
+        full_prompt = self._agent_prompt_cache.get(key)
+        if full_prompt is None:
+            # Add specialized agent prompt
+            full_prompt = self.base_system_prompt + agent.system_prompt_addition
+            self._agent_prompt_cache[key] = full_prompt
 
         return full_prompt
 
@@ -174,35 +289,35 @@ Always:
         """Extract JSON tool calls from text response (fallback for models without native function calling)"""
         tool_calls = []
 
-        # Pattern to match JSON objects that look like tool calls
         # Matches: {"name": "ToolName", "arguments": {...}}
-        pattern = r'\{[^{}]*"name"\s*:\s*"([^"]+)"[^{}]*"arguments"\s*:\s*\{[^}]*\}[^}]*\}'
-
-        # Find all potential JSON objects in the text
-        json_objects = re.findall(r'\{(?:[^{}]|\{[^{}]*\})*\}', text)
-
-        for json_str in json_objects:
-            try:
-                obj = json.loads(json_str)
-                # Check if this looks like a tool call
-                if "name" in obj and "arguments" in obj:
-                    # Convert to Ollama tool call format
-                    tool_call = {
-                        "id": f"call_{len(tool_calls)}",
-                        "function": {
-                            "name": obj["name"],
-                            "arguments": json.dumps(obj["arguments"]) if isinstance(obj["arguments"], dict) else obj["arguments"]
-                        }
+        for json_str in _iter_json_candidates(text):
+            obj = _parse_tool_call(json_str)
+            if obj is not None:
+                # Convert to Ollama tool call format (arguments stay parsed)
+                tool_call = {
+                    "id": f"call_{len(tool_calls)}",
+                    "function": {
+                        "name": obj["name"],
+                        "arguments": obj["arguments"]
                     }
-                    tool_calls.append(tool_call)
-            except json.JSONDecodeError:
-                continue
+                }
+                tool_calls.append(tool_call)
 
         return tool_calls
 
     def chat(self, user_message: str) -> Tuple[str, Dict[str, Any]]:
         """Process a user message and return the response with metrics"""
+        try:
+            return self._run_chat(user_message)
+        finally:
+            # One write per user turn instead of one per message/tool call
+            self._flush_conversation()
+            self.activity_tracker.flush()
+
+    def _run_chat(self, user_message: str) -> Tuple[str, Dict[str, Any]]:
+        """Run the LLM/tool loop for a single user message"""
         start_time = time.time()
+        self.swarm_notes = ""
 
         # Check if a custom agent is selected (takes precedence over routing)
         custom_agent = self.custom_agent_manager.get_current_agent()
@@ -210,10 +325,12 @@ Always:
             # Create a SpecializedAgent wrapper for the custom agent
             self.current_agent = SpecializedAgent(
                 name=custom_agent.name,
+                agent_type=AgentType.GENERAL,
                 emoji=custom_agent.emoji,
-                specialization=custom_agent.description,
-                keywords=[],  # Custom agents don't need keyword routing
-                priority=10  # High priority
+                expertise=custom_agent.description,
+                personality=custom_agent.description,
+                thinking_messages=[f"{custom_agent.name} is thinking"],
+                system_prompt_addition=f"\n# {custom_agent.name}\n\n{custom_agent.description}\n"
             )
         else:
             # Check if this requires agent swarm collaboration
@@ -223,6 +340,8 @@ Always:
             if self.current_swarm:
                 # Use primary agent from swarm
                 self.current_agent = self.agent_router.get_agent(self.current_swarm.primary_agent)
+                if self.swarm_consult:
+                    self.swarm_notes = self._consult_swarm(user_message)
             else:
                 self.current_agent = self.agent_router.route(user_message)
 
@@ -242,6 +361,10 @@ Always:
         while iteration < max_iterations:
             iteration += 1
 
+            # Summarize old turns before the history outgrows the window
+            if self._compact_if_needed():
+                llm_calls += 1
+
             # Get LLM response with tools
             response = self._call_llm()
             llm_calls += 1
@@ -287,7 +410,7 @@ Always:
                         "llm_calls": llm_calls,
                         "iterations": iteration,
                         "swarm": self.current_swarm is not None,
-                        "swarm_task": self.current_swarm.__dict__ if self.current_swarm else None
+                        "swarm_task": self.current_swarm.summary if self.current_swarm else None
                     }
 
                     # Log activity
@@ -313,47 +436,233 @@ Always:
             "llm_calls": llm_calls,
             "iterations": iteration,
             "swarm": self.current_swarm is not None,
-            "swarm_task": self.current_swarm.__dict__ if self.current_swarm else None
+            "swarm_task": self.current_swarm.summary if self.current_swarm else None
         }
 
         return "Maximum iteration limit reached. Please try breaking down your request.", metrics
 
+    def _consult_swarm(self, user_message: str) -> str:
+        """Ask the swarm's supporting agents for notes concurrently and merge them"""
+        supporting_agents = [
+            self.agent_router.get_agent(agent_type)
+            for agent_type in self.current_swarm.required_agents
+            if agent_type != self.current_swarm.primary_agent
+        ]
+        if not supporting_agents:
+            return ""
+
+        async def consult_all():
+            return await asyncio.gather(*[
+                self.llm.achat(
+                    messages=[
+                        {"role": "system", "content": self._build_system_prompt(agent)},
+                        {"role": "user", "content": (
+                            f"{user_message}\n\n"
+                            "Share brief notes (at most 5 bullets) from your specialty "
+                            "for the lead agent handling this task. Do not call tools."
+                        )}
+                    ],
+                    temperature=0.3
+                )
+                for agent in supporting_agents
+            ], return_exceptions=True)
+
+        try:
+            responses = run_sync(consult_all())
+        except Exception:
+            return ""
+
+        notes = []
+        for agent, response in zip(supporting_agents, responses):
+            if isinstance(response, Exception):
+                continue
+            content = response.get("message", {}).get("content", "").strip()
+            if content:
+                notes.append(f"## {agent.emoji} {agent.name}\n{content}")
+
+        if not notes:
+            return ""
+        return "\n# Swarm Notes\n\nSupporting agents shared these notes:\n\n" + "\n\n".join(notes) + "\n"
+
     def _call_llm(self) -> Dict[str, Any]:
         """Call the LLM with current messages and tool schemas"""
 
         # Prepare messages with specialized agent's system prompt
         agent_prompt = self._build_system_prompt(self.current_agent) if self.current_agent else self.base_system_prompt
-        context_messages = self.messages[-self.context_limit:] if self.context_limit > 0 else self.messages
+        if self.swarm_notes:
+            agent_prompt += self.swarm_notes
+        context_messages = self._select_context_messages()
 
         # Filter out tool-related messages when tools are disabled
         # This prevents 400 errors from Ollama when tool messages exist in history
-        cleaned_messages = []
-        for msg in context_messages:
-            # Skip messages with tool role or tool_calls field
-            if msg.get("role") == "tool" or "tool_calls" in msg:
-                continue
-            cleaned_messages.append(msg)
+        cleaned_messages = [
+            msg for msg in context_messages
+            if msg.get("role") != "tool" and "tool_calls" not in msg
+        ]
+
+        # Enforce the token budget, leaving room for the system prompt
+        if self.max_context_tokens > 0:
+            cleaned_messages = truncate_messages(
+                cleaned_messages,
+                max(self.max_context_tokens - count_tokens(agent_prompt), MIN_HISTORY_TOKENS)
+            )
 
         messages = [{"role": "system", "content": agent_prompt}] + cleaned_messages
 
-        # Get tool schemas
-        tool_schemas = [tool.get_schema() for tool in self.tools.values()]
-
         # Call Ollama with tools (will use native function calling if model supports it)
-        response = self.llm.chat(
+        return self._stream_llm(messages)
+
+    def _stream_llm(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Stream a chat response, echoing text through on_stream as it arrives
+
+        Returns the same shape as a non-streaming response. The stream is read
+        to the end so every tool call (native or written as text) is kept, and
+        token counts are estimated locally if Ollama doesn't report them.
+        """
+        chunks = self.llm.chat(
             messages=messages,
-            tools=tool_schemas,
+            tools=self._tool_schemas,
+            stream=True,
             temperature=0.7
         )
 
+        content_parts = []
+        tool_calls = []
+        final: Dict[str, Any] = {}
+
+        try:
+            for chunk in chunks:
+                if "error" in chunk:
+                    raise Exception(f"Ollama API error: {chunk['error']}")
+
+                message = chunk.get("message", {})
+                if message.get("tool_calls"):
+                    tool_calls.extend(message["tool_calls"])
+
+                text = message.get("content") or ""
+                if text:
+                    content_parts.append(text)
+                    if self.on_stream:
+                        self.on_stream(text)
+
+                if chunk.get("done"):
+                    final = chunk
+                    break
+        finally:
+            chunks.close()
+
+        content = "".join(content_parts)
+        response = {k: v for k, v in final.items() if k != "message"}
+        response["message"] = {"role": "assistant", "content": content}
+        if tool_calls:
+            response["message"]["tool_calls"] = tool_calls
+
+        # Keep the usage metrics meaningful when the server omits the counts
+        if "eval_count" not in response:
+            generated = content + (fastjson.dumps(tool_calls) if tool_calls else "")
+            response["eval_count"] = count_tokens(generated)
+        if "prompt_eval_count" not in response:
+            response["prompt_eval_count"] = sum(count_message_tokens(m) for m in messages)
         return response
 
+    def _history_tokens(self) -> int:
+        """Tokens in the part of the history that is sent to the LLM"""
+        return sum(
+            count_message_tokens(m, self._blob_store) for m in self.messages
+            if m.get("role") != "tool" and "tool_calls" not in m
+        )
+
+    def _compact_if_needed(self) -> bool:
+        """Replace the oldest turns with a compacted memory message if history is too large"""
+        if self.max_context_tokens <= 0:
+            return False
+        if self._history_tokens() <= self.compact_threshold * self.max_context_tokens:
+            return False
+
+        # Keep the most recent turns verbatim, starting at a user message
+        end = len(self.messages) - self.compact_keep_recent
+        while 0 < end < len(self.messages) and self.messages[end].get("role") != "user":
+            end += 1
+        if end >= len(self.messages):
+            return False
+
+        n_messages = end - self.sink_size
+        if n_messages < 2:
+            return False
+
+        summary = self._compact_oldest(n_messages)
+        if not summary:
+            return False
+
+        self.messages[self.sink_size:end] = [summary]
+        self._persisted_count = None
+        self._save_conversation()
+        return True
+
+    def _compact_oldest(self, n_messages: int) -> Optional[Dict[str, Any]]:
+        """Summarize n_messages after the sink into a single compacted memory message"""
+        chunk = self.messages[self.sink_size:self.sink_size + n_messages]
+
+        transcript = []
+        for msg in chunk:
+            if "tool_calls" in msg:
+                names = ", ".join(tc["function"]["name"] for tc in msg["tool_calls"])
+                transcript.append(f"assistant called tools: {names}")
+            else:
+                content = self.message_content(msg)
+                if content:
+                    transcript.append(f"{msg.get('role', 'unknown')}: {truncate_text(str(content), 300)}")
+
+        try:
+            response = self.llm.chat(
+                messages=[
+                    {"role": "system", "content": (
+                        "Summarize the prior conversation turns below in at most 200 tokens. "
+                        "Preserve decisions, file paths, and open tasks. Output only the summary."
+                    )},
+                    {"role": "user", "content": "\n\n".join(transcript)}
+                ],
+                temperature=0,
+                max_tokens=256
+            )
+            summary = response["message"]["content"].strip()
+        except Exception:
+            return None
+
+        if not summary:
+            return None
+
+        return {
+            "role": "system",
+            "content": COMPACTED_PREFIX + summary
+        }
+
+    def _select_context_messages(self) -> List[Dict[str, Any]]:
+        """Keep the first sink_size messages plus a window of the most recent ones"""
+        if self.context_limit <= 0 or len(self.messages) <= self.context_limit:
+            return self.messages
+
+        sink_size = min(self.sink_size, self.context_limit // 2)
+        recent_start = len(self.messages) - (self.context_limit - sink_size)
+
+        # Start the recent window at a user turn so assistant/tool pairs aren't split
+        start = recent_start
+        while start < len(self.messages) and self.messages[start].get("role") != "user":
+            start += 1
+        if start < len(self.messages):
+            recent_start = start
+
+        return self.messages[:sink_size] + self.messages[recent_start:]
+
     def _handle_tool_calls(self, tool_calls: List[Dict[str, Any]]):
         """Execute tool calls and add results to conversation"""
 
         for tool_call in tool_calls:
             function_name = tool_call["function"]["name"]
-            arguments = json.loads(tool_call["function"]["arguments"])
+            # Ollama returns arguments as a dict; OpenAI-style calls send a JSON string
+            arguments = tool_call["function"]["arguments"]
+            if isinstance(arguments, str):
+                arguments = fastjson.loads(arguments) if arguments else {}
 
             # Execute the tool
             result = self._execute_tool(function_name, arguments)
@@ -364,14 +673,39 @@ Always:
                 "tool_calls": [tool_call]
             })
 
-            self.messages.append({
+            # Cap what goes into history; the full output was already displayed
+            result_dict = result.to_dict()
+            result_dict["output"] = truncate_text(result_dict["output"], self.max_tool_result_tokens)
+            content = fastjson.dumps(result_dict)
+
+            tool_message = {
                 "role": "tool",
-                "content": json.dumps(result.to_dict()),
+                "content": content,
                 "tool_call_id": tool_call.get("id", "")
-            })
+            }
+            # Repeated Read/Grep output is kept (and saved) only once
+            content_bytes = content.encode("utf-8")
+            if len(content_bytes) >= BLOB_MIN_SIZE:
+                tool_message["content"] = ""
+                tool_message["content_ref"] = self._store_blob(content, content_bytes)
+            self.messages.append(tool_message)
             # Save after tool results
             self._save_conversation()
 
+    def _store_blob(self, content: str, content_bytes: bytes) -> str:
+        """Store content once under its hash and return the hash"""
+        key = hashlib.blake2b(content_bytes, digest_size=16).hexdigest()
+        if key not in self._blob_store:
+            self._blob_store[key] = content
+            self._pending_blobs[key] = content
+        return key
+
+    def message_content(self, message: Dict[str, Any]) -> str:
+        """Return a message's content, resolving stored tool results"""
+        if "content_ref" in message:
+            return self._blob_store.get(message["content_ref"], "")
+        return message.get("content") or ""
+
     def _execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
         """Execute a tool with permission checking"""
 
@@ -425,24 +759,24 @@ Always:
 
     def _display_tool_result(self, tool_name: str, result: ToolResult):
         """Display tool execution result to user"""
-        if result.status == ToolStatus.SUCCESS:
-            icon = "✅"
-            color = "green"
-        elif result.status == ToolStatus.ERROR:
-            icon = "❌"
-            color = "red"
-        else:
-            icon = "⚠️"
-            color = "yellow"
-
-        self.console.print(f"\n{icon} [{color}]{tool_name}[/{color}]")
+        icon, color = _STATUS_STYLE.get(result.status, _DEFAULT_STATUS_STYLE)
+        self.console.print(_RESULT_HEADER.format(icon=icon, color=color, tool=tool_name))
 
         if result.output:
             # Truncate very long outputs for display
             display_output = result.output
             if len(display_output) > 1000:
                 display_output = display_output[:1000] + "\n... [truncated]"
-            self.console.print(Panel(display_output, border_style=color))
+            if self.console.is_terminal:
+                # Reuse one panel per color instead of building a new one per tool call
+                panel = _RESULT_PANELS.get(color)
+                if panel is None:
+                    panel = _RESULT_PANELS[color] = Panel("", border_style=color)
+                panel.renderable = display_output
+                self.console.print(panel)
+            else:
+                # Piped output: skip the box drawing
+                self.console.print(display_output, markup=False, highlight=False)
 
         if result.error:
             self.console.print(f"[red]Error: {result.error}[/red]")
@@ -470,6 +804,11 @@ Always:
         """Clear conversation history"""
         self.messages = []
         # Clear from local storage
+        self._dirty = False
+        atexit.unregister(self._flush_conversation)
+        self._persisted_count = 0
+        self._blob_store = {}
+        self._pending_blobs = {}
         if self.storage.connected:
             self.storage.clear_conversation(self.session_id)
 
@@ -507,9 +846,39 @@ Always:
             messages = self.storage.load_conversation(self.session_id)
             if messages:
                 self.messages = messages
+                self._persisted_count = len(messages)
+                self._blob_store = self.storage.load_blobs(self.session_id)
                 self.console.print(f"[dim]💾 Loaded {len(messages)} messages from previous session[/dim]")
 
     def _save_conversation(self):
-        """Save conversation history to local storage"""
+        """Mark conversation history as changed; written by _flush_conversation"""
+        if not self._dirty:
+            # Only agents with unwritten history are kept alive until exit
+            atexit.register(self._flush_conversation)
+        self._dirty = True
+
+    def _flush_conversation(self):
+        """Save conversation history to local storage if it changed
+
+        New messages are appended to the session file; it is only rewritten
+        when earlier history changed (compaction).
+        """
+        if not self._dirty:
+            return
         if self.storage.connected:
-            self.storage.save_conversation(self.session_id, self.messages)
+            # Blobs first, so saved messages never reference a missing blob
+            if self._pending_blobs:
+                if not self.storage.append_blobs(self.session_id, self._pending_blobs):
+                    return
+                self._pending_blobs = {}
+            persisted = self._persisted_count
+            if persisted is None or persisted > len(self.messages):
+                saved = self.storage.save_conversation(self.session_id, self.messages)
+            else:
+                saved = self.storage.append_messages(self.session_id, self.messages[persisted:])
+            if not saved:
+                # Still registered, so exit retries the write
+                return
+            self._persisted_count = len(self.messages)
+        self._dirty = False
+        atexit.unregister(self._flush_conversation)
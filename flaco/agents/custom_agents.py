@@ -3,19 +3,23 @@ Custom AI Agents Management for Flaco CLI
 Matches the desktop app's custom agent functionality
 """
 
-import json
+import os
 import uuid
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Optional
-from rich.console import Console
 from rich.table import Table
 from rich.prompt import Prompt, Confirm
 
+from ..ui import CONSOLE
+from ..utils import fastjson
+
 
 class CustomAgent:
     """Represents a custom AI agent"""
 
+    __slots__ = ("id", "emoji", "name", "description", "created_at", "is_default", "_cached_dict")
+
     def __init__(self, id: str, emoji: str, name: str, description: str,
                  created_at: str = None, is_default: bool = False):
         self.id = id
@@ -24,16 +28,24 @@ class CustomAgent:
         self.description = description
         self.created_at = created_at or datetime.now().isoformat()
         self.is_default = is_default
+        self._cached_dict: Optional[Dict] = None
 
     def to_dict(self) -> Dict:
-        return {
-            "id": self.id,
-            "emoji": self.emoji,
-            "name": self.name,
-            "description": self.description,
-            "created_at": self.created_at,
-            "is_default": self.is_default
-        }
+        """Serialized form, cached until invalidate() is called after an edit"""
+        if self._cached_dict is None:
+            self._cached_dict = {
+                "id": self.id,
+                "emoji": self.emoji,
+                "name": self.name,
+                "description": self.description,
+                "created_at": self.created_at,
+                "is_default": self.is_default
+            }
+        return self._cached_dict
+
+    def invalidate(self):
+        """Drop the cached to_dict() result after changing a field"""
+        self._cached_dict = None
 
     @classmethod
     def from_dict(cls, data: Dict) -> 'CustomAgent':
@@ -54,7 +66,9 @@ class CustomAgentManager:
         self.storage_dir = Path(storage_dir).expanduser()
         self.storage_dir.mkdir(parents=True, exist_ok=True)
         self.agents_file = self.storage_dir / "agents.json"
-        self.console = Console()
+        self.console = CONSOLE
+        # (inode, mtime, size) of agents.json when last loaded or saved
+        self._file_signature = None
 
         # Default agents (match desktop defaults)
         self.default_agents = [
@@ -84,49 +98,66 @@ class CustomAgentManager:
         # Load or initialize
         self._load_agents()
 
+    def _signature(self):
+        """Identify the current agents.json contents without reading it"""
+        stat = self.agents_file.stat()
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
     def _load_agents(self):
-        """Load agents from storage"""
-        if self.agents_file.exists():
-            with open(self.agents_file, 'r') as f:
-                data = json.load(f)
-                self.custom_agents = [CustomAgent.from_dict(a) for a in data.get("custom_agents", [])]
-                self.current_agent_id = data.get("current_agent_id")
-        else:
+        """Load agents from storage (skipped if the file is unchanged since last load)"""
+        try:
+            signature = self._signature()
+        except FileNotFoundError:
             self.custom_agents = []
             self.current_agent_id = None
+            self._reindex()
             self._save_agents()
+            return
+
+        if signature == self._file_signature:
+            return
+
+        data = fastjson.loads(self.agents_file.read_bytes())
+        self.custom_agents = [CustomAgent.from_dict(a) for a in data.get("custom_agents", [])]
+        self.current_agent_id = data.get("current_agent_id")
+        self._file_signature = signature
+        self._reindex()
+
+    def _reindex(self):
+        """Rebuild the combined agent list and lookup indexes after agents change"""
+        self._all_agents = self.default_agents + self.custom_agents
+        self._by_id: Dict[str, CustomAgent] = {}
+        self._by_name_lower: Dict[str, CustomAgent] = {}
+        for agent in self._all_agents:
+            # First match wins, as with the previous linear scans
+            self._by_id.setdefault(agent.id, agent)
+            self._by_name_lower.setdefault(agent.name.lower(), agent)
 
     def _save_agents(self):
-        """Save agents to storage"""
+        """Save agents to storage (atomically, so readers never see a partial file)"""
         data = {
             "custom_agents": [a.to_dict() for a in self.custom_agents],
             "current_agent_id": self.current_agent_id
         }
-        with open(self.agents_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        tmp_file = self.agents_file.with_suffix(".tmp")
+        tmp_file.write_bytes(fastjson.dumps_bytes(data, pretty=True))
+        os.replace(tmp_file, self.agents_file)
+        self._file_signature = self._signature()
 
     def get_all_agents(self) -> List[CustomAgent]:
         """Get all agents (default + custom)"""
-        return self.default_agents + self.custom_agents
+        # Pick up changes saved by another manager (e.g. /agent use)
+        self._load_agents()
+        return self._all_agents
 
     def get_agent(self, agent_id: str) -> Optional[CustomAgent]:
-        """Get agent by ID or name"""
-        all_agents = self.get_all_agents()
-
-        # Try exact ID match
-        for agent in all_agents:
-            if agent.id == agent_id:
-                return agent
-
-        # Try name match (case-insensitive)
-        for agent in all_agents:
-            if agent.name.lower() == agent_id.lower():
-                return agent
-
-        return None
+        """Get agent by ID or name (case-insensitive)"""
+        self._load_agents()
+        return self._by_id.get(agent_id) or self._by_name_lower.get(agent_id.lower())
 
     def get_current_agent(self) -> Optional[CustomAgent]:
         """Get the currently active agent"""
+        self._load_agents()
         if not self.current_agent_id:
             return None
         return self.get_agent(self.current_agent_id)
@@ -142,15 +173,18 @@ class CustomAgentManager:
 
     def create_agent(self, emoji: str, name: str, description: str) -> CustomAgent:
         """Create a new custom agent"""
+        self._load_agents()
         agent_id = f"agent_{uuid.uuid4().hex[:12]}"
         agent = CustomAgent(agent_id, emoji, name, description)
         self.custom_agents.append(agent)
+        self._reindex()
         self._save_agents()
         return agent
 
     def update_agent(self, agent_id: str, emoji: str = None, name: str = None,
                      description: str = None) -> Optional[CustomAgent]:
         """Update an existing custom agent"""
+        self._load_agents()
         for agent in self.custom_agents:
             if agent.id == agent_id:
                 if agent.is_default:
@@ -163,18 +197,22 @@ class CustomAgentManager:
                 if description:
                     agent.description = description
 
+                agent.invalidate()
+                self._reindex()
                 self._save_agents()
                 return agent
         return None
 
     def delete_agent(self, agent_id: str) -> bool:
         """Delete a custom agent"""
+        self._load_agents()
         for i, agent in enumerate(self.custom_agents):
             if agent.id == agent_id:
                 if agent.is_default:
                     return False  # Can't delete default agents
 
                 self.custom_agents.pop(i)
+                self._reindex()
 
                 # If deleting current agent, clear selection
                 if self.current_agent_id == agent_id:
@@ -1,50 +1,47 @@
 """Specialized AI agents with unique personalities and expertise"""
 
-from enum import Enum
-from typing import Optional, List, Dict, Any
-from dataclasses import dataclass
+from enum import IntEnum
+from typing import Optional, Dict, Any, Callable, Sequence, Tuple
+from dataclasses import dataclass, field
+import functools
 import random
+import re
 
+from ..utils.compat import DATACLASS_SLOTS
 
-class AgentType(Enum):
-    """Types of specialized agents"""
-    GENERAL = "general"
-    NETWORKING = "networking"
-    N8N = "n8n"
-    CODE_REVIEW = "code_review"
-    DATABASE = "database"
-    FRONTEND = "frontend"
-    BACKEND = "backend"
-    DEVOPS = "devops"
-    SECURITY = "security"
-    API = "api"
 
+class AgentType(IntEnum):
+    """Types of specialized agents
 
-@dataclass
-class SpecializedAgent:
-    """Represents a specialized agent with personality"""
-    name: str
-    agent_type: AgentType
-    emoji: str
-    expertise: str
-    personality: str
-    thinking_messages: List[str]
+    Values are contiguous so agents can be looked up by index.
+    """
+    GENERAL = 0
+    NETWORKING = 1
+    N8N = 2
+    CODE_REVIEW = 3
+    DATABASE = 4
+    FRONTEND = 5
+    BACKEND = 6
+    DEVOPS = 7
+    SECURITY = 8
+    API = 9
 
-    def get_random_thinking_message(self) -> str:
-        """Get a random thinking message for this agent"""
-        return random.choice(self.thinking_messages)
+    @property
+    def label(self) -> str:
+        """Readable name (e.g. "code_review")"""
+        return self.name.lower()
 
-    def get_system_prompt_addition(self) -> str:
-        """Get the additional system prompt for this agent's specialization"""
-        prompts = {
-            AgentType.NETWORKING: """
+
+# Extra system prompt per agent type, built once at import
+_SYSTEM_PROMPTS: Dict[AgentType, str] = {
+    AgentType.NETWORKING: """
 # Networking Specialist
 
 You are an expert in networking, APIs, HTTP protocols, WebSockets, and distributed systems.
 Focus on network configurations, API design, connectivity issues, and performance optimization.
 Always consider security, rate limiting, and error handling in network operations.
 """,
-            AgentType.N8N: """
+    AgentType.N8N: """
 # n8n Automation Expert
 
 You are a master of n8n workflow automation. You excel at:
@@ -55,7 +52,7 @@ You are a master of n8n workflow automation. You excel at:
 - Optimizing workflow performance
 Always provide practical, working n8n configurations and node setups.
 """,
-            AgentType.CODE_REVIEW: """
+    AgentType.CODE_REVIEW: """
 # Code Review Specialist
 
 ⚠️ CRITICAL CODE REVIEW INSTRUCTIONS ⚠️
@@ -84,7 +81,7 @@ You are a meticulous code reviewer focusing on:
 Always provide constructive, actionable feedback with specific code examples and line numbers.
 FILE LISTINGS ARE NOT CODE REVIEWS. You must READ and ANALYZE actual code.
 """,
-            AgentType.DATABASE: """
+    AgentType.DATABASE: """
 # Database Expert
 
 You specialize in database design, optimization, and management:
@@ -95,7 +92,7 @@ You specialize in database design, optimization, and management:
 - Performance tuning and scaling
 Always consider data integrity, consistency, and performance implications.
 """,
-            AgentType.FRONTEND: """
+    AgentType.FRONTEND: """
 # Frontend Development Specialist
 
 You are an expert in modern frontend development:
@@ -106,7 +103,7 @@ You are an expert in modern frontend development:
 - User experience and interface design
 Focus on clean, maintainable, and performant frontend code.
 """,
-            AgentType.BACKEND: """
+    AgentType.BACKEND: """
 # Backend Development Expert
 
 You specialize in backend systems and architecture:
@@ -117,7 +114,7 @@ You specialize in backend systems and architecture:
 - Error handling and logging
 Emphasize scalability, reliability, and security in backend systems.
 """,
-            AgentType.DEVOPS: """
+    AgentType.DEVOPS: """
 # DevOps & Infrastructure Specialist
 
 You are an expert in DevOps practices and infrastructure:
@@ -128,7 +125,7 @@ You are an expert in DevOps practices and infrastructure:
 - Monitoring, logging, and observability
 Focus on automation, reliability, and efficient deployment processes.
 """,
-            AgentType.SECURITY: """
+    AgentType.SECURITY: """
 # Security Specialist
 
 You are a cybersecurity expert focusing on:
@@ -139,7 +136,7 @@ You are a cybersecurity expert focusing on:
 - Security best practices and compliance
 Always prioritize security without compromising functionality.
 """,
-            AgentType.API: """
+    AgentType.API: """
 # API Design & Integration Expert
 
 You specialize in API development and integration:
@@ -150,14 +147,42 @@ You specialize in API development and integration:
 - Third-party API integration
 Focus on developer experience, consistency, and robust error handling.
 """,
-            AgentType.GENERAL: """
+    AgentType.GENERAL: """
 # General Programming Assistant
 
 You are a versatile software engineering assistant capable of handling
 diverse programming tasks across multiple domains and technologies.
 """
-        }
-        return prompts.get(self.agent_type, "")
+}
+
+
+@dataclass(**DATACLASS_SLOTS)
+class SpecializedAgent:
+    """Represents a specialized agent with personality"""
+    name: str
+    agent_type: AgentType
+    emoji: str
+    expertise: str
+    personality: str
+    thinking_messages: Tuple[str, ...]
+    # Looked up from _SYSTEM_PROMPTS once, unless given (e.g. custom agents)
+    system_prompt_addition: Optional[str] = field(default=None, repr=False, compare=False)
+    # Bound choice() of this agent's own Random instance
+    _pick: Callable[[Sequence[str]], str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.thinking_messages = tuple(self.thinking_messages)
+        if self.system_prompt_addition is None:
+            self.system_prompt_addition = _SYSTEM_PROMPTS.get(self.agent_type, "")
+        self._pick = random.Random().choice
+
+    def get_random_thinking_message(self) -> str:
+        """Get a random thinking message for this agent"""
+        return self._pick(self.thinking_messages)
+
+    def get_system_prompt_addition(self) -> str:
+        """Get the additional system prompt for this agent's specialization"""
+        return self.system_prompt_addition
 
 
 # Define all specialized agents
@@ -334,93 +359,142 @@ SPECIALIZED_AGENTS = [
 ]
 
 
+# Routing keywords per agent type, checked in order (first matching category wins)
+_ROUTING_KEYWORDS = (
+    # Database keywords (check first for higher priority)
+    (AgentType.DATABASE, (
+        'database', 'sql', 'mysql', 'postgres', 'postgresql', 'mongodb', 'redis',
+        'query', 'schema', 'migration', 'orm', 'index', 'nosql',
+        'sqlite', 'mariadb', 'cassandra', 'dynamodb', 'select', 'insert',
+        'update', 'delete', 'join', 'where', 'table'
+    )),
+    # n8n keywords (check early to avoid being caught by other categories)
+    (AgentType.N8N, (
+        'n8n', 'workflow', 'automation', 'webhook', 'integration',
+        'zapier', 'automate', 'trigger', 'node'
+    )),
+    # Backend keywords (check before networking to prioritize server-side work)
+    (AgentType.BACKEND, (
+        'backend', 'server', 'express', 'fastapi', 'django', 'flask',
+        'nodejs', 'spring', 'authentication', 'authorization', 'jwt',
+        'session', 'middleware', 'routing', 'controller', 'rest api',
+        'build api', 'create api', 'api server'
+    )),
+    # Security keywords (check before general categories)
+    (AgentType.SECURITY, (
+        'security', 'secure', 'vulnerability', 'xss', 'sql injection',
+        'csrf', 'owasp', 'encryption', 'decrypt', 'hash', 'bcrypt',
+        'password', 'token', 'oauth', 'permissions', 'firewall'
+    )),
+    (AgentType.FRONTEND, (
+        'react', 'vue', 'angular', 'frontend', 'ui', 'ux', 'component',
+        'css', 'scss', 'tailwind', 'bootstrap', 'html', 'dom', 'jsx',
+        'state management', 'redux', 'zustand', 'interface', 'responsive',
+        'button', 'form', 'input', 'layout', 'styling'
+    )),
+    (AgentType.DEVOPS, (
+        'docker', 'kubernetes', 'k8s', 'ci/cd', 'pipeline', 'deploy',
+        'devops', 'terraform', 'ansible', 'jenkins', 'github actions',
+        'gitlab', 'aws', 'azure', 'gcp', 'cloud', 'container', 'pod'
+    )),
+    (AgentType.CODE_REVIEW, (
+        'review', 'refactor', 'best practice', 'code quality',
+        'clean code', 'design pattern', 'architecture review'
+    )),
+    # API keywords (more specific to avoid overlap)
+    (AgentType.API, (
+        'api design', 'api documentation', 'swagger', 'openapi',
+        'api integration', 'third party api', 'api gateway'
+    )),
+    # Networking keywords (check later to avoid catching backend/api requests)
+    (AgentType.NETWORKING, (
+        'network', 'http', 'websocket', 'socket', 'connection',
+        'request', 'response', 'curl', 'fetch', 'axios',
+        'graphql', 'grpc', 'tcp', 'udp', 'dns', 'ssl', 'tls',
+        'network request', 'http call'
+    )),
+)
+
+# Endings a keyword may take and still count ("deploy" -> "deployment",
+# "docker" -> "dockerfile"), so keywords inside unrelated words don't match
+_KEYWORD_SUFFIX = r"(?:s|es|d|ed|ing|ment|ments|er|ers|ize|ized|izes|izing|ization|file|files)?"
+
+
+def _keyword_pattern(keyword: str) -> str:
+    """Regex for a keyword or phrase plus its common inflections"""
+    pattern = re.escape(keyword) + _KEYWORD_SUFFIX
+    if keyword.endswith("e"):
+        # "automate" -> "automating"
+        pattern = f"(?:{pattern}|{re.escape(keyword[:-1])}ing)"
+    elif keyword.endswith("y"):
+        # "query" -> "queries"
+        pattern = f"(?:{pattern}|{re.escape(keyword[:-1])}ies)"
+    return pattern
+
+
+# (agent type, compiled search) - one pattern per category, keywords matched
+# from the start of a word
+_ROUTING_RULES = tuple(
+    (
+        agent_type,
+        re.compile(
+            "(?<![a-z0-9])(?:" + "|".join(_keyword_pattern(kw) for kw in keywords) + ")(?![a-z0-9])"
+        ).search,
+    )
+    for agent_type, keywords in _ROUTING_KEYWORDS
+)
+
+
+def _compile_matcher(rules) -> Callable[[str], AgentType]:
+    """Generate a function that checks the routing rules as an unrolled if-cascade
+
+    Each category becomes one `if` line with its search bound as a constant,
+    so matching runs no per-rule loop or any() generator.
+    """
+    namespace: Dict[str, Any] = {"_DEFAULT": AgentType.GENERAL}
+    lines = ["def _match(m):"]
+    for i, (agent_type, search) in enumerate(rules):
+        namespace[f"_T{i}"] = agent_type
+        namespace[f"_S{i}"] = search
+        lines.append(f"    if _S{i}(m): return _T{i}")
+    lines.append("    return _DEFAULT")
+    exec(compile("\n".join(lines), "<agent-router>", "exec"), namespace)
+    return namespace["_match"]
+
+
+# Matches a normalized message against _ROUTING_RULES in order
+_match_rules = _compile_matcher(_ROUTING_RULES)
+
+# Longer messages (pasted code, logs) are routed without caching
+_ROUTE_CACHE_MAX_LEN = 1024
+
+
 class AgentRouter:
     """Routes requests to appropriate specialized agents"""
 
     def __init__(self):
         self.agents = {agent.agent_type: agent for agent in SPECIALIZED_AGENTS}
         self.default_agent = self.agents[AgentType.GENERAL]
+        # Agents indexed by AgentType value, falling back to the default agent
+        self._agents_by_type = tuple(self.agents.get(t, self.default_agent) for t in AgentType)
 
     def route(self, user_message: str) -> SpecializedAgent:
         """Determine which agent should handle this request"""
-        message_lower = user_message.lower()
-
-        # Database keywords (check first for higher priority)
-        if any(kw in message_lower for kw in [
-            'database', 'sql', 'mysql', 'postgres', 'mongodb', 'redis',
-            'query', 'schema', 'migration', 'orm', 'index', 'nosql',
-            'sqlite', 'mariadb', 'cassandra', 'dynamodb', 'select', 'insert',
-            'update', 'delete', 'join', 'where', 'table'
-        ]):
-            return self.agents[AgentType.DATABASE]
-
-        # n8n keywords (check early to avoid being caught by other categories)
-        if any(kw in message_lower for kw in [
-            'n8n', 'workflow', 'automation', 'webhook', 'integration',
-            'zapier', 'automate', 'trigger', 'node'
-        ]):
-            return self.agents[AgentType.N8N]
-
-        # Backend keywords (check before networking to prioritize server-side work)
-        if any(kw in message_lower for kw in [
-            'backend', 'server', 'express', 'fastapi', 'django', 'flask',
-            'nodejs', 'spring', 'authentication', 'authorization', 'jwt',
-            'session', 'middleware', 'routing', 'controller', 'rest api',
-            'build api', 'create api', 'api server'
-        ]):
-            return self.agents[AgentType.BACKEND]
-
-        # Security keywords (check before general categories)
-        if any(kw in message_lower for kw in [
-            'security', 'secure', 'vulnerability', 'xss', 'sql injection',
-            'csrf', 'owasp', 'encryption', 'decrypt', 'hash', 'bcrypt',
-            'password', 'token', 'oauth', 'permissions', 'firewall'
-        ]):
-            return self.agents[AgentType.SECURITY]
-
-        # Frontend keywords
-        if any(kw in message_lower for kw in [
-            'react', 'vue', 'angular', 'frontend', 'ui', 'ux', 'component',
-            'css', 'scss', 'tailwind', 'bootstrap', 'html', 'dom', 'jsx',
-            'state management', 'redux', 'zustand', 'interface', 'responsive',
-            'button', 'form', 'input', 'layout', 'styling'
-        ]):
-            return self.agents[AgentType.FRONTEND]
-
-        # DevOps keywords
-        if any(kw in message_lower for kw in [
-            'docker', 'kubernetes', 'k8s', 'ci/cd', 'pipeline', 'deploy',
-            'devops', 'terraform', 'ansible', 'jenkins', 'github actions',
-            'gitlab', 'aws', 'azure', 'gcp', 'cloud', 'container', 'pod'
-        ]):
-            return self.agents[AgentType.DEVOPS]
-
-        # Code review keywords
-        if any(kw in message_lower for kw in [
-            'review', 'refactor', 'best practice', 'code quality',
-            'clean code', 'design pattern', 'architecture review'
-        ]):
-            return self.agents[AgentType.CODE_REVIEW]
-
-        # API keywords (more specific to avoid overlap)
-        if any(kw in message_lower for kw in [
-            'api design', 'api documentation', 'swagger', 'openapi',
-            'api integration', 'third party api', 'api gateway'
-        ]):
-            return self.agents[AgentType.API]
-
-        # Networking keywords (check later to avoid catching backend/api requests)
-        if any(kw in message_lower for kw in [
-            'network', 'http', 'websocket', 'socket', 'connection',
-            'request', 'response', 'curl', 'fetch', 'axios',
-            'graphql', 'grpc', 'tcp', 'udp', 'dns', 'ssl', 'tls',
-            'network request', 'http call'
-        ]):
-            return self.agents[AgentType.NETWORKING]
-
-        # Default to general agent
-        return self.default_agent
+        # Normalizing whitespace lets retries/follow-ups hit the cache
+        message_lower = " ".join(user_message.lower().split())
+        if len(message_lower) > _ROUTE_CACHE_MAX_LEN:
+            agent_type = self._route_impl.__wrapped__(message_lower)
+        else:
+            agent_type = self._route_impl(message_lower)
+        return self._agents_by_type[agent_type]
+
+    @staticmethod
+    @functools.lru_cache(maxsize=512)
+    def _route_impl(message_lower: str) -> AgentType:
+        """Pick the agent type for a normalized, lowercased message"""
+        # Categories in priority order, defaulting to the general agent
+        return _match_rules(message_lower)
 
     def get_agent(self, agent_type: AgentType) -> SpecializedAgent:
         """Get a specific agent by type"""
-        return self.agents.get(agent_type, self.default_agent)
+        return self._agents_by_type[agent_type]
@@ -1,28 +1,60 @@
 """GitHub-styled contribution tracking and analytics"""
 
-import json
+import atexit
 import os
+import time
+from bisect import bisect_left, bisect_right
 from pathlib import Path
 from typing import Dict, List, Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from datetime import datetime, timedelta
-from collections import defaultdict
-from enum import Enum
+from collections import Counter
+from enum import IntEnum
 
+from ..utils import fastjson
+from ..utils.compat import DATACLASS_SLOTS
 
-class ActivityType(Enum):
-    """Types of activities to track"""
-    CHAT_MESSAGE = "chat_message"
-    FILE_CREATED = "file_created"
-    FILE_MODIFIED = "file_modified"
-    FILE_DELETED = "file_deleted"
-    GIT_COMMIT = "git_commit"
-    TOOL_EXECUTION = "tool_execution"
-    PROJECT_CREATED = "project_created"
-    AGENT_SWARM = "agent_swarm"
+# Only the most recent activities are kept
+MAX_ACTIVITIES = 10000
+# Extra lines the log may grow past MAX_ACTIVITIES before it is rewritten
+_LOG_SLACK = 1000
+# Seconds between log writes while activities are being logged in bursts
+FLUSH_INTERVAL = 1.0
 
+# Contribution graph intensity: counts below each threshold use the matching
+# symbol, anything at or above the last threshold uses the final one
+_GRAPH_THRESHOLDS = (1, 3, 6, 11)
+_GRAPH_CELLS = ("· ", "▪ ", "▪ ", "◼ ", "◼ ")
+_GRAPH_BLANK = "  "
+_GRAPH_LEGEND = "Less · ▪ ▪ ◼ ◼ More"
+_DAY_LABELS = ("Mon ", "Tue ", "Wed ", "Thu ", "Fri ", "Sat ", "Sun ")
 
-@dataclass
+
+class ActivityType(IntEnum):
+    """Types of activities to track
+
+    Values are contiguous so per-type counts can live in a plain list.
+    """
+    CHAT_MESSAGE = 0
+    FILE_CREATED = 1
+    FILE_MODIFIED = 2
+    FILE_DELETED = 3
+    GIT_COMMIT = 4
+    TOOL_EXECUTION = 5
+    PROJECT_CREATED = 6
+    AGENT_SWARM = 7
+
+    @property
+    def label(self) -> str:
+        """Name stored in the activity log (e.g. "chat_message")"""
+        return self.name.lower()
+
+
+# Activity log labels to type ids; unknown labels are counted as -1
+_TYPE_IDS: Dict[str, int] = {t.label: int(t) for t in ActivityType}
+
+
+@dataclass(**DATACLASS_SLOTS)
 class Activity:
     """Represents a single activity"""
     type: str
@@ -30,6 +62,11 @@ class Activity:
     details: Dict[str, any]
     project: Optional[str] = None
 
+    @property
+    def date_str(self) -> str:
+        """Day of the activity (YYYY-MM-DD), read from the ISO timestamp without parsing"""
+        return self.timestamp[:10]
+
     def to_dict(self) -> dict:
         return asdict(self)
 
@@ -38,7 +75,7 @@ class Activity:
         return cls(**data)
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class ActivityStats:
     """Statistics for a time period"""
     period: str  # 'day', 'week', 'month', 'year'
@@ -54,11 +91,7 @@ class ActivityStats:
     most_active_day: Optional[str] = None
     streak_days: int = 0
     total_tokens: int = 0
-    projects_worked_on: List[str] = None
-
-    def __post_init__(self):
-        if self.projects_worked_on is None:
-            self.projects_worked_on = []
+    projects_worked_on: List[str] = field(default_factory=list)
 
 
 class ContributionTracker:
@@ -67,29 +100,94 @@ class ContributionTracker:
     def __init__(self, config_dir: str = "~/.flaco"):
         self.config_dir = Path(config_dir).expanduser()
         self.config_dir.mkdir(exist_ok=True)
-        self.activities_file = self.config_dir / "activities.json"
+        # One JSON activity per line, appended as activities are logged
+        self.activities_file = self.config_dir / "activities.ndjson"
+        self.legacy_activities_file = self.config_dir / "activities.json"
         self.activities: List[Activity] = []
+        self._file_lines = 0
+        # Logged activities not yet written, flushed at most every FLUSH_INTERVAL
+        self._pending: List[Activity] = []
+        self._last_flush = time.monotonic()
         self._load_activities()
+        # Column views of self.activities for the analytics loops, which only
+        # need the timestamp, type and token count of each activity
+        self._timestamps: List[str] = [a.timestamp for a in self.activities]
+        self._types: List[int] = [_TYPE_IDS.get(a.type, -1) for a in self.activities]
+        self._tokens: List[int] = [self._activity_tokens(a) for a in self.activities]
+        # Activities per day (YYYY-MM-DD), kept in step with self.activities
+        self._daily_counts: Counter = Counter(ts[:10] for ts in self._timestamps)
+        # Whether _timestamps is ascending, so periods can be found by bisection
+        self._in_order = all(a <= b for a, b in zip(self._timestamps, self._timestamps[1:]))
 
     def _load_activities(self):
         """Load activities from file"""
-        if self.activities_file.exists():
-            try:
-                with open(self.activities_file, 'r') as f:
-                    data = json.load(f)
-                    self.activities = [Activity.from_dict(a) for a in data]
-            except Exception as e:
-                print(f"Warning: Could not load activities: {e}")
+        try:
+            if self.activities_file.exists():
+                records = []
+                for line in self.activities_file.read_bytes().splitlines():
+                    try:
+                        records.append(fastjson.loads(line))
+                    except ValueError:
+                        # A partially written last line (e.g. after a crash)
+                        continue
+                self._file_lines = len(records)
+                self.activities = [Activity.from_dict(a) for a in records[-MAX_ACTIVITIES:]]
+            elif self.legacy_activities_file.exists():
+                data = fastjson.loads(self.legacy_activities_file.read_bytes())
+                self.activities = [Activity.from_dict(a) for a in data[-MAX_ACTIVITIES:]]
+                self._save_activities()
+                self.legacy_activities_file.unlink()
+        except Exception as e:
+            print(f"Warning: Could not load activities: {e}")
 
     def _save_activities(self):
-        """Save activities to file"""
+        """Rewrite the activity log with the in-memory activities"""
+        try:
+            tmp_file = self.activities_file.with_suffix(".tmp")
+            with open(tmp_file, 'wb') as f:
+                f.write(b"".join(self._encode(a) for a in self.activities))
+            os.replace(tmp_file, self.activities_file)
+            self._file_lines = len(self.activities)
+        except Exception as e:
+            print(f"Error saving activities: {e}")
+
+    def _append_activities(self, activities: List[Activity]):
+        """Append activities to the log without rewriting it"""
         try:
-            with open(self.activities_file, 'w') as f:
-                data = [a.to_dict() for a in self.activities]
-                json.dump(data, f, indent=2)
+            with open(self.activities_file, 'ab') as f:
+                f.write(b"".join(self._encode(a) for a in activities))
+            self._file_lines += len(activities)
         except Exception as e:
             print(f"Error saving activities: {e}")
 
+    def flush(self):
+        """Write activities logged since the last flush"""
+        pending = self._pending
+        if not pending:
+            return
+        self._pending = []
+        self._last_flush = time.monotonic()
+        atexit.unregister(self.flush)
+
+        # Append, and only rewrite (trim) the file once it is well past the cap
+        if self._file_lines + len(pending) > MAX_ACTIVITIES + _LOG_SLACK:
+            self._save_activities()
+        else:
+            self._append_activities(pending)
+
+    @staticmethod
+    def _activity_tokens(activity: Activity) -> int:
+        """Tokens recorded on an activity (0 when not tracked)"""
+        return activity.details.get('tokens', 0) if activity.details else 0
+
+    @staticmethod
+    def _encode(activity: Activity) -> bytes:
+        """Serialize an activity as one compact NDJSON line (no null project)"""
+        record = {"type": activity.type, "timestamp": activity.timestamp, "details": activity.details}
+        if activity.project is not None:
+            record["project"] = activity.project
+        return fastjson.dumps_bytes(record) + b"\n"
+
     def log_activity(
         self,
         activity_type: ActivityType,
@@ -98,27 +196,42 @@ class ContributionTracker:
     ):
         """Log a new activity"""
         activity = Activity(
-            type=activity_type.value,
+            type=activity_type.label,
             timestamp=datetime.now().isoformat(),
             details=details,
             project=project
         )
 
-        self.activities.append(activity)
+        self._add_activity(activity)
+        if not self._pending:
+            # Only trackers with unwritten activities are kept alive until exit
+            atexit.register(self.flush)
+        self._pending.append(activity)
 
-        # Keep only last 10,000 activities to prevent file from growing too large
-        if len(self.activities) > 10000:
-            self.activities = self.activities[-10000:]
+        # Bursts (e.g. many tool calls) are written together; flush() or
+        # process exit writes whatever is left
+        if time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+            self.flush()
 
-        self._save_activities()
+    def _add_activity(self, activity: Activity):
+        """Add an activity in memory, keeping only the last MAX_ACTIVITIES"""
+        self.activities.append(activity)
+        if self._timestamps and activity.timestamp < self._timestamps[-1]:
+            self._in_order = False
+        self._timestamps.append(activity.timestamp)
+        self._types.append(_TYPE_IDS.get(activity.type, -1))
+        self._tokens.append(self._activity_tokens(activity))
+        self._daily_counts[activity.date_str] += 1
+
+        if len(self.activities) > MAX_ACTIVITIES:
+            self._daily_counts.subtract(ts[:10] for ts in self._timestamps[:-MAX_ACTIVITIES])
+            for column in (self.activities, self._timestamps, self._types, self._tokens):
+                del column[:-MAX_ACTIVITIES]
 
     def get_activities_for_date(self, date: datetime) -> List[Activity]:
         """Get activities for a specific date"""
         date_str = date.date().isoformat()
-        return [
-            a for a in self.activities
-            if datetime.fromisoformat(a.timestamp).date().isoformat() == date_str
-        ]
+        return [a for a in self.activities if a.date_str == date_str]
 
     def get_daily_count(self, date: datetime) -> int:
         """Get activity count for a specific day"""
@@ -137,11 +250,10 @@ class ContributionTracker:
             contribution_map[date_str] = 0
             current_date += timedelta(days=1)
 
-        # Count activities per day
-        for activity in self.activities:
-            activity_date = datetime.fromisoformat(activity.timestamp).date().isoformat()
-            if activity_date in contribution_map:
-                contribution_map[activity_date] += 1
+        # Fill in the per-day counts maintained as activities are added
+        counts = self._daily_counts
+        for date_str in contribution_map:
+            contribution_map[date_str] = counts.get(date_str, 0)
 
         return contribution_map
 
@@ -149,76 +261,33 @@ class ContributionTracker:
         """Generate ASCII contribution graph (GitHub-style)"""
         contribution_map = self.get_contribution_map(days)
 
-        # Define intensity levels
-        def get_symbol(count):
-            if count == 0:
-                return "·"
-            elif count <= 2:
-                return "▪"
-            elif count <= 5:
-                return "▪"
-            elif count <= 10:
-                return "◼"
-            else:
-                return "◼"
-
-        # Group by weeks
-        dates = sorted(contribution_map.keys())
-        weeks = []
-        current_week = []
-
-        for date in dates:
-            if len(current_week) == 7:
-                weeks.append(current_week)
-                current_week = []
-            current_week.append((date, contribution_map[date]))
-
-        if current_week:
-            weeks.append(current_week)
+        # One cell per day, padded so the first day lands on its weekday row
+        # and each column is one Mon-Sun week
+        start_date = datetime.now().date() - timedelta(days=days)
+        cells = [_GRAPH_BLANK] * start_date.weekday()
+        cells.extend(
+            _GRAPH_CELLS[bisect_right(_GRAPH_THRESHOLDS, count)]
+            for count in contribution_map.values()
+        )
+        cells.extend([_GRAPH_BLANK] * (-len(cells) % 7))
 
         # Build graph
-        lines = []
-        lines.append("Contribution Activity (Last Year)")
+        lines = ["Contribution Activity (Last Year)", ""]
+        for i, label in enumerate(_DAY_LABELS):  # 7 days of week
+            lines.append(label + "".join(cells[i::7]))
         lines.append("")
-
-        # Show by month
-        months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-
-        for i in range(7):  # 7 days of week
-            line = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"][i] + " "
-            for week in weeks:
-                if i < len(week):
-                    count = week[i][1]
-                    line += get_symbol(count) + " "
-                else:
-                    line += "  "
-            lines.append(line)
-
-        lines.append("")
-        lines.append(f"Less · ▪ ▪ ◼ ◼ More")
+        lines.append(_GRAPH_LEGEND)
 
         return "\n".join(lines)
 
     def calculate_streak(self) -> int:
         """Calculate current contribution streak"""
-        if not self.activities:
-            return 0
-
-        contribution_map = self.get_contribution_map(days=365)
-        dates = sorted(contribution_map.keys(), reverse=True)
-
+        # Walk back from today until a day without activity
         streak = 0
-        today = datetime.now().date()
-
-        for date_str in dates:
-            date = datetime.fromisoformat(date_str).date()
-            if (today - date).days == streak:
-                if contribution_map[date_str] > 0:
-                    streak += 1
-                else:
-                    break
-            else:
-                break
+        day = datetime.now().date()
+        while self._daily_counts.get(day.isoformat(), 0) > 0:
+            streak += 1
+            day -= timedelta(days=1)
 
         return streak
 
@@ -241,46 +310,56 @@ class ContributionTracker:
         else:
             raise ValueError(f"Invalid period: {period}")
 
-        # Filter activities
-        period_activities = [
-            a for a in self.activities
-            if start <= datetime.fromisoformat(a.timestamp) <= end
-        ]
-
-        # Count by type
-        type_counts = defaultdict(int)
-        for activity in period_activities:
-            type_counts[activity.type] += 1
-
-        # Get unique projects
-        projects = list(set(a.project for a in period_activities if a.project))
-
-        # Find most active day
-        daily_counts = defaultdict(int)
-        for activity in period_activities:
-            day = datetime.fromisoformat(activity.timestamp).date().isoformat()
-            daily_counts[day] += 1
-
-        most_active_day = max(daily_counts.items(), key=lambda x: x[1])[0] if daily_counts else None
-
-        # Calculate total tokens
-        total_tokens = sum(
-            a.details.get('tokens', 0)
-            for a in period_activities
-            if a.type == ActivityType.CHAT_MESSAGE.value
-        )
+        # Select the period by comparing ISO timestamps as strings; logged
+        # activities are in time order, so the period is one bisected slice
+        start_iso = start.isoformat()
+        end_iso = end.isoformat()
+        timestamps = self._timestamps
+        if self._in_order:
+            lo = bisect_left(timestamps, start_iso)
+            hi = bisect_right(timestamps, end_iso)
+        else:
+            lo, hi = 0, len(timestamps)
+        activities = self.activities
+        types = self._types
+        tokens = self._tokens
+
+        # Count types, days, projects and tokens in a single pass
+        type_counts = [0] * len(ActivityType)
+        daily_counts = Counter()
+        projects = set()
+        total_activities = 0
+        total_tokens = 0
+        chat_type = ActivityType.CHAT_MESSAGE
+        for i in range(lo, hi):
+            timestamp = timestamps[i]
+            if not start_iso <= timestamp <= end_iso:
+                continue
+            activity_type = types[i]
+            total_activities += 1
+            if activity_type >= 0:
+                type_counts[activity_type] += 1
+            daily_counts[timestamp[:10]] += 1
+            project = activities[i].project
+            if project:
+                projects.add(project)
+            if activity_type == chat_type:
+                total_tokens += tokens[i]
+
+        projects = list(projects)
+        most_active_day = daily_counts.most_common(1)[0][0] if daily_counts else None
 
         return ActivityStats(
             period=period,
             start_date=start.isoformat(),
             end_date=end.isoformat(),
-            total_activities=len(period_activities),
-            chat_messages=type_counts[ActivityType.CHAT_MESSAGE.value],
-            files_created=type_counts[ActivityType.FILE_CREATED.value],
-            files_modified=type_counts[ActivityType.FILE_MODIFIED.value],
-            git_commits=type_counts[ActivityType.GIT_COMMIT.value],
-            tool_executions=type_counts[ActivityType.TOOL_EXECUTION.value],
-            agent_swarms=type_counts[ActivityType.AGENT_SWARM.value],
+            total_activities=total_activities,
+            chat_messages=type_counts[ActivityType.CHAT_MESSAGE],
+            files_created=type_counts[ActivityType.FILE_CREATED],
+            files_modified=type_counts[ActivityType.FILE_MODIFIED],
+            git_commits=type_counts[ActivityType.GIT_COMMIT],
+            tool_executions=type_counts[ActivityType.TOOL_EXECUTION],
+            agent_swarms=type_counts[ActivityType.AGENT_SWARM],
             most_active_day=most_active_day,
             streak_days=self.calculate_streak() if period == "day" else 0,
             total_tokens=total_tokens,
@@ -1,40 +1,34 @@
 #!/usr/bin/env python3
-import warnings
-
-# Suppress urllib3 OpenSSL warning for better UX
-warnings.filterwarnings("ignore", message=".*urllib3 v2 only supports OpenSSL.*")
-
+import asyncio
 import click
 import os
+import re
 import sys
 import signal
-from pathlib import Path
-from rich.console import Console
-from rich.panel import Panel
-from rich.markdown import Markdown
-from rich.prompt import Prompt
-from rich.spinner import Spinner
-from rich.live import Live
-from rich.text import Text
-from prompt_toolkit import PromptSession
-from prompt_toolkit.history import FileHistory
-from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
-import time
 import threading
-import subprocess
-
-from .agent import FlacoAgent
-from .permissions import PermissionMode
-from .context import FlacoContextLoader
-from .commands.slash_commands import SlashCommandHandler
-from .commands.quick_actions import QuickActionManager
-from .config.user_config import UserConfig
-from .utils.completers import FlacoCompleter, FlacoAutoSuggest
-from .utils.update_checker import UpdateChecker
+import warnings
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, NamedTuple, Optional, Tuple
+
 from . import __version__
+from .ui import CONSOLE
 
+# The agent stack, prompt_toolkit and Rich renderables are imported where
+# they are used, so `flaco --help` and headless runs only load what they need
+if TYPE_CHECKING:
+    from .agent import FlacoAgent
+    from .commands.quick_actions import QuickActionManager
+    from .commands.slash_commands import SlashCommandHandler
 
-console = Console()
+
+console = CONSOLE
+
+# Prompt history, resolved once per process
+_HISTORY_FILE = str(Path.home() / ".flaco_history")
+
+# Markdown syntax (or a soft line break, which Markdown joins) that needs
+# Rich's Markdown renderer; anything else prints the same as plain text
+_MARKDOWN_RE = re.compile(r"[#*_`|\[<>&\\~]|^\s*(?:[-+=]|\d+[.)])|^(?: {4}|\t)|(?<!\n)\n(?!\n)", re.M)
 
 # Global flag for interrupt handling
 interrupt_requested = False
@@ -45,9 +39,21 @@ def signal_handler(sig, frame):
     interrupt_requested = True
 
 
-def print_banner(theme_color: str):
-    """Print the Flaco banner with Gemini-style ASCII art"""
-    banner = """
+def _configure_environment():
+    """Process-wide setup done once when the CLI starts (not on import)"""
+    # Suppress urllib3 OpenSSL warning for better UX
+    try:
+        from urllib3.exceptions import NotOpenSSLWarning
+        warnings.filterwarnings("ignore", category=NotOpenSSLWarning)
+    except ImportError:
+        warnings.filterwarnings("ignore", message=".*urllib3 v2 only supports OpenSSL.*")
+
+    # Register signal handler for graceful interrupts (main thread only)
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGINT, signal_handler)
+
+
+_BANNER = """
   ███████╗██╗      █████╗  ██████╗ ██████╗
   ██╔════╝██║     ██╔══██╗██╔════╝██╔═══██╗
   █████╗  ██║     ███████║██║     ██║   ██║
@@ -55,19 +61,36 @@ def print_banner(theme_color: str):
   ██║     ███████╗██║  ██║╚██████╗╚██████╔╝
   ╚═╝     ╚══════╝╚═╝  ╚═╝ ╚═════╝ ╚═════╝"""
 
-    console.print(banner, style=f"bold {theme_color}", end="")
-    console.print("  [dim]pro[/dim]")
-    console.print("\n⚡ Local AI Coding Assistant")
-    console.print("   Powered by Ollama")
-    console.print("   Made by Roura.io\n")
+# Banner output per theme color, rendered by Rich once and then written as-is
+_BANNER_CACHE: Dict[str, str] = {}
+
+
+def print_banner(theme_color: str):
+    """Print the Flaco banner with Gemini-style ASCII art"""
+    rendered = _BANNER_CACHE.get(theme_color)
+    if rendered is None:
+        with console.capture() as capture:
+            console.print(_BANNER, style=f"bold {theme_color}", end="")
+            console.print("  [dim]pro[/dim]")
+            console.print("\n⚡ Local AI Coding Assistant")
+            console.print("   Powered by Ollama")
+            console.print("   Made by Roura.io\n")
+        rendered = _BANNER_CACHE[theme_color] = capture.get()
+
+    console.file.write(rendered)
+    console.file.flush()
 
 
-def print_welcome(agent: FlacoAgent, theme_color: str):
+def print_welcome(agent: "FlacoAgent", theme_color: str, offline: bool = False):
     """Print welcome message with session information"""
+    from rich.panel import Panel
+    from .utils.update_checker import UpdateChecker
+
     console.print("\n[bold green]Welcome to Flaco![/bold green]\n")
 
-    # Check for updates and show banner if available
-    has_update, latest_version, summary = UpdateChecker.check_for_updates(__version__)
+    # Show the last known update status; a stale check refreshes in the
+    # background for the next launch instead of delaying this one
+    has_update, latest_version, summary = UpdateChecker.get_cached_update(__version__, refresh=not offline)
 
     if has_update and latest_version:
         update_message = f"📦 Update available: v{__version__} → v{latest_version}"
@@ -91,9 +114,8 @@ def print_welcome(agent: FlacoAgent, theme_color: str):
     session_table.add_column(style=theme_color)
 
     # Working directory
-    import os
-    cwd = os.getcwd()
-    short_cwd = f".../{'/'.join(cwd.split('/')[-2:])}" if len(cwd) > 40 else cwd
+    cwd = Path.cwd()
+    short_cwd = f".../{'/'.join(cwd.parts[-2:])}" if len(str(cwd)) > 40 else str(cwd)
     session_table.add_row("📁 Working Dir:", short_cwd)
 
     # FLACO.md context
@@ -103,7 +125,7 @@ def print_welcome(agent: FlacoAgent, theme_color: str):
     else:
         session_table.add_row("📄 Context:", "⚠️  No FLACO.md (use /init)")
 
-    # Ollama connection (non-fatal check)
+    # Ollama connection (non-fatal check, usually already started by main)
     if agent.llm.test_connection():
         session_table.add_row("🔗 Ollama:", f"✅ Connected ({agent.llm.base_url})")
         session_table.add_row("🤖 Model:", agent.llm.model)
@@ -137,6 +159,15 @@ def print_welcome(agent: FlacoAgent, theme_color: str):
     console.print("[dim]Press ESC or Ctrl+C to interrupt thinking. Ctrl+D to exit.[/dim]\n")
 
 
+def print_markdown(text: str):
+    """Print an LLM response, skipping the Markdown parser for plain prose"""
+    if _MARKDOWN_RE.search(text) is None:
+        console.print(text, markup=False, emoji=False, highlight=False)
+    else:
+        from rich.markdown import Markdown
+        console.print(Markdown(text))
+
+
 def display_metrics(metrics: dict, theme_color: str):
     """Display response metrics in a compact format"""
     time_str = f"{metrics['time_taken']:.2f}s"
@@ -146,7 +177,6 @@ def display_metrics(metrics: dict, theme_color: str):
     # Check if this was a swarm task
     if metrics.get('swarm') and metrics.get('swarm_task'):
         swarm_task = metrics['swarm_task']
-        agent_types = swarm_task.get('required_agents', [])
         console.print(f"[bold {theme_color}]🌟 Agent Swarm Activated![/bold {theme_color}]")
         console.print(f"[dim]Complexity: {swarm_task.get('complexity', 'unknown')} | {swarm_task.get('reasoning', '')}[/dim]")
 
@@ -161,6 +191,256 @@ def display_metrics(metrics: dict, theme_color: str):
     console.print(metrics_text)
 
 
+def run_shell_commands(commands: List[str], timeout: int = 30):
+    """Run quick action bash commands as one script in a single shell
+
+    Commands run in order whether or not earlier ones fail, so `cd` and
+    exported variables carry over. Each gets `timeout` seconds of the budget.
+    """
+    if not commands:
+        return
+
+    import shlex
+    import subprocess
+
+    # Echo each command before running it and report failures inline
+    script = "\n".join(
+        f"printf '%s\\n' {shlex.quote('→ ' + cmd)}\n"
+        f"{cmd} || printf 'Command failed with exit code %s\\n' \"$?\""
+        for cmd in commands
+    )
+    try:
+        # Stream output as it is produced (stderr merged in) instead of
+        # buffering everything until the commands finish
+        proc = subprocess.Popen(
+            script,
+            shell=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            start_new_session=True
+        )
+
+        def signal_group(sig):
+            # Signal the commands the shell started too, so the pipe closes
+            try:
+                os.killpg(proc.pid, sig)
+            except OSError:
+                proc.kill()
+
+        # The commands run in their own session, so pass Ctrl+C on to them
+        previous_handler = None
+        if threading.current_thread() is threading.main_thread():
+            previous_handler = signal.signal(signal.SIGINT, lambda sig, frame: signal_group(signal.SIGINT))
+        timer = threading.Timer(timeout * len(commands), signal_group, args=(signal.SIGKILL,))
+        timer.start()
+        try:
+            for line in proc.stdout:
+                console.out(line, end="", highlight=False)
+            proc.wait()
+        finally:
+            timer.cancel()
+            proc.stdout.close()
+            if previous_handler is not None:
+                signal.signal(signal.SIGINT, previous_handler)
+        if proc.returncode == -signal.SIGKILL:
+            console.print("[red]Command timed out[/red]")
+    except Exception as e:
+        console.print(f"[red]Error: {str(e)}[/red]")
+
+
+class _PromptContext(NamedTuple):
+    """What the prefix handlers need from the interactive session"""
+    agent: "FlacoAgent"
+    slash_handler: "SlashCommandHandler"
+    quick_actions: "QuickActionManager"
+
+
+def _handle_slash(user_input: str, ctx: _PromptContext) -> bool:
+    """Run a slash command, or list them all for a bare '/'"""
+    if user_input == '/':
+        # Show all slash commands (built up and written at once)
+        commands_list = sorted(ctx.slash_handler.commands.keys())
+        grid = "\n".join(
+            "  " + "  ".join(f"/{cmd:15}" for cmd in commands_list[i:i+4])
+            for i in range(0, len(commands_list), 4)
+        )
+        console.print(
+            f"\n[cyan]Available slash commands:[/cyan]\n{grid}\n"
+            "\n[dim]Type to filter, or /help for details[/dim]\n"
+        )
+        return True
+
+    ctx.slash_handler.handle_command(user_input)
+    return True
+
+
+def _handle_hash(user_input: str, ctx: _PromptContext) -> bool:
+    """Run a quick action, or list them all for a bare '#'"""
+    quick_actions = ctx.quick_actions
+    if user_input == '#':
+        # Show all quick actions
+        listing = "\n".join(
+            f"  [cyan]#{action.name:20}[/cyan] [dim]{action.description}[/dim]"
+            for action in quick_actions.list_actions()
+        )
+        console.print(
+            f"\n[cyan]Available quick actions:[/cyan]\n{listing}\n"
+            "\n[dim]Type # followed by action name[/dim]\n"
+        )
+        return True
+
+    action_name = user_input[1:].strip()
+    # Case and spaces are ignored ("#quickcommit")
+    action = quick_actions.get_action(action_name)
+
+    if action:
+        console.print(f"[cyan]🚀 Running quick action:[/cyan] {action.name}")
+        console.print(f"[dim]{action.description}[/dim]\n")
+
+        # Consecutive bash commands share one shell process
+        shell_batch = []
+        for cmd in action.commands:
+            if cmd.startswith('/'):
+                run_shell_commands(shell_batch)
+                shell_batch = []
+                # It's a slash command
+                console.print(f"[dim]→ {cmd}[/dim]")
+                ctx.slash_handler.handle_command(cmd)
+            else:
+                shell_batch.append(cmd)
+        run_shell_commands(shell_batch)
+
+        console.print("[green]✅ Quick action completed![/green]")
+    else:
+        listing = "\n".join(f"  #{qa.name} - {qa.description}" for qa in quick_actions.list_actions())
+        console.print(
+            f"[red]Unknown quick action:[/red] #{action_name}\n"
+            f"\n[yellow]Available quick actions:[/yellow]\n{listing}"
+        )
+    return True
+
+
+def _handle_at(user_input: str, ctx: _PromptContext) -> bool:
+    """Answer an image attachment: @image:/path/to/image.png message"""
+    if not user_input.startswith('@image:'):
+        return False  # Plain chat message
+
+    parts = user_input.split(' ', 1)
+    image_path = parts[0].replace('@image:', '')
+    message = parts[1] if len(parts) > 1 else "What's in this image?"
+
+    console.print("\n[cyan]🤖 Flaco:[/cyan]")
+
+    # Show thinking animation for image processing
+    with console.status("⚡ Analyzing image...", spinner="dots"):
+        response = ctx.agent.chat_with_image(message, image_path)
+
+    print_markdown(response)
+    return True
+
+
+# Input handlers by first character; a handler returns False to let the
+# input go to the agent as a normal chat message
+_PREFIX_HANDLERS: Dict[str, Callable[[str, _PromptContext], bool]] = {
+    '/': _handle_slash,
+    '#': _handle_hash,
+    '@': _handle_at,
+}
+
+
+async def _run_chat_turn(agent: "FlacoAgent", user_input: str,
+                         esc_fd: Optional[int] = None) -> Optional[Tuple[str, dict]]:
+    """Run agent.chat in a worker thread until it finishes or is interrupted
+
+    ESC read from `esc_fd` or Ctrl+C ends the wait at once, and the chat stops
+    at its next streamed chunk. Returns (response, metrics), or None if interrupted.
+    """
+    loop = asyncio.get_running_loop()
+    interrupted = loop.create_future()
+    cancel = threading.Event()
+
+    def interrupt():
+        global interrupt_requested
+        interrupt_requested = True
+        cancel.set()
+        if not interrupted.done():
+            interrupted.set_result(None)
+
+    def on_stdin():
+        try:
+            data = os.read(esc_fd, 64)
+        except OSError:
+            data = b""
+        if b"\x1b" in data:
+            interrupt()
+
+    on_stream = agent.on_stream
+    worker: Optional[int] = None
+    started = threading.Event()
+
+    def restore_stream():
+        # Only if no later turn has installed its own hook since
+        if agent.on_stream is stream:
+            agent.on_stream = on_stream
+
+    def stream(text):
+        # Abort this turn's chat once interrupted instead of letting it run on
+        # unseen; chats started elsewhere (e.g. /review) pass straight through
+        if cancel.is_set() and threading.get_ident() == worker:
+            raise KeyboardInterrupt
+        if on_stream:
+            on_stream(text)
+
+    def run_chat():
+        nonlocal worker
+        worker = threading.get_ident()
+        started.set()
+        try:
+            return agent.chat(user_input)
+        finally:
+            worker = None
+            restore_stream()
+
+    def on_chat_done(task):
+        # An abandoned chat's outcome is never read
+        if task.cancelled():
+            if not started.is_set():
+                restore_stream()  # Cancelled before run_chat started
+        else:
+            task.exception()
+
+    agent.on_stream = stream
+    chat_task = asyncio.ensure_future(asyncio.to_thread(run_chat))
+    chat_task.add_done_callback(on_chat_done)
+
+    previous_handler = signal.getsignal(signal.SIGINT)
+    try:
+        loop.add_signal_handler(signal.SIGINT, interrupt)
+    except (NotImplementedError, RuntimeError, ValueError):
+        previous_handler = None  # Not the main thread or no signal support
+    if esc_fd is not None:
+        try:
+            loop.add_reader(esc_fd, on_stdin)
+        except NotImplementedError:
+            esc_fd = None
+
+    try:
+        await asyncio.wait({chat_task, interrupted}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        if esc_fd is not None:
+            loop.remove_reader(esc_fd)
+        if previous_handler is not None:
+            loop.remove_signal_handler(signal.SIGINT)
+            signal.signal(signal.SIGINT, previous_handler)
+
+    if cancel.is_set():
+        chat_task.cancel()
+        return None
+    return chat_task.result()
+
+
 @click.command()
 @click.option(
     '--model', '-m',
@@ -190,11 +470,19 @@ def display_metrics(metrics: dict, theme_color: str):
     '--working-dir', '-d',
     help='Set working directory'
 )
-def main(model, ollama_url, headless, auto_approve, prompt, working_dir):
+@click.option(
+    '--offline',
+    is_flag=True,
+    help='Skip the update check (no network access at startup)'
+)
+def main(model, ollama_url, headless, auto_approve, prompt, working_dir, offline):
     """Flaco AI - Local AI Coding Assistant powered by Ollama"""
+    _configure_environment()
 
-    # Register signal handler for graceful interrupts
-    signal.signal(signal.SIGINT, signal_handler)
+    from .agent import FlacoAgent
+    from .commands.slash_commands import SlashCommandHandler
+    from .config.user_config import UserConfig
+    from .permissions import PermissionMode
 
     # Change working directory if specified
     if working_dir:
@@ -254,32 +542,50 @@ def main(model, ollama_url, headless, auto_approve, prompt, working_dir):
         permission_mode=permission_mode
     )
 
-    # Initialize slash command handler and quick actions
-    slash_handler = SlashCommandHandler(agent)
-    quick_actions = QuickActionManager()
-
     # Headless mode - single prompt execution
     if headless and prompt:
         response, metrics = agent.chat(prompt)
-        console.print(Markdown(response))
+        print_markdown(response)
         console.print()
         display_metrics(metrics, theme_color)
         return
 
+    # Interactive-only dependencies
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.history import FileHistory
+    from prompt_toolkit.key_binding import KeyBindings
+    from rich.live import Live
+    from rich.spinner import Spinner
+    from rich.text import Text
+    from .commands.quick_actions import QuickActionManager
+    from .utils.completers import FlacoCompleter, FlacoAutoSuggest
+    try:
+        import termios
+        import tty
+    except ImportError:
+        termios = None  # Windows: no ESC handling
+
+    # Probe Ollama while the rest of the session is set up
+    agent.llm.check_connection_async()
+
+    # One event loop for the session waits on each chat turn
+    loop = asyncio.new_event_loop()
+
+    # Initialize slash command handler and quick actions
+    slash_handler = SlashCommandHandler(agent)
+    quick_actions = QuickActionManager()
+    context = _PromptContext(agent, slash_handler, quick_actions)
+
     # Interactive mode - print banner if not first run (already printed above)
     if not is_first_run:
         print_banner(theme_color)
 
-    print_welcome(agent, theme_color)
+    print_welcome(agent, theme_color, offline=offline)
 
     # Set up prompt session with history and autocomplete
-    history_file = os.path.expanduser("~/.flaco_history")
     completer = FlacoCompleter(slash_handler, quick_actions)
     auto_suggest = FlacoAutoSuggest(slash_handler, quick_actions)
 
-    # More subtle autocomplete (Claude-style)
-    from prompt_toolkit.key_binding import KeyBindings
-
     # Custom key bindings for better multiline support
     bindings = KeyBindings()
 
@@ -300,7 +606,7 @@ def main(model, ollama_url, headless, auto_approve, prompt, working_dir):
                 buffer.insert_text('\n')
 
     session = PromptSession(
-        history=FileHistory(history_file),
+        history=FileHistory(_HISTORY_FILE),
         auto_suggest=auto_suggest,  # Use custom inline suggestions
         completer=completer,
         complete_while_typing=False,  # Only show on Tab (cleaner)
@@ -327,130 +633,34 @@ def main(model, ollama_url, headless, auto_approve, prompt, working_dir):
                     console.print(f"\n[{theme_color}]Goodbye! 👋[/{theme_color}]")
                     break
 
-                # Show available commands when starting with / or #
-                if user_input == '/' or (user_input.startswith('/') and len(user_input) == 1):
-                    # Show all slash commands
-                    console.print("\n[cyan]Available slash commands:[/cyan]")
-                    commands_list = sorted(slash_handler.commands.keys())
-                    for i in range(0, len(commands_list), 4):
-                        row = commands_list[i:i+4]
-                        console.print("  " + "  ".join(f"/{cmd:15}" for cmd in row))
-                    console.print("\n[dim]Type to filter, or /help for details[/dim]\n")
-                    continue
-
-                if user_input == '#':
-                    # Show all quick actions
-                    console.print("\n[cyan]Available quick actions:[/cyan]")
-                    for action in quick_actions.list_actions():
-                        console.print(f"  [cyan]#{action.name:20}[/cyan] [dim]{action.description}[/dim]")
-                    console.print("\n[dim]Type # followed by action name[/dim]\n")
-                    continue
-
-                # Show filtered quick actions as user types
-                if user_input.startswith('#') and len(user_input) > 1:
-                    partial = user_input[1:].lower().replace(' ', '')
-                    matches = [a for a in quick_actions.list_actions()
-                              if a.name.lower().replace(' ', '').startswith(partial)]
-                    if matches and len(matches) < len(quick_actions.list_actions()):
-                        console.print(f"\n[dim]Matching quick actions for '{user_input}':[/dim]")
-                        for action in matches:
-                            console.print(f"  [cyan]#{action.name:20}[/cyan] [dim]{action.description}[/dim]")
-                        console.print(f"\n[dim]Press Enter to see matches, or complete the name to execute[/dim]\n")
-                        continue
-
-                # Detect large paste (>15 lines)
-                lines = user_input.split('\n')
-                if len(lines) > 15:
+                # Detect large paste (>15 lines); counting newlines avoids
+                # splitting every input just to measure it
+                line_count = user_input.count('\n') + 1
+                if line_count > 15:
                     # Show paste summary
-                    console.print(f"\n[cyan]📋 Large paste detected:[/cyan] {len(lines)} lines")
+                    console.print(f"\n[cyan]📋 Large paste detected:[/cyan] {line_count} lines")
 
                     # Show preview of first and last few lines
                     preview_lines = 3
                     console.print("[dim]Preview (first 3 lines):[/dim]")
-                    for i, line in enumerate(lines[:preview_lines]):
+                    for i, line in enumerate(user_input.split('\n', preview_lines)[:preview_lines]):
                         preview = line[:80] + "..." if len(line) > 80 else line
                         console.print(f"[dim]  {i+1} | {preview}[/dim]")
 
-                    if len(lines) > preview_lines * 2:
-                        console.print(f"[dim]  ... ({len(lines) - preview_lines * 2} more lines) ...[/dim]")
+                    if line_count > preview_lines * 2:
+                        console.print(f"[dim]  ... ({line_count - preview_lines * 2} more lines) ...[/dim]")
 
                     console.print("[dim]Preview (last 3 lines):[/dim]")
-                    for i, line in enumerate(lines[-preview_lines:]):
-                        line_num = len(lines) - preview_lines + i + 1
+                    for i, line in enumerate(user_input.rsplit('\n', preview_lines)[-preview_lines:]):
+                        line_num = line_count - preview_lines + i + 1
                         preview = line[:80] + "..." if len(line) > 80 else line
                         console.print(f"[dim]  {line_num} | {preview}[/dim]")
 
-                    console.print(f"\n[green]Processing {len(lines)} lines...[/green]\n")
-
-                # Check for quick actions (#commands)
-                if user_input.startswith('#'):
-                    action_name = user_input[1:].strip()
-                    # Try exact match first, then case-insensitive
-                    action = quick_actions.get_action(action_name)
-                    if not action:
-                        # Try case-insensitive match
-                        for a in quick_actions.list_actions():
-                            if a.name.lower().replace(' ', '') == action_name.lower().replace(' ', ''):
-                                action = a
-                                break
-
-                    if action:
-                        console.print(f"[cyan]🚀 Running quick action:[/cyan] {action.name}")
-                        console.print(f"[dim]{action.description}[/dim]\n")
-
-                        for cmd in action.commands:
-                            if cmd.startswith('/'):
-                                # It's a slash command
-                                console.print(f"[dim]→ {cmd}[/dim]")
-                                slash_handler.handle_command(cmd)
-                            else:
-                                # It's a bash command - execute it directly
-                                console.print(f"[dim]→ {cmd}[/dim]")
-                                try:
-                                    result = subprocess.run(
-                                        cmd,
-                                        shell=True,
-                                        capture_output=True,
-                                        text=True,
-                                        timeout=30
-                                    )
-                                    if result.stdout:
-                                        console.print(result.stdout)
-                                    if result.stderr:
-                                        console.print(f"[yellow]{result.stderr}[/yellow]")
-                                    if result.returncode != 0:
-                                        console.print(f"[red]Command failed with exit code {result.returncode}[/red]")
-                                except subprocess.TimeoutExpired:
-                                    console.print("[red]Command timed out[/red]")
-                                except Exception as e:
-                                    console.print(f"[red]Error: {str(e)}[/red]")
-
-                        console.print("[green]✅ Quick action completed![/green]")
-                    else:
-                        console.print(f"[red]Unknown quick action:[/red] #{action_name}")
-                        console.print("\n[yellow]Available quick actions:[/yellow]")
-                        for qa in quick_actions.list_actions():
-                            console.print(f"  #{qa.name} - {qa.description}")
-                    continue
-
-                # Check for slash commands
-                if user_input.startswith('/'):
-                    slash_handler.handle_command(user_input)
-                    continue
-
-                # Check for image attachment syntax: @image:/path/to/image.png message
-                if user_input.startswith('@image:'):
-                    parts = user_input.split(' ', 1)
-                    image_path = parts[0].replace('@image:', '')
-                    message = parts[1] if len(parts) > 1 else "What's in this image?"
-
-                    console.print("\n[cyan]🤖 Flaco:[/cyan]")
+                    console.print(f"\n[green]Processing {line_count} lines...[/green]\n")
 
-                    # Show thinking animation for image processing
-                    with console.status("⚡ Analyzing image...", spinner="dots") as status:
-                        response = agent.chat_with_image(message, image_path)
-
-                    console.print(Markdown(response))
+                # Slash commands, quick actions and @image: attachments
+                handler = _PREFIX_HANDLERS.get(user_input[:1])
+                if handler is not None and handler(user_input, context):
                     continue
 
                 # Check for swarm first
@@ -474,90 +684,56 @@ def main(model, ollama_url, headless, auto_approve, prompt, working_dir):
                 global interrupt_requested
                 interrupt_requested = False
 
-                interrupted = False
-                response = None
-                metrics = None
+                stream_preview = ""
 
-                def run_chat():
-                    nonlocal response, metrics, interrupted
-                    global interrupt_requested
-                    try:
-                        # Check if interrupted before starting
-                        if interrupt_requested:
-                            interrupted = True
-                            return
-                        response, metrics = agent.chat(user_input)
-                    except (KeyboardInterrupt, Exception) as e:
-                        if isinstance(e, KeyboardInterrupt) or interrupt_requested:
-                            interrupted = True
-                        else:
-                            raise
-
-                # Run chat in a thread so we can handle interrupts
-                chat_thread = threading.Thread(target=run_chat)
-                chat_thread.daemon = True
+                # Create animated spinner with agent name and status
+                spinner = Spinner("dots", text=status_text, style="bold cyan")
 
-                try:
-                    chat_thread.start()
+                def on_stream(text):
+                    nonlocal stream_preview
+                    stream_preview = (stream_preview + text)[-200:]
+                    # Show the tail of the response; Live redraws it on its next refresh
+                    last_line = stream_preview.strip().rsplit("\n", 1)[-1][-60:]
+                    spinner.update(text=Text.assemble(status_text, "  ", (last_line, "dim")))
 
-                    # Poll for completion or interrupt (check every 0.1s)
-                    import sys
-                    import select
-                    import termios
-                    import tty
-                    from rich.live import Live
+                agent.on_stream = on_stream
 
-                    # Save terminal settings
+                try:
+                    # Read keys unbuffered so ESC can interrupt the response
                     old_settings = None
-                    try:
-                        old_settings = termios.tcgetattr(sys.stdin)
-                        tty.setcbreak(sys.stdin.fileno())
-                    except:
-                        pass  # Not a TTY, skip ESC handling
-
-                    # Create animated spinner with agent name and status
-                    spinner = Spinner("dots", text=status_text, style="bold cyan")
-
-                    with Live(spinner, console=console, refresh_per_second=10, transient=True) as live:
-                        while chat_thread.is_alive():
-                            # Check for interrupt flag
-                            if interrupt_requested:
-                                interrupted = True
-                                break
-
-                            # Check for ESC key (non-blocking)
-                            if old_settings and sys.stdin in select.select([sys.stdin], [], [], 0)[0]:
-                                char = sys.stdin.read(1)
-                                if char == '\x1b':  # ESC key
-                                    interrupt_requested = True
-                                    interrupted = True
-                                    break
-
-                            chat_thread.join(timeout=0.1)
-
-                    # Restore terminal settings
-                    if old_settings:
+                    if termios is not None:
                         try:
-                            termios.tcsetattr(sys.stdin, termios.TCSADRAIN, old_settings)
+                            old_settings = termios.tcgetattr(sys.stdin)
+                            tty.setcbreak(sys.stdin.fileno())
                         except:
-                            pass
-
-                    # Wait a bit for thread to finish
-                    chat_thread.join(timeout=0.5)
+                            pass  # Not a TTY, skip ESC handling
 
-                    if interrupted or interrupt_requested:
+                    try:
+                        with Live(spinner, console=console, refresh_per_second=4, transient=True):
+                            result = loop.run_until_complete(
+                                _run_chat_turn(agent, user_input, sys.stdin.fileno() if old_settings else None)
+                            )
+                    except Exception as e:
+                        console.print(f"\n[red]Error: {str(e)}[/red]")
+                        continue
+                    finally:
+                        # Restore terminal settings
+                        if old_settings:
+                            try:
+                                termios.tcsetattr(sys.stdin, termios.TCSADRAIN, old_settings)
+                            except:
+                                pass
+
+                    if result is None or interrupt_requested:
                         console.print("\n[yellow]⚠️  Interrupted! You can rephrase or try again.[/yellow]")
                         # Reset flag for next prompt
                         interrupt_requested = False
                         continue
 
+                    response, metrics = result
                     if response:
-                        # Clear the agent name line
-                        import sys
-                        sys.stdout.write('\033[F\033[K')
-                        sys.stdout.flush()
-
-                        console.print(Markdown(response))
+                        # The transient Live has already erased the spinner line
+                        print_markdown(response)
                         display_metrics(metrics, theme_color)
                 except KeyboardInterrupt:
                     interrupt_requested = True
@@ -3,81 +3,103 @@ Quick Actions System for Flaco
 Provides hashtag (#) shortcuts for common workflows
 """
 
-from typing import List, Optional, Dict
+from bisect import bisect_left
+from typing import List, Optional, Dict, Sequence
 from dataclasses import dataclass
 
+from ..utils.compat import DATACLASS_SLOTS
 
-@dataclass
+
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class QuickAction:
     """Represents a quick action that can be triggered with #"""
     name: str
     description: str
-    commands: List[str]
+    commands: Sequence[str]
+
+
+# Default quick actions available to all users (immutable, shared by managers)
+_DEFAULT_ACTIONS = (
+    QuickAction(
+        name="Quick commit",
+        description="Stage, commit, and push changes",
+        commands=(
+            "/git status",
+            "git add .",
+            "git commit -m 'Update'",
+            "git push"
+        )
+    ),
+    QuickAction(
+        name="Fresh start",
+        description="Clear context and start new conversation",
+        commands=("/clear",)
+    ),
+    QuickAction(
+        name="Code review",
+        description="Review recent changes",
+        commands=(
+            "git diff --stat",
+            "git diff"
+        )
+    ),
+    QuickAction(
+        name="Test and build",
+        description="Run tests and build project",
+        commands=(
+            "npm test",
+            "npm run build"
+        )
+    ),
+    QuickAction(
+        name="Status check",
+        description="Check project status",
+        commands=(
+            "/status",
+            "/git status",
+            "/todos"
+        )
+    ),
+    QuickAction(
+        name="Project scan",
+        description="Scan project and show insights",
+        commands=("/scan",)
+    ),
+)
+
+
+def _action_key(name: str) -> str:
+    """Lookup key for an action name (case and spaces ignored)"""
+    return name.lower().replace(' ', '')
+
+
+def _index_actions(actions: Sequence[QuickAction]) -> Dict[str, QuickAction]:
+    """Map lookup keys to actions (the first action wins when two names share a key)"""
+    by_key: Dict[str, QuickAction] = {}
+    for action in actions:
+        by_key.setdefault(_action_key(action.name), action)
+    return by_key
+
+
+_DEFAULT_BY_KEY = _index_actions(_DEFAULT_ACTIONS)
 
 
 class QuickActionManager:
     """Manages quick actions (#commands)"""
 
     def __init__(self):
-        self.actions: List[QuickAction] = self._default_actions()
-
-    def _default_actions(self) -> List[QuickAction]:
-        """Default quick actions available to all users"""
-        return [
-            QuickAction(
-                name="Quick commit",
-                description="Stage, commit, and push changes",
-                commands=[
-                    "/git status",
-                    "git add .",
-                    "git commit -m 'Update'",
-                    "git push"
-                ]
-            ),
-            QuickAction(
-                name="Fresh start",
-                description="Clear context and start new conversation",
-                commands=["/clear"]
-            ),
-            QuickAction(
-                name="Code review",
-                description="Review recent changes",
-                commands=[
-                    "git diff --stat",
-                    "git diff"
-                ]
-            ),
-            QuickAction(
-                name="Test and build",
-                description="Run tests and build project",
-                commands=[
-                    "npm test",
-                    "npm run build"
-                ]
-            ),
-            QuickAction(
-                name="Status check",
-                description="Check project status",
-                commands=[
-                    "/status",
-                    "/git status",
-                    "/todos"
-                ]
-            ),
-            QuickAction(
-                name="Project scan",
-                description="Scan project and show insights",
-                commands=["/scan"]
-            )
-        ]
+        self.actions: List[QuickAction] = list(_DEFAULT_ACTIONS)
+        self._by_key: Dict[str, QuickAction] = dict(_DEFAULT_BY_KEY)
+        self._keys_sorted: List[str] = sorted(self._by_key)
+
+    def _reindex(self):
+        """Rebuild the name lookups after the action list changes"""
+        self._by_key: Dict[str, QuickAction] = _index_actions(self.actions)
+        self._keys_sorted: List[str] = sorted(self._by_key)
 
     def get_action(self, name: str) -> Optional[QuickAction]:
-        """Get a quick action by name (case-insensitive)"""
-        name_lower = name.lower()
-        for action in self.actions:
-            if action.name.lower() == name_lower:
-                return action
-        return None
+        """Get a quick action by name (case-insensitive, spaces ignored)"""
+        return self._by_key.get(_action_key(name))
 
     def list_actions(self) -> List[QuickAction]:
         """Get all available quick actions"""
@@ -85,23 +107,27 @@ class QuickActionManager:
 
     def add_custom_action(self, name: str, description: str, commands: List[str]) -> QuickAction:
         """Add a custom quick action"""
-        action = QuickAction(name=name, description=description, commands=commands)
+        action = QuickAction(name=name, description=description, commands=tuple(commands))
         self.actions.append(action)
+        self._reindex()
         return action
 
     def remove_action(self, name: str) -> bool:
         """Remove a quick action by name"""
-        name_lower = name.lower()
-        for i, action in enumerate(self.actions):
-            if action.name.lower() == name_lower:
-                del self.actions[i]
-                return True
-        return False
+        action = self.get_action(name)
+        if action is None:
+            return False
+        self.actions.remove(action)
+        self._reindex()
+        return True
 
     def get_suggestions(self, partial: str) -> List[QuickAction]:
-        """Get action suggestions based on partial name"""
-        partial_lower = partial.lower()
-        return [
-            action for action in self.actions
-            if partial_lower in action.name.lower()
-        ]
+        """Get actions whose name starts with partial (case and spaces ignored)"""
+        prefix = _action_key(partial)
+        keys = self._keys_sorted
+        suggestions = []
+        for i in range(bisect_left(keys, prefix), len(keys)):
+            if not keys[i].startswith(prefix):
+                break
+            suggestions.append(self._by_key[keys[i]])
+        return suggestions
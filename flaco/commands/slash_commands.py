@@ -1,94 +1,393 @@
 import os
-import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Dict, Callable, Optional
-from rich.console import Console
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional, Tuple
+from rich.console import Group
 from rich.table import Table
 from rich.panel import Panel
-from rich.markdown import Markdown
-from rich.prompt import Prompt, Confirm
+from rich.text import Text
 from ..permissions import PermissionMode
-from ..agents.custom_agents import CustomAgentManager
-from .quick_actions import QuickActionManager
-from ..config.user_config import UserConfig
-from ..utils.snippets import snippet_library, SnippetCategory
+from ..ui import CONSOLE
+from ..utils import fastjson
+
+# Markdown, prompts, the agent/action managers, user config and snippets are
+# imported by the commands that use them, so creating the handler stays cheap
+
+# Seconds a /models listing is reused, so "/models" then "/models 3" is one request
+MODELS_CACHE_TTL = 5.0
+
+# Seconds /run-update waits for pipx
+UPDATE_TIMEOUT = 120
+
+# Checkout root, where docs/ templates live in a development install
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+@lru_cache(maxsize=64)
+def _read_text(path: str, mtime_ns: int) -> str:
+    """Read a file, reusing the last read while its mtime is unchanged"""
+    return Path(path).read_text(encoding="utf-8")
+
+
+# Threads used by /review to count and read files
+REVIEW_IO_WORKERS = 8
+
+# Share of the model's context window a single /review request may use
+REVIEW_PROMPT_SHARE = 0.6
+
+_REVIEW_PROMPT = """I need you to perform a comprehensive code review of the following Python files from: {path}
+
+Please analyze these {count} files and provide a detailed review covering:
+1. **Code Quality**: Maintainability, readability, code smells
+2. **Bugs & Issues**: Logic errors, edge cases, potential runtime errors
+3. **Security**: Vulnerabilities, OWASP concerns, input validation
+4. **Performance**: Inefficiencies, optimization opportunities
+5. **Best Practices**: Design patterns, Pythonic code, conventions
+
+For each issue found, provide:
+- File path and line number
+- Specific code example
+- Explanation of the issue
+- Recommended fix with code snippet
+
+Files to review:
+"""
+
+
+def _batch_by_tokens(sections: List[str], budget: int) -> List[List[str]]:
+    """Group sections in order so each group stays within budget tokens
+
+    A section larger than the budget gets a group of its own, and a budget
+    of 0 or less puts everything in one group.
+    """
+    from ..context.window import count_tokens
+
+    if budget <= 0:
+        return [list(sections)] if sections else []
+
+    batches: List[List[str]] = []
+    used = budget
+    for section in sections:
+        tokens = count_tokens(section)
+        if used + tokens > budget:
+            batches.append([])
+            used = 0
+        batches[-1].append(section)
+        used += tokens
+    return batches
+
+
+# Shown under the first /review file listing
+_SELECTION_HELP = (
+    "\n[dim]Selection format:[/dim]\n"
+    "[dim]  • Individual: 1,3,5[/dim]\n"
+    "[dim]  • Range: 1-10[/dim]\n"
+    "[dim]  • All: all[/dim]\n"
+    "[dim]  • Default: Press Enter for first 10[/dim]\n"
+)
+
+# One entry of a /review file selection: "3" or "1-10"
+_SELECTION_RE = re.compile(r"\s*(\d+)(?:\s*-\s*(\d+))?\s*")
+
+# Directories /review doesn't descend into, besides hidden ones
+_REVIEW_SKIP_DIRS = frozenset({"__pycache__", "node_modules"})
+
+
+def _find_python_files(root: str) -> List[Tuple[str, int]]:
+    """Python files under root as (path, size), most recently modified first"""
+    found = []
+    pending = [root]
+    while pending:
+        try:
+            entries = os.scandir(pending.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in _REVIEW_SKIP_DIRS:
+                        pending.append(entry.path)
+                elif entry.name.endswith('.py') and entry.is_file():
+                    stat = entry.stat()
+                    found.append((-stat.st_mtime, entry.path, stat.st_size))
+    found.sort()
+    return [(file_path, size) for _, file_path, size in found]
+
+
+# /review counts lines in files smaller than this and estimates the rest
+EXACT_LINE_COUNT_LIMIT = 64 * 1024
+_BYTES_PER_LINE = 40
+
+# Bytes read at a time when counting lines for the /review listing
+_LINE_COUNT_CHUNK = 128 * 1024
+
+
+def _count_lines(path: str) -> int:
+    """Count lines in a file without decoding or holding it in memory"""
+    lines = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_LINE_COUNT_CHUNK), b""):
+            lines += chunk.count(b"\n")
+            last = chunk[-1:]
+    return lines + (last != b"\n")
+
+
+def _count_lines_or_zero(path: str) -> int:
+    """_count_lines, with 0 for files that can't be read"""
+    try:
+        return _count_lines(path)
+    except OSError:
+        return 0
+
+
+# /permissions argument -> mode
+_PERMISSION_MODES = MappingProxyType({
+    "interactive": PermissionMode.INTERACTIVE,
+    "auto": PermissionMode.AUTO_APPROVE,
+    "headless": PermissionMode.HEADLESS
+})
+
+# /todos status -> icon
+_TODO_ICONS = MappingProxyType({
+    "pending": "⏳",
+    "in_progress": "🔄",
+    "completed": "✅"
+})
+
+# Periods accepted by /stats and /recap
+_PERIODS = frozenset(("day", "week", "month", "year"))
+
+# /stats period -> heading
+_PERIOD_NAMES = MappingProxyType({
+    "day": "Today",
+    "week": "This Week",
+    "month": "This Month",
+    "year": "This Year"
+})
+
+# /setup theme colors, offered by name or by number
+_COLOR_OPTIONS = (
+    ("cyan", "Cyan (Default) - Cool and professional"),
+    ("green", "Green - Fresh and vibrant"),
+    ("blue", "Blue - Calm and trustworthy"),
+    ("magenta", "Magenta - Bold and creative"),
+    ("yellow", "Yellow - Bright and energetic"),
+    ("white", "White - Clean and minimal")
+)
+_COLOR_MAP = MappingProxyType({str(i): color for i, (color, _) in enumerate(_COLOR_OPTIONS, 1)})
+_COLOR_CHOICES = tuple(color for color, _ in _COLOR_OPTIONS) + tuple(_COLOR_MAP)
+_COLOR_MENU = "\n".join(
+    f"  {i}. [{color}]●[/{color}] {desc}" for i, (color, desc) in enumerate(_COLOR_OPTIONS, 1)
+)
+
+
+def _fact_table(title: Optional[str] = None) -> Table:
+    """Borderless label/value table for report panels"""
+    table = Table(title=title, title_justify="left", title_style="bold", show_header=False, box=None, padding=(0, 1))
+    table.add_column(style="bold")
+    table.add_column()
+    return table
+
+
+# /context usage bars, indexed by the number of filled blocks (0-20)
+_USAGE_BARS = tuple("█" * n + "░" * (20 - n) for n in range(21))
+
+# /history header per message role
+_ROLE_HEADERS = {
+    "user": "\n[bold cyan]User (#{}):[/bold cyan]",
+    "assistant": "\n[bold green]Assistant (#{}):[/bold green]",
+    "tool": "\n[bold yellow]Tool Result (#{}):[/bold yellow]",
+}
+
+# Rows of the /help table
+_HELP_COMMANDS = (
+    ("/help", "Show this help message"),
+    ("/setup", "🎯 Interactive setup wizard (recommended for first-time users)"),
+    ("/exit, /quit", "Exit Flaco"),
+    ("/clear", "Clear chat context and screen"),
+    ("/reset", "Reset conversation history"),
+    ("/status", "Show current status and statistics"),
+    ("/init", "Create a CLAUDE.md codebase guide (and optional FLACO.md)"),
+    ("/install-github-app", "Scaffold a Claude GitHub Actions workflow"),
+    ("/context [summary]", "Show context status (and file contents unless 'summary')"),
+    ("/costs", "Cost guidance for your current provider"),
+    ("/model [name]", "Change the current model"),
+    ("/models [number|name]", "List and switch between Ollama models"),
+    ("/history", "Show conversation history"),
+    ("/permissions [mode]", "Change permission mode (interactive/auto/headless)"),
+    ("/todos", "Show current todo list"),
+    ("/scan", "🌟 Scan project and show intelligence insights"),
+    ("/project [action]", "🚀 Manage projects (list/create/switch/info)"),
+    ("/git [action]", "🔄 Git operations (status/commit/push/history)"),
+    ("/stats [period]", "📊 Show contribution stats (day/week/month/year)"),
+    ("/recap [period]", "📈 Generate activity recap (day/week/month/year)"),
+    ("/review <path>", "🔍 Comprehensive code review of a directory"),
+    ("/refresh", "🔄 Check FLACO.md status"),
+    ("/agent [action]", "🤖 Manage custom agents (create/list/switch/edit/delete/current)"),
+    ("/actions", "⚡ Show available quick actions (#commands)"),
+    ("/snippet [name|search|category]", "📋 Browse and insert code snippets"),
+    ("/reset-config", "🔄 Reset configuration to defaults"),
+    ("/check-update", "📦 Check for Flaco updates"),
+    ("/run-update", "⬆️  Auto-update Flaco to latest version"),
+    ("/install-github-app", "Set up Claude GitHub Actions workflow"),
+)
+
+
+@lru_cache(maxsize=1)
+def _build_help_table() -> Table:
+    """Build the /help table once; its content never changes"""
+    table = Table(title="Available Commands", show_header=True)
+    table.add_column("Command", style="cyan")
+    table.add_column("Description", style="white")
+    for cmd, desc in _HELP_COMMANDS:
+        table.add_row(cmd, desc)
+    return table
 
 
 class SlashCommandHandler:
     """Handles slash commands for Flaco"""
 
+    # Built-in commands, mapped to the name of the method that runs them
+    COMMANDS: Dict[str, str] = {
+        "help": "cmd_help",
+        "exit": "cmd_exit",
+        "quit": "cmd_exit",
+        "clear": "cmd_clear",
+        "reset": "cmd_reset",
+        "status": "cmd_status",
+        "init": "cmd_init",
+        "context": "cmd_context",
+        "costs": "cmd_costs",
+        "model": "cmd_model",
+        "models": "cmd_models",
+        "history": "cmd_history",
+        "permissions": "cmd_permissions",
+        "todos": "cmd_todos",
+        "scan": "cmd_scan",
+        "project": "cmd_project",
+        "git": "cmd_git",
+        "stats": "cmd_stats",
+        "recap": "cmd_recap",
+        "review": "cmd_review",
+        "refresh": "cmd_refresh",
+        "agent": "cmd_agent",
+        "actions": "cmd_actions",
+        "setup": "cmd_setup",
+        "reset-config": "cmd_reset_config",
+        "snippet": "cmd_snippet",
+        "snippets": "cmd_snippet",
+        "check-update": "cmd_check_update",
+        "run-update": "cmd_run_update",
+        "install-github-app": "cmd_install_github_app",
+    }
+
+    # Subcommands of /project and /git, mapped to the methods that run them
+    PROJECT_ACTIONS: Dict[str, str] = {
+        "list": "_project_list",
+        "create": "_project_create",
+        "switch": "_project_switch",
+        "info": "_project_info",
+    }
+    GIT_ACTIONS: Dict[str, str] = {
+        "status": "_git_status",
+        "commit": "_git_commit",
+        "push": "_git_push",
+        "history": "_git_history",
+    }
+
     def __init__(self, agent):
         self.agent = agent
-        self.console = Console()
-        self.agent_manager = CustomAgentManager()
-        self.quick_actions = QuickActionManager()
+        self.console = CONSOLE
 
-        # Initialize theme_color with safe fallback
-        try:
-            user_config = UserConfig()
-            self.theme_color = user_config.theme_color
-        except:
-            self.theme_color = "cyan"  # Safe default
-
-        self.commands: Dict[str, Callable] = {
-            "help": self.cmd_help,
-            "exit": self.cmd_exit,
-            "quit": self.cmd_exit,
-            "clear": self.cmd_clear,
-            "reset": self.cmd_reset,
-            "status": self.cmd_status,
-            "init": self.cmd_init,
-            "context": self.cmd_context,
-            "costs": self.cmd_costs,
-            "model": self.cmd_model,
-            "models": self.cmd_models,
-            "history": self.cmd_history,
-            "permissions": self.cmd_permissions,
-            "todos": self.cmd_todos,
-            "scan": self.cmd_scan,
-            "project": self.cmd_project,
-            "git": self.cmd_git,
-            "stats": self.cmd_stats,
-            "recap": self.cmd_recap,
-            "review": self.cmd_review,
-            "refresh": self.cmd_refresh,
-            "agent": self.cmd_agent,
-            "actions": self.cmd_actions,
-            "setup": self.cmd_setup,
-            "reset-config": self.cmd_reset_config,
-            "snippet": self.cmd_snippet,
-            "snippets": self.cmd_snippet,
-            "check-update": self.cmd_check_update,
-            "run-update": self.cmd_run_update,
-        }
+        # Custom commands from .flaco/commands/, checked after the built-ins
+        self._custom_commands: Dict[str, Path] = {}
+        self.commands: Dict[str, object] = self.COMMANDS
+
+        # Working directory, taken once per command by handle_command
+        self._cwd: Optional[Path] = None
+
+        # Last /models listing: (base_url, time, models, models by name)
+        self._models_cache: Optional[Tuple[str, float, List[Dict[str, Any]], Dict[str, Any]]] = None
+
+        # Read tool results for the running /review session, by path
+        self._read_cache: Dict[str, Any] = {}
 
         # Load custom commands from .flaco/commands/ if they exist
         self._load_custom_commands()
 
+    @cached_property
+    def agent_manager(self):
+        """Custom agent manager, created on first /agent command"""
+        from ..agents.custom_agents import CustomAgentManager
+        return CustomAgentManager()
+
+    @cached_property
+    def quick_actions(self):
+        """Quick action manager, created on first /actions command"""
+        from .quick_actions import QuickActionManager
+        return QuickActionManager()
+
+    @cached_property
+    def theme_color(self) -> str:
+        """Theme color from the user config, read on first use"""
+        try:
+            from ..config.user_config import UserConfig
+            return UserConfig().theme_color
+        except:
+            return "cyan"  # Safe default
+
     def handle_command(self, command_str: str):
         """Handle a slash command"""
-        parts = command_str[1:].split(maxsplit=1)
-        command = parts[0].lower()
-        args = parts[1] if len(parts) > 1 else ""
+        # Fast path: a lowercase built-in followed by a single space
+        space = command_str.find(' ')
+        command = command_str[1:space] if space != -1 else command_str[1:]
+        args = command_str[space + 1:].lstrip() if space != -1 else ""
+        method_name = self.COMMANDS.get(command)
+        if method_name is None:
+            parts = command_str[1:].split(maxsplit=1)
+            command = parts[0].lower() if parts else ""
+            args = parts[1] if len(parts) > 1 else ""
+            method_name = self.COMMANDS.get(command)
+
+        self._cwd = Path.cwd()
+        try:
+            if method_name is not None:
+                getattr(self, method_name)(args)
+            elif command in self._custom_commands:
+                self._execute_custom_command(self._custom_commands[command], args)
+            else:
+                self.console.print(f"[red]Unknown command: /{command}[/red]")
+                self.console.print("[yellow]Type /help to see available commands[/yellow]")
+        finally:
+            self._cwd = None
 
-        if command in self.commands:
-            self.commands[command](args)
-        else:
-            self.console.print(f"[red]Unknown command: /{command}[/red]")
-            self.console.print("[yellow]Type /help to see available commands[/yellow]")
+    @property
+    def cwd(self) -> Path:
+        """Working directory of the running command"""
+        return self._cwd if self._cwd is not None else Path.cwd()
 
     def _load_custom_commands(self):
         """Load custom slash commands from .flaco/commands/"""
         commands_dir = Path.cwd() / ".flaco" / "commands"
         if commands_dir.exists():
             for cmd_file in commands_dir.glob("*.md"):
-                cmd_name = cmd_file.stem
-                self.commands[cmd_name] = lambda args, f=cmd_file: self._execute_custom_command(f, args)
+                self._custom_commands[cmd_file.stem] = cmd_file
+        if self._custom_commands:
+            # Everything that can be typed after '/', for listings and completion
+            self.commands = {**self.COMMANDS, **self._custom_commands}
 
     def _execute_custom_command(self, file_path: Path, args: str):
         """Execute a custom command from markdown file"""
-        with open(file_path, 'r') as f:
-            prompt = f.read()
+        from rich.markdown import Markdown
+
+        prompt = _read_text(str(file_path), os.stat(file_path).st_mtime_ns)
 
         # Replace {args} placeholder if present
         if "{args}" in prompt:
@@ -105,47 +404,8 @@ class SlashCommandHandler:
 
     def cmd_help(self, args: str):
         """Show help information"""
-        table = Table(title="Available Commands", show_header=True)
-        table.add_column("Command", style="cyan")
-        table.add_column("Description", style="white")
-
-        commands_help = [
-            ("/help", "Show this help message"),
-            ("/setup", "🎯 Interactive setup wizard (recommended for first-time users)"),
-            ("/exit, /quit", "Exit Flaco"),
-            ("/clear", "Clear chat context and screen"),
-            ("/reset", "Reset conversation history"),
-            ("/status", "Show current status and statistics"),
-            ("/init", "Create a CLAUDE.md codebase guide (and optional FLACO.md)"),
-            ("/install-github-app", "Scaffold a Claude GitHub Actions workflow"),
-            ("/context [summary]", "Show context status (and file contents unless 'summary')"),
-            ("/costs", "Cost guidance for your current provider"),
-            ("/model [name]", "Change the current model"),
-            ("/models [number|name]", "List and switch between Ollama models"),
-            ("/history", "Show conversation history"),
-            ("/permissions [mode]", "Change permission mode (interactive/auto/headless)"),
-            ("/todos", "Show current todo list"),
-            ("/scan", "🌟 Scan project and show intelligence insights"),
-            ("/project [action]", "🚀 Manage projects (list/create/switch/info)"),
-            ("/git [action]", "🔄 Git operations (status/commit/push/history)"),
-            ("/stats [period]", "📊 Show contribution stats (day/week/month/year)"),
-            ("/recap [period]", "📈 Generate activity recap (day/week/month/year)"),
-            ("/review <path>", "🔍 Comprehensive code review of a directory"),
-            ("/refresh", "🔄 Check FLACO.md status"),
-            ("/agent [action]", "🤖 Manage custom agents (create/list/switch/edit/delete/current)"),
-            ("/actions", "⚡ Show available quick actions (#commands)"),
-            ("/snippet [name|search|category]", "📋 Browse and insert code snippets"),
-            ("/reset-config", "🔄 Reset configuration to defaults"),
-            ("/check-update", "📦 Check for Flaco updates"),
-            ("/run-update", "⬆️  Auto-update Flaco to latest version"),
-            ("/install-github-app", "Set up Claude GitHub Actions workflow"),
-        ]
-
-        for cmd, desc in commands_help:
-            table.add_row(cmd, desc)
-
         self.console.print("\n")
-        self.console.print(table)
+        self.console.print(_build_help_table())
         self.console.print("\n[dim]Custom commands can be added in .flaco/commands/[/dim]")
         self.console.print("[cyan]💡 Tip:[/cyan] Type [bold]#[/bold] for quick actions (e.g., #Quick commit, #Fresh start)\n")
 
@@ -157,7 +417,7 @@ class SlashCommandHandler:
     def cmd_clear(self, args: str):
         """Clear the screen"""
         self.agent.reset_conversation()
-        os.system('clear' if os.name != 'nt' else 'cls')
+        self.console.clear()
         self.console.print("[green]✅ Chat context cleared[/green]")
 
     def cmd_reset(self, args: str):
@@ -167,18 +427,22 @@ class SlashCommandHandler:
 
     def cmd_status(self, args: str):
         """Show current status"""
+        from rich.markdown import Markdown
+
         status_info = f"""
 **Ollama Server:** {self.agent.llm.base_url}
 **Model:** {self.agent.llm.model}
 **Permission Mode:** {self.agent.permission_manager.mode.value}
 **Conversation:** {self.agent.get_conversation_summary()}
 **FLACO.md:** {'✅ Loaded' if self.agent.context_loader.has_context() else '❌ Not found'}
-**Working Directory:** {os.getcwd()}
+**Working Directory:** {self.cwd}
 """
         self.console.print(Panel(Markdown(status_info), title="Status", border_style="cyan"))
 
     def cmd_context(self, args: str):
         """Show FLACO.md context"""
+        from rich.markdown import Markdown
+
         context_info = self.agent.get_context_info()
         usage_bar = self._build_usage_bar(context_info["percentage"])
 
@@ -207,7 +471,7 @@ class SlashCommandHandler:
         """Create CLAUDE.md (and optionally FLACO.md) in the current directory"""
         force = "--force" in args
         include_flaco = "--flaco" in args
-        cwd = Path(os.getcwd())
+        cwd = self.cwd
 
         claude_path = cwd / "CLAUDE.md"
         claude_template = self._load_template("CLAUDE.md.template", self._default_claude_template())
@@ -221,12 +485,12 @@ class SlashCommandHandler:
 
         if include_flaco:
             template_path = None
-            repo_template = Path(os.getcwd()) / "docs" / "FLACO.md.template"
+            repo_template = cwd / "docs" / "FLACO.md.template"
             if repo_template.exists():
                 template_path = str(repo_template)
 
             result = self.agent.create_context_file(
-                target_dir=os.getcwd(),
+                target_dir=str(cwd),
                 template_path=template_path,
                 overwrite=force
             )
@@ -254,6 +518,8 @@ class SlashCommandHandler:
 
     def cmd_costs(self, args: str):
         """Show cost guidance"""
+        from rich.markdown import Markdown
+
         cost_message = (
             "💰 **Cost overview**\n\n"
             "Running on local models (Ollama) — API cost: **$0**. "
@@ -274,7 +540,7 @@ class SlashCommandHandler:
     def cmd_models(self, args: str):
         """List available models and optionally switch"""
         try:
-            models = self.agent.llm.list_models()
+            models, by_name = self._list_models()
             if not models:
                 self.console.print("[yellow]No models found[/yellow]")
                 return
@@ -296,8 +562,7 @@ class SlashCommandHandler:
                         return
                 else:
                     # Try to find by name
-                    matching_model = next((m for m in models if m.get("name") == model_arg), None)
-                    if matching_model:
+                    if model_arg in by_name:
                         self.agent.llm.model = model_arg
                         self.console.print(f"[green]✅ Switched to:[/green] {model_arg}")
                         return
@@ -338,20 +603,17 @@ class SlashCommandHandler:
             return
 
         for i, msg in enumerate(self.agent.messages, 1):
-            role = msg.get("role", "unknown")
-            content = msg.get("content", "")
-
-            if role == "user":
-                self.console.print(f"\n[bold cyan]User (#{i}):[/bold cyan]")
-            elif role == "assistant":
-                self.console.print(f"\n[bold green]Assistant (#{i}):[/bold green]")
-            elif role == "tool":
-                self.console.print(f"\n[bold yellow]Tool Result (#{i}):[/bold yellow]")
+            header = _ROLE_HEADERS.get(msg.get("role", "unknown"))
+            if header:
+                self.console.print(header.format(i))
 
+            content = self.agent.message_content(msg)
             if content:
-                # Truncate long messages
+                # Truncate long messages; slicing first keeps Rich from
+                # measuring a huge tool output just to cut it. Text skips
+                # markup parsing, so brackets in messages print as-is.
                 display_content = content[:500] + "..." if len(content) > 500 else content
-                self.console.print(display_content)
+                self.console.print(Text(display_content))
 
     def cmd_permissions(self, args: str):
         """Change permission mode"""
@@ -360,15 +622,10 @@ class SlashCommandHandler:
             self.console.print("\n[dim]Available modes: interactive, auto, headless[/dim]")
             return
 
-        mode_map = {
-            "interactive": PermissionMode.INTERACTIVE,
-            "auto": PermissionMode.AUTO_APPROVE,
-            "headless": PermissionMode.HEADLESS
-        }
-
         mode_str = args.strip().lower()
-        if mode_str in mode_map:
-            self.agent.set_permission_mode(mode_map[mode_str])
+        mode = _PERMISSION_MODES.get(mode_str)
+        if mode is not None:
+            self.agent.set_permission_mode(mode)
             self.console.print(f"[green]✅ Permission mode changed to:[/green] {mode_str}")
         else:
             self.console.print(f"[red]Invalid mode: {mode_str}[/red]")
@@ -376,14 +633,13 @@ class SlashCommandHandler:
 
     def cmd_todos(self, args: str):
         """Show current todo list"""
-        todo_file = os.path.join(os.getcwd(), ".flaco_todos.json")
-        if not os.path.exists(todo_file):
+        try:
+            with open(self.cwd / ".flaco_todos.json", 'rb') as f:
+                todos = fastjson.loads(f.read())
+        except FileNotFoundError:
             self.console.print("[yellow]No active todo list[/yellow]")
             return
 
-        with open(todo_file, 'r') as f:
-            todos = json.load(f)
-
         if not todos:
             self.console.print("[yellow]Todo list is empty[/yellow]")
             return
@@ -393,14 +649,8 @@ class SlashCommandHandler:
         table.add_column("Status", style="white")
         table.add_column("Task", style="cyan")
 
-        status_icons = {
-            "pending": "⏳",
-            "in_progress": "🔄",
-            "completed": "✅"
-        }
-
         for i, todo in enumerate(todos, 1):
-            icon = status_icons.get(todo["status"], "❓")
+            icon = _TODO_ICONS.get(todo["status"], "❓")
             table.add_row(str(i), icon, todo["content"])
 
         self.console.print("\n")
@@ -409,6 +659,7 @@ class SlashCommandHandler:
 
     def cmd_scan(self, args: str):
         """Scan project and show intelligence insights"""
+        from rich.markdown import Markdown
         from ..intelligence import ProjectScanner
 
         self.console.print("\n[cyan]🔍 Scanning project...[/cyan]\n")
@@ -420,116 +671,130 @@ class SlashCommandHandler:
             # Health score with color
             health_color = "green" if insight.health_score >= 80 else "yellow" if insight.health_score >= 60 else "red"
 
-            # Create summary
-            summary = f"""
-## 📊 Project Intelligence Report
-
-**Type:** {insight.project_type.value.upper()}
-**Framework:** {insight.framework or 'None detected'}
-**Languages:** {', '.join(insight.languages)}
-**Health Score:** [{health_color}]{insight.health_score:.0f}/100[/{health_color}]
-
-### 📈 Statistics
-- **Files:** {insight.file_count:,} code files
-- **Lines:** {insight.total_lines:,} lines of code
-- **Dependencies:** {len(insight.dependencies)} packages
-
-### 🔧 Configuration
-- **Entry Points:** {', '.join(insight.entry_points) if insight.entry_points else 'Not detected'}
-- **Test Framework:** {insight.test_framework or '❌ None'}
-- **CI/CD:** {'✅ Configured' if insight.has_ci else '❌ Not configured'}
-- **Docker:** {'✅ Yes' if insight.has_docker else '❌ No'}
-- **Tests:** {'✅ Yes' if insight.has_tests else '❌ No tests found'}
-
-### 💡 Suggestions
-"""
+            overview = _fact_table()
+            overview.add_row("Type:", insight.project_type.value.upper())
+            overview.add_row("Framework:", insight.framework or 'None detected')
+            overview.add_row("Languages:", ', '.join(insight.languages))
+            overview.add_row("Health Score:", Text(f"{insight.health_score:.0f}/100", style=health_color))
+
+            statistics = _fact_table("📈 Statistics")
+            statistics.add_row("Files:", f"{insight.file_count:,} code files")
+            statistics.add_row("Lines:", f"{insight.total_lines:,} lines of code")
+            statistics.add_row("Dependencies:", f"{len(insight.dependencies)} packages")
+
+            configuration = _fact_table("🔧 Configuration")
+            configuration.add_row("Entry Points:", ', '.join(insight.entry_points) if insight.entry_points else 'Not detected')
+            configuration.add_row("Test Framework:", insight.test_framework or '❌ None')
+            configuration.add_row("CI/CD:", '✅ Configured' if insight.has_ci else '❌ Not configured')
+            configuration.add_row("Docker:", '✅ Yes' if insight.has_docker else '❌ No')
+            configuration.add_row("Tests:", '✅ Yes' if insight.has_tests else '❌ No tests found')
+
+            # Only the free-form suggestions go through Markdown
             if insight.suggestions:
-                for suggestion in insight.suggestions:
-                    summary += f"- {suggestion}\n"
+                suggestions = "".join(f"- {suggestion}\n" for suggestion in insight.suggestions)
             else:
-                summary += "- ✨ Project looks great! No suggestions at this time.\n"
-
-            self.console.print(Panel(
-                Markdown(summary),
-                title="🌟 Project Intelligence",
-                border_style="cyan"
-            ))
+                suggestions = "- ✨ Project looks great! No suggestions at this time.\n"
+
+            report = Group(
+                Text("📊 Project Intelligence Report", style="bold"), "",
+                overview, "",
+                statistics, "",
+                configuration, "",
+                Text("💡 Suggestions", style="bold"),
+                Markdown(suggestions)
+            )
+            self.console.print(Panel(report, title="🌟 Project Intelligence", border_style="cyan"))
 
         except Exception as e:
             self.console.print(f"[red]Error scanning project: {str(e)}[/red]")
 
+    @staticmethod
+    def _split_action(args: str, default: str):
+        """Split '<action> <rest>' into a lowercased action and the rest"""
+        parts = args.split(maxsplit=1)
+        action = parts[0].lower() if parts else default
+        return action, parts[1] if len(parts) > 1 else ""
+
     def cmd_project(self, args: str):
         """Manage projects"""
         from ..projects import ProjectManager
 
-        pm = ProjectManager()
+        action, rest = self._split_action(args, "list")
+        method_name = self.PROJECT_ACTIONS.get(action)
+        if method_name is None:
+            self.console.print("[yellow]Available actions: list, create, switch, info[/yellow]")
+            return
 
-        if not args or args == "list":
-            projects = pm.list_projects()
+        getattr(self, method_name)(ProjectManager(), rest)
 
-            if not projects:
-                self.console.print("[yellow]No projects yet. Create one with: /project create <name>[/yellow]")
-                return
+    def _project_list(self, pm, rest: str):
+        """List projects, marking the current one"""
+        projects = pm.list_projects()
 
-            table = Table(title="Flaco Projects", show_header=True)
-            table.add_column("Name", style="cyan")
-            table.add_column("Type", style="white")
-            table.add_column("Path", style="dim")
-            table.add_column("Last Accessed", style="green")
-
-            for proj in projects:
-                current_marker = "→ " if pm.current_project and pm.current_project.name == proj.name else ""
-                last_accessed = proj.last_accessed.split('T')[0] if proj.last_accessed else "N/A"
-                table.add_row(
-                    current_marker + proj.name,
-                    proj.project_type,
-                    proj.path[:40] + "..." if len(proj.path) > 40 else proj.path,
-                    last_accessed
-                )
+        if not projects:
+            self.console.print("[yellow]No projects yet. Create one with: /project create <name>[/yellow]")
+            return
 
-            self.console.print("\n")
-            self.console.print(table)
-            self.console.print("\n[dim]Commands: /project create/switch/info/delete[/dim]\n")
+        table = Table(title="Flaco Projects", show_header=True)
+        table.add_column("Name", style="cyan")
+        table.add_column("Type", style="white")
+        table.add_column("Path", style="dim", max_width=43, no_wrap=True, overflow="ellipsis")
+        table.add_column("Last Accessed", style="green")
 
-        elif args.startswith("create"):
-            parts = args.split(maxsplit=1)
-            if len(parts) < 2:
-                self.console.print("[red]Usage: /project create <name>[/red]")
-                return
+        for proj in projects:
+            current_marker = "→ " if pm.current_project and pm.current_project.name == proj.name else ""
+            last_accessed = proj.last_accessed.split('T')[0] if proj.last_accessed else "N/A"
+            table.add_row(
+                current_marker + proj.name,
+                proj.project_type,
+                proj.path,
+                last_accessed
+            )
 
-            name = parts[1]
-            path = os.path.join(os.getcwd(), name)
+        self.console.print("\n")
+        self.console.print(table)
+        self.console.print("\n[dim]Commands: /project create/switch/info/delete[/dim]\n")
 
-            try:
-                project = pm.create_project(name, path)
-                self.console.print(f"[green]✅ Created project: {name}[/green]")
-                self.console.print(f"[dim]Path: {path}[/dim]")
-            except Exception as e:
-                self.console.print(f"[red]Error: {str(e)}[/red]")
+    def _project_create(self, pm, name: str):
+        """Create a project in a new directory under the working directory"""
+        if not name:
+            self.console.print("[red]Usage: /project create <name>[/red]")
+            return
 
-        elif args.startswith("switch"):
-            parts = args.split(maxsplit=1)
-            if len(parts) < 2:
-                self.console.print("[red]Usage: /project switch <name>[/red]")
-                return
+        path = str(self.cwd / name)
 
-            name = parts[1]
-            try:
-                project = pm.switch_project(name)
-                self.console.print(f"[green]✅ Switched to project: {name}[/green]")
-                self.console.print(f"[dim]Path: {project.path}[/dim]")
-            except Exception as e:
-                self.console.print(f"[red]Error: {str(e)}[/red]")
+        try:
+            pm.create_project(name, path)
+            self.console.print(f"[green]✅ Created project: {name}[/green]")
+            self.console.print(f"[dim]Path: {path}[/dim]")
+        except Exception as e:
+            self.console.print(f"[red]Error: {str(e)}[/red]")
 
-        elif args.startswith("info"):
-            if not pm.current_project:
-                self.console.print("[yellow]No active project[/yellow]")
-                return
+    def _project_switch(self, pm, name: str):
+        """Make another project the current one"""
+        if not name:
+            self.console.print("[red]Usage: /project switch <name>[/red]")
+            return
 
-            proj = pm.current_project
-            stats = pm.get_project_stats(proj.name)
+        try:
+            project = pm.switch_project(name)
+            self.console.print(f"[green]✅ Switched to project: {name}[/green]")
+            self.console.print(f"[dim]Path: {project.path}[/dim]")
+        except Exception as e:
+            self.console.print(f"[red]Error: {str(e)}[/red]")
 
-            info = f"""
+    def _project_info(self, pm, rest: str):
+        """Show details and statistics for the current project"""
+        from rich.markdown import Markdown
+
+        if not pm.current_project:
+            self.console.print("[yellow]No active project[/yellow]")
+            return
+
+        proj = pm.current_project
+        stats = pm.get_project_stats(proj.name)
+
+        info = f"""
 **Name:** {proj.name}
 **Type:** {proj.project_type}
 **Description:** {proj.description or 'No description'}
@@ -547,10 +812,7 @@ class SlashCommandHandler:
 **Created:** {proj.created_at.split('T')[0]}
 **Last Accessed:** {proj.last_accessed.split('T')[0]}
 """
-            self.console.print(Panel(Markdown(info), title=f"📁 {proj.name}", border_style="cyan"))
-
-        else:
-            self.console.print("[yellow]Available actions: list, create, switch, info[/yellow]")
+        self.console.print(Panel(Markdown(info), title=f"📁 {proj.name}", border_style="cyan"))
 
     def cmd_git(self, args: str):
         """Git operations"""
@@ -562,63 +824,69 @@ class SlashCommandHandler:
             self.console.print("[yellow]Not a git repository. Initialize with: git init[/yellow]")
             return
 
-        if not args or args == "status":
-            changes = git.get_changes()
-            stats = git.get_repo_stats()
+        action, rest = self._split_action(args, "status")
+        method_name = self.GIT_ACTIONS.get(action)
+        if method_name is None:
+            self.console.print("[yellow]Available actions: status, commit, push, history[/yellow]")
+            return
 
-            self.console.print(f"\n[cyan]📊 Git Status[/cyan]")
-            self.console.print(f"Branch: [green]{stats['branch']}[/green]")
-            self.console.print(f"Total Commits: {stats['total_commits']}")
-            self.console.print(f"Uncommitted Changes: {stats['uncommitted_changes']}")
+        getattr(self, method_name)(git, rest)
 
-            if changes:
-                self.console.print("\n[yellow]Changes:[/yellow]")
-                for change in changes[:10]:
-                    icon = "+" if change.change_type == "added" else "~" if change.change_type == "modified" else "-"
-                    self.console.print(f"  {icon} {change.file_path}")
+    def _git_status(self, git, rest: str):
+        """Show the branch, commit count and uncommitted changes"""
+        changes = git.get_changes()
+        stats = git.get_repo_stats()
 
-                if len(changes) > 10:
-                    self.console.print(f"  ... and {len(changes) - 10} more")
+        self.console.print(f"\n[cyan]📊 Git Status[/cyan]")
+        self.console.print(f"Branch: [green]{stats['branch']}[/green]")
+        self.console.print(f"Total Commits: {stats['total_commits']}")
+        self.console.print(f"Uncommitted Changes: {stats['uncommitted_changes']}")
 
-        elif args.startswith("commit"):
-            parts = args.split(maxsplit=1)
-            message = parts[1] if len(parts) > 1 else None
+        if changes:
+            self.console.print("\n[yellow]Changes:[/yellow]")
+            for change in changes[:10]:
+                icon = "+" if change.change_type == "added" else "~" if change.change_type == "modified" else "-"
+                self.console.print(f"  {icon} {change.file_path}")
 
-            success, msg = git.auto_commit(message)
-            if success:
-                self.console.print(f"[green]✅ {msg}[/green]")
-            else:
-                self.console.print(f"[red]❌ {msg}[/red]")
+            if len(changes) > 10:
+                self.console.print(f"  ... and {len(changes) - 10} more")
 
-        elif args == "push":
-            success, msg = git.auto_push()
-            if success:
-                self.console.print(f"[green]✅ {msg}[/green]")
-            else:
-                self.console.print(f"[red]❌ {msg}[/red]")
+    def _git_commit(self, git, message: str):
+        """Commit all changes, with an optional message"""
+        success, msg = git.auto_commit(message or None)
+        if success:
+            self.console.print(f"[green]✅ {msg}[/green]")
+        else:
+            self.console.print(f"[red]❌ {msg}[/red]")
 
-        elif args == "history":
-            commits = git.get_commit_history(limit=10)
+    def _git_push(self, git, rest: str):
+        """Push the current branch"""
+        success, msg = git.auto_push()
+        if success:
+            self.console.print(f"[green]✅ {msg}[/green]")
+        else:
+            self.console.print(f"[red]❌ {msg}[/red]")
 
-            if not commits:
-                self.console.print("[yellow]No commits yet[/yellow]")
-                return
+    def _git_history(self, git, rest: str):
+        """Show the last 10 commits"""
+        commits = git.get_commit_history(limit=10)
 
-            table = Table(title="Recent Commits", show_header=True)
-            table.add_column("Hash", style="cyan")
-            table.add_column("Message", style="white")
-            table.add_column("Author", style="green")
-            table.add_column("Date", style="dim")
+        if not commits:
+            self.console.print("[yellow]No commits yet[/yellow]")
+            return
 
-            for commit in commits:
-                table.add_row(commit.hash, commit.message[:50], commit.author, commit.date)
+        table = Table(title="Recent Commits", show_header=True)
+        table.add_column("Hash", style="cyan")
+        table.add_column("Message", style="white", max_width=50, no_wrap=True, overflow="ellipsis")
+        table.add_column("Author", style="green")
+        table.add_column("Date", style="dim")
 
-            self.console.print("\n")
-            self.console.print(table)
-            self.console.print("\n")
+        for commit in commits:
+            table.add_row(commit.hash, commit.message, commit.author, commit.date)
 
-        else:
-            self.console.print("[yellow]Available actions: status, commit, push, history[/yellow]")
+        self.console.print("\n")
+        self.console.print(table)
+        self.console.print("\n")
 
     def cmd_stats(self, args: str):
         """Show contribution statistics"""
@@ -627,52 +895,43 @@ class SlashCommandHandler:
         tracker = ContributionTracker()
         period = args.strip() if args else "week"
 
-        if period not in ["day", "week", "month", "year"]:
+        if period not in _PERIODS:
             self.console.print("[red]Invalid period. Use: day, week, month, or year[/red]")
             return
 
         stats = tracker.get_stats(period)
 
-        period_name = {
-            "day": "Today",
-            "week": "This Week",
-            "month": "This Month",
-            "year": "This Year"
-        }.get(period)
+        period_name = _PERIOD_NAMES[period]
 
-        info = f"""
-## 📊 {period_name}'s Statistics
-
-**Total Activities:** {stats.total_activities:,}
-
-**Breakdown:**
-- 💬 Chat Messages: {stats.chat_messages:,}
-- 📝 Files Created: {stats.files_created:,}
-- ✏️  Files Modified: {stats.files_modified:,}
-- 🔄 Git Commits: {stats.git_commits:,}
-- 🔧 Tool Executions: {stats.tool_executions:,}
-- 🌟 Agent Swarms: {stats.agent_swarms:,}
-"""
+        breakdown = _fact_table("Breakdown")
+        breakdown.add_row("💬 Chat Messages:", f"{stats.chat_messages:,}")
+        breakdown.add_row("📝 Files Created:", f"{stats.files_created:,}")
+        breakdown.add_row("✏️  Files Modified:", f"{stats.files_modified:,}")
+        breakdown.add_row("🔄 Git Commits:", f"{stats.git_commits:,}")
+        breakdown.add_row("🔧 Tool Executions:", f"{stats.tool_executions:,}")
+        breakdown.add_row("🌟 Agent Swarms:", f"{stats.agent_swarms:,}")
 
+        totals = _fact_table()
+        totals.add_row("Total Activities:", f"{stats.total_activities:,}")
         if stats.streak_days > 0 and period == "day":
-            info += f"\n**🔥 Current Streak:** {stats.streak_days} days!"
-
+            totals.add_row("🔥 Current Streak:", f"{stats.streak_days} days!")
         if stats.total_tokens > 0:
-            info += f"\n**🎫 Tokens Used:** {stats.total_tokens:,}"
-
+            totals.add_row("🎫 Tokens Used:", f"{stats.total_tokens:,}")
         if stats.projects_worked_on:
-            info += f"\n\n**📁 Active Projects:** {', '.join(stats.projects_worked_on)}"
+            totals.add_row("📁 Active Projects:", ', '.join(stats.projects_worked_on))
 
-        self.console.print(Panel(Markdown(info), title="Statistics", border_style="cyan"))
+        report = Group(Text(f"📊 {period_name}'s Statistics", style="bold"), "", totals, "", breakdown)
+        self.console.print(Panel(report, title="Statistics", border_style="cyan"))
 
     def cmd_recap(self, args: str):
         """Generate activity recap"""
+        from rich.markdown import Markdown
         from ..analytics import ContributionTracker
 
         tracker = ContributionTracker()
         period = args.strip() if args else "week"
 
-        if period not in ["day", "week", "month", "year"]:
+        if period not in _PERIODS:
             self.console.print("[red]Invalid period. Use: day, week, month, or year[/red]")
             return
 
@@ -686,20 +945,16 @@ class SlashCommandHandler:
 
     def _build_usage_bar(self, percentage: int) -> str:
         """Return a simple usage bar for context stats."""
-        capped = max(0, min(percentage, 100))
-        filled_blocks = int((capped / 100) * 20)
-        return "█" * filled_blocks + "░" * (20 - filled_blocks)
+        return _USAGE_BARS[max(0, min(percentage, 100)) * 20 // 100]
 
-    def _load_template(self, filename: str, default: str) -> str:
+    @staticmethod
+    def _load_template(filename: str, default: str) -> str:
         """Load a template from docs if present, else return default."""
-        repo_root = Path(__file__).resolve().parents[2]
-        template_path = repo_root / "docs" / filename
-        if template_path.exists():
-            try:
-                return template_path.read_text(encoding="utf-8")
-            except Exception:
-                return default
-        return default
+        template_path = _REPO_ROOT / "docs" / filename
+        try:
+            return _read_text(str(template_path), os.stat(template_path).st_mtime_ns)
+        except Exception:
+            return default
 
     def _default_claude_template(self) -> str:
         """Fallback CLAUDE.md template."""
@@ -755,6 +1010,19 @@ jobs:
           echo "Replace this step with the official Claude GitHub App action once available."
 """
 
+    def _list_models(self) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Models on the current server, reused for MODELS_CACHE_TTL seconds"""
+        base_url = self.agent.llm.base_url
+        cache = self._models_cache
+        if cache and cache[0] == base_url and time.monotonic() - cache[1] < MODELS_CACHE_TTL:
+            return cache[2], cache[3]
+
+        models = self.agent.llm.list_models()
+        by_name = {m.get("name"): m for m in models}
+        if models:
+            self._models_cache = (base_url, time.monotonic(), models, by_name)
+        return models, by_name
+
     def _format_size(self, size_bytes: int) -> str:
         """Format bytes to human readable size"""
         for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
@@ -765,6 +1033,7 @@ jobs:
 
     def cmd_review(self, args: str):
         """Perform comprehensive code review of a directory"""
+        from rich.markdown import Markdown
         from pathlib import Path
         from rich.prompt import Prompt, Confirm
         from rich.table import Table
@@ -791,182 +1060,203 @@ jobs:
             self.console.print(f"[red]❌ Error: Path must be a directory: {review_path}[/red]\n")
             return
 
-        # Step 1: Find Python files using agent's Glob tool
+        # Step 1: Find Python files
         self.console.print(f"\n[cyan]📂 Finding Python files in {review_path}...[/cyan]")
-        glob_result = self.agent.tools["Glob"].execute(pattern="**/*.py", path=str(review_path))
-
-        if glob_result.status.value != "success":
-            self.console.print(f"[red]❌ Failed to find files: {glob_result.error}[/red]\n")
-            return
-
-        # Parse file paths
-        all_files = [line.strip() for line in glob_result.output.strip().split('\n') if line.strip()]
+        file_sizes = dict(_find_python_files(str(review_path)))
+        all_files = list(file_sizes)
 
         if not all_files:
             self.console.print("[yellow]⚠️  No Python files found in the specified path[/yellow]\n")
             return
 
         # Track reviewed files across iterations
-        reviewed_files = []
-
-        # Main review loop - allows continuing with more files
-        while True:
-            # Get remaining files
-            remaining_files = [f for f in all_files if f not in reviewed_files]
-
-            if not remaining_files:
-                self.console.print(f"\n[green]✅ All files have been reviewed![/green]\n")
-                break
-
-            # Display file selection
-            self.console.print(f"\n[{self.theme_color}]📂 Found {len(remaining_files)} file(s) to review[/{self.theme_color}]")
-
-            if len(reviewed_files) > 0:
-                self.console.print(f"[dim]({len(reviewed_files)} already reviewed)[/dim]")
-
-            self.console.print()
-
-            # Show files in a table
-            table = Table(show_header=True, box=None, padding=(0, 1))
-            table.add_column("#", style="dim", width=4)
-            table.add_column("File", style="cyan")
-            table.add_column("Lines", style="dim", justify="right", width=8)
-
-            file_info = []
-            for idx, file_path in enumerate(remaining_files, 1):
-                # Count lines
-                try:
-                    read_result = self.agent.tools["Read"].execute(file_path=file_path)
-                    line_count = len(read_result.output.split('\n')) if read_result.status.value == "success" else 0
-                except:
-                    line_count = 0
-
-                file_info.append({
-                    "path": file_path,
-                    "lines": line_count
-                })
-
-                # Shorten path for display
-                display_path = Path(file_path).name
-                if len(str(Path(file_path).parent)) > 40:
-                    parent_parts = str(Path(file_path).parent).split('/')
-                    display_path = f".../{'/'.join(parent_parts[-2:])}/{display_path}"
-                else:
-                    display_path = str(Path(file_path).relative_to(review_path))
-
-                table.add_row(str(idx), display_path, f"{line_count:,}")
-
-            self.console.print(table)
-
-            # Get user selection
-            self.console.print(f"\n[dim]Selection format:[/dim]")
-            self.console.print(f"[dim]  • Individual: 1,3,5[/dim]")
-            self.console.print(f"[dim]  • Range: 1-10[/dim]")
-            self.console.print(f"[dim]  • All: all[/dim]")
-            self.console.print(f"[dim]  • Default: Press Enter for first 10[/dim]\n")
-
-            selection = Prompt.ask(
-                "Select files to review",
-                default="1-10" if len(remaining_files) >= 10 else f"1-{len(remaining_files)}"
-            )
-
-            # Parse selection
-            selected_indices = self._parse_file_selection(selection, len(remaining_files))
-
-            if not selected_indices:
-                self.console.print("[yellow]⚠️  No files selected[/yellow]\n")
-                break
-
-            files_to_review = [file_info[i-1] for i in selected_indices]
-            total_lines = sum(f['lines'] for f in files_to_review)
-
-            self.console.print(f"\n[green]✅ Selected {len(files_to_review)} file(s) ({total_lines:,} lines total)[/green]\n")
-
-            # Step 2: Read selected files
-            self.console.print("[cyan]📖 Reading files...[/cyan]")
-            file_contents = []
-
-            for file_item in files_to_review:
-                file_path = file_item['path']
-                try:
-                    read_result = self.agent.tools["Read"].execute(file_path=file_path)
-                    if read_result.status.value == "success":
-                        file_contents.append({
-                            "path": file_path,
-                            "content": read_result.output
-                        })
-                        self.console.print(f"[dim]  ✓ {Path(file_path).name}[/dim]")
-                        reviewed_files.append(file_path)  # Track as reviewed
-                except Exception as e:
-                    self.console.print(f"[yellow]  ⚠️  Skipped {file_path}: {str(e)}[/yellow]")
-
-            if not file_contents:
-                self.console.print("[red]❌ Failed to read any files[/red]\n")
-                break
-
-            self.console.print(f"[green]✅ Read {len(file_contents)} file(s) successfully[/green]\n")
-
-            # Step 3: Perform code review using the agent
-            self.console.print("[cyan]🔍 Analyzing code quality, bugs, security, performance...[/cyan]\n")
-
-            # Build comprehensive review prompt
-            review_prompt = f"""I need you to perform a comprehensive code review of the following Python files from: {review_path}
-
-Please analyze these {len(file_contents)} files and provide a detailed review covering:
-1. **Code Quality**: Maintainability, readability, code smells
-2. **Bugs & Issues**: Logic errors, edge cases, potential runtime errors
-3. **Security**: Vulnerabilities, OWASP concerns, input validation
-4. **Performance**: Inefficiencies, optimization opportunities
-5. **Best Practices**: Design patterns, Pythonic code, conventions
-
-For each issue found, provide:
-- File path and line number
-- Specific code example
-- Explanation of the issue
-- Recommended fix with code snippet
+        reviewed_set = set()
 
-Files to review:
-"""
+        # Files are counted, formatted and read through the Read tool once per session
+        self._read_cache = {}
+        line_counts: Dict[str, int] = {}
+        listing_rows: Dict[str, Tuple[str, str]] = {}
 
-            for fc in file_contents:
-                review_prompt += f"\n### File: {fc['path']}\n```python\n{fc['content']}\n```\n"
-
-            # Execute review through agent
-            from rich.spinner import Spinner
-            from rich.live import Live
-
-            spinner = Spinner("dots", text="Jony - Code Reviewer: Scrutinizing the details...", style=f"bold {self.theme_color}")
+        try:
+            # Main review loop - allows continuing with more files
+            while True:
+                # Get remaining files
+                remaining_files = [f for f in all_files if f not in reviewed_set]
 
-            with Live(spinner, console=self.console, refresh_per_second=10, transient=True) as live:
-                response, metrics = self.agent.chat(review_prompt)
+                if not remaining_files:
+                    self.console.print(f"\n[green]✅ All files have been reviewed![/green]\n")
+                    break
 
-            # Display review results
-            self.console.print("\n")
-            self.console.print(Panel(
-                Markdown(response),
-                title=f"🔍 Code Review Results",
-                border_style=self.theme_color,
-                padding=(1, 2)
-            ))
+                # Display file selection
+                self.console.print(f"\n[{self.theme_color}]📂 Found {len(remaining_files)} file(s) to review[/{self.theme_color}]")
+
+                if reviewed_set:
+                    self.console.print(f"[dim]({len(reviewed_set)} already reviewed)[/dim]")
+
+                self.console.print()
+
+                # Show files in a table
+                table = Table(show_header=True, box=None, padding=(0, 1))
+                table.add_column("#", style="dim", width=4)
+                table.add_column("File", style="cyan")
+                table.add_column("Lines", style="dim", justify="right", width=8)
+
+                # Count lines of files not seen in an earlier round
+                # (large files are estimated from their size instead of being read)
+                uncounted = []
+                for file_path in remaining_files:
+                    if file_path not in line_counts:
+                        size = file_sizes[file_path]
+                        if size < EXACT_LINE_COUNT_LIMIT:
+                            uncounted.append(file_path)
+                        else:
+                            line_counts[file_path] = size // _BYTES_PER_LINE
+                if uncounted:
+                    with ThreadPoolExecutor(max_workers=REVIEW_IO_WORKERS) as pool:
+                        line_counts.update(zip(uncounted, pool.map(_count_lines_or_zero, uncounted)))
+
+                file_info = []
+                for idx, file_path in enumerate(remaining_files, 1):
+                    line_count = line_counts[file_path]
+
+                    file_info.append({
+                        "path": file_path,
+                        "lines": line_count
+                    })
+
+                    row = listing_rows.get(file_path)
+                    if row is None:
+                        # Shorten path for display
+                        path = Path(file_path)
+                        parent = str(path.parent)
+                        if len(parent) > 40:
+                            parent_parts = parent.split('/')
+                            display_path = f".../{'/'.join(parent_parts[-2:])}/{path.name}"
+                        else:
+                            display_path = str(path.relative_to(review_path))
+
+                        estimated = "~" if file_sizes[file_path] >= EXACT_LINE_COUNT_LIMIT else ""
+                        row = listing_rows[file_path] = (display_path, f"{estimated}{line_count:,}")
+
+                    table.add_row(str(idx), *row)
+
+                self.console.print(table)
+
+                # Explain the selection format on the first round only
+                if not reviewed_set:
+                    self.console.print(_SELECTION_HELP)
+
+                selection = Prompt.ask(
+                    "Select files to review",
+                    default="1-10" if len(remaining_files) >= 10 else f"1-{len(remaining_files)}"
+                )
 
-            # Display metrics
-            self.console.print(f"\n[dim]📊 Review completed in {metrics.get('total_time', 0):.2f}s | "
-                              f"Tokens: {metrics.get('total_tokens', 0)} | "
-                              f"Files analyzed: {len(file_contents)}[/dim]\n")
+                # Parse selection
+                selected_indices = self._parse_file_selection(selection, len(remaining_files))
 
-            # Check if there are more files to review
-            remaining_count = len([f for f in all_files if f not in reviewed_files])
+                if not selected_indices:
+                    self.console.print("[yellow]⚠️  No files selected[/yellow]\n")
+                    break
 
-            if remaining_count > 0:
-                self.console.print(f"[{self.theme_color}]📂 {remaining_count} file(s) remaining[/{self.theme_color}]")
-                continue_review = Confirm.ask("Continue reviewing?", default=True)
+                files_to_review = [file_info[i-1] for i in selected_indices]
+                total_lines = sum(f['lines'] for f in files_to_review)
+                estimated = "~" if any(file_sizes[f['path']] >= EXACT_LINE_COUNT_LIMIT for f in files_to_review) else ""
+
+                self.console.print(f"\n[green]✅ Selected {len(files_to_review)} file(s) ({estimated}{total_lines:,} lines total)[/green]\n")
+
+                # Step 2: Read selected files
+                self.console.print("[cyan]📖 Reading files...[/cyan]")
+                file_contents = []
+
+                paths = [f['path'] for f in files_to_review]
+                with ThreadPoolExecutor(max_workers=REVIEW_IO_WORKERS) as pool:
+                    reads = [pool.submit(self._read_cached, file_path) for file_path in paths]
+
+                for file_path, read in zip(paths, reads):
+                    try:
+                        read_result = read.result()
+                        if read_result.status.value == "success":
+                            file_contents.append({
+                                "path": file_path,
+                                "content": read_result.output
+                            })
+                            self.console.print(f"[dim]  ✓ {Path(file_path).name}[/dim]")
+                            reviewed_set.add(file_path)  # Track as reviewed
+                    except Exception as e:
+                        self.console.print(f"[yellow]  ⚠️  Skipped {file_path}: {str(e)}[/yellow]")
+
+                if not file_contents:
+                    self.console.print("[red]❌ Failed to read any files[/red]\n")
+                    break
 
-                if not continue_review:
-                    self.console.print(f"\n[green]✅ Review session complete! Reviewed {len(reviewed_files)} file(s)[/green]\n")
+                self.console.print(f"[green]✅ Read {len(file_contents)} file(s) successfully[/green]\n")
+
+                # Step 3: Perform code review using the agent
+                self.console.print("[cyan]🔍 Analyzing code quality, bugs, security, performance...[/cyan]\n")
+
+                # Files are sent in batches that fit the model's context window
+                sections = [
+                    f"\n### File: {fc['path']}\n```python\n{fc['content']}\n```\n" for fc in file_contents
+                ]
+                budget = int(self.agent.max_context_tokens * REVIEW_PROMPT_SHARE)
+                batches = _batch_by_tokens(sections, budget)
+
+                # Execute review through agent
+                from rich.spinner import Spinner
+                from rich.live import Live
+
+                total_time = 0.0
+                total_tokens = 0
+                for part, batch in enumerate(batches, 1):
+                    review_prompt = _REVIEW_PROMPT.format(path=review_path, count=len(batch)) + "".join(batch)
+                    suffix = f" (part {part}/{len(batches)})" if len(batches) > 1 else ""
+
+                    spinner = Spinner("dots", text=f"Jony - Code Reviewer: Scrutinizing the details...{suffix}", style=f"bold {self.theme_color}")
+
+                    with Live(spinner, console=self.console, refresh_per_second=10, transient=True) as live:
+                        response, metrics = self.agent.chat(review_prompt)
+                    total_time += metrics.get('total_time', 0)
+                    total_tokens += metrics.get('total_tokens', 0)
+
+                    # Display review results
+                    self.console.print("\n")
+                    self.console.print(Panel(
+                        Markdown(response),
+                        title=f"🔍 Code Review Results{suffix}",
+                        border_style=self.theme_color,
+                        padding=(1, 2)
+                    ))
+
+                # Display metrics
+                self.console.print(f"\n[dim]📊 Review completed in {total_time:.2f}s | "
+                                  f"Tokens: {total_tokens} | "
+                                  f"Files analyzed: {len(file_contents)}[/dim]\n")
+
+                # Check if there are more files to review
+                # all_files has no duplicates and every reviewed file came from it
+                remaining_count = len(all_files) - len(reviewed_set)
+
+                if remaining_count > 0:
+                    self.console.print(f"[{self.theme_color}]📂 {remaining_count} file(s) remaining[/{self.theme_color}]")
+                    continue_review = Confirm.ask("Continue reviewing?", default=True)
+
+                    if not continue_review:
+                        self.console.print(f"\n[green]✅ Review session complete! Reviewed {len(reviewed_set)} file(s)[/green]\n")
+                        break
+                else:
+                    self.console.print(f"\n[green]✅ All files reviewed![/green]\n")
                     break
-            else:
-                self.console.print(f"\n[green]✅ All files reviewed![/green]\n")
-                break
+        finally:
+            # Don't keep every file read alive on the handler, even after an error
+            self._read_cache = {}
+
+    def _read_cached(self, file_path: str):
+        """Read a file through the Read tool, once per review session"""
+        read_result = self._read_cache.get(file_path)
+        if read_result is None:
+            read_result = self.agent.tools["Read"].execute(file_path=file_path)
+            self._read_cache[file_path] = read_result
+        return read_result
 
     def _parse_file_selection(self, selection: str, max_files: int) -> list:
         """Parse file selection input (e.g., '1,3,5-10,15' or 'all')"""
@@ -975,32 +1265,27 @@ Files to review:
         if selection == 'all':
             return list(range(1, max_files + 1))
 
-        selected = set()
-        parts = selection.split(',')
-
-        for part in parts:
-            part = part.strip()
-            if '-' in part:
-                # Handle range (e.g., '1-10')
-                try:
-                    start, end = part.split('-')
-                    start, end = int(start.strip()), int(end.strip())
-                    selected.update(range(start, min(end + 1, max_files + 1)))
-                except:
-                    continue
-            else:
-                # Handle individual number
-                try:
-                    num = int(part)
-                    if 1 <= num <= max_files:
-                        selected.add(num)
-                except:
-                    continue
-
-        return sorted(list(selected))
+        # Numbers and ranges are kept in entry order unless they overlap or go backwards
+        selected = []
+        in_order = True
+        for part in selection.split(','):
+            match = _SELECTION_RE.fullmatch(part)
+            if match is None:
+                continue
+            start = max(int(match.group(1)), 1)
+            end = min(int(match.group(2) or match.group(1)), max_files)
+            if start > end:
+                continue
+            if selected and start <= selected[-1]:
+                in_order = False
+            selected.extend(range(start, end + 1))
+
+        return selected if in_order else sorted(set(selected))
 
     def cmd_refresh(self, args: str):
         """Check flaco.md status - matches desktop refresh button"""
+        from rich.markdown import Markdown
+
         if self.agent.context_loader.has_context():
             content = self.agent.context_loader.load_context()
             preview = content[:150]
@@ -1029,16 +1314,13 @@ Create a `FLACO.md` file in your project directory to add persistent context to
 
     def cmd_check_update(self, args: str):
         """Check for Flaco updates"""
+        from rich.markdown import Markdown
         from ..utils.update_checker import UpdateChecker
         from .. import __version__
 
         self.console.print(f"\n[{self.theme_color}]📦 Checking for updates...[/{self.theme_color}]\n")
 
-        # Force a fresh check by clearing cache
-        if UpdateChecker.CACHE_FILE.exists():
-            UpdateChecker.CACHE_FILE.unlink()
-
-        has_update, latest_version, summary = UpdateChecker.check_for_updates(__version__)
+        has_update, latest_version, summary = UpdateChecker.check_for_updates(__version__, force=True)
 
         if has_update and latest_version:
             # Update available
@@ -1085,17 +1367,14 @@ You're running the latest version of Flaco."""
         from ..utils.update_checker import UpdateChecker
         from .. import __version__
         import subprocess
+        import threading
 
         self.console.print(f"\n[{self.theme_color}]⬆️  Auto-Update[/{self.theme_color}]\n")
 
         # Check for updates
         self.console.print("[dim]Checking for updates...[/dim]")
 
-        # Force fresh check
-        if UpdateChecker.CACHE_FILE.exists():
-            UpdateChecker.CACHE_FILE.unlink()
-
-        has_update, latest_version, summary = UpdateChecker.check_for_updates(__version__)
+        has_update, latest_version, summary = UpdateChecker.check_for_updates(__version__, force=True)
 
         if not has_update:
             self.console.print(f"\n[green]✅ You're already on the latest version (v{__version__})[/green]\n")
@@ -1108,6 +1387,7 @@ You're running the latest version of Flaco."""
 
         # Confirm with user
         from rich.prompt import Confirm
+
         if not Confirm.ask("Proceed with update?", default=True):
             self.console.print("[yellow]⚠️  Update cancelled[/yellow]\n")
             return
@@ -1116,26 +1396,34 @@ You're running the latest version of Flaco."""
         self.console.print(f"\n[{self.theme_color}]Running: pipx upgrade flaco-ai[/{self.theme_color}]\n")
 
         try:
-            # Run pipx upgrade
-            result = subprocess.run(
-                ["pipx", "upgrade", "flaco-ai"],
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
+            # Run pipx upgrade, showing its output as it arrives
+            command = ["pipx", "upgrade", "flaco-ai"]
+            with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                  text=True, bufsize=1) as process:
+                timed_out = threading.Event()
+
+                def kill():
+                    timed_out.set()
+                    process.kill()
+
+                timer = threading.Timer(UPDATE_TIMEOUT, kill)
+                timer.start()
+                try:
+                    for line in process.stdout:
+                        self.console.print(line.rstrip("\n"), markup=False, highlight=False)
+                    returncode = process.wait()
+                finally:
+                    timer.cancel()
 
-            # Show output
-            if result.stdout:
-                self.console.print(result.stdout)
+            if timed_out.is_set():
+                raise subprocess.TimeoutExpired(command, UPDATE_TIMEOUT)
 
-            if result.returncode == 0:
+            if returncode == 0:
                 self.console.print(f"\n[green]✅ Successfully updated to v{latest_version}![/green]")
                 self.console.print(f"[yellow]⚠️  Please restart Flaco to use the new version[/yellow]")
                 self.console.print(f"[dim]Tip: Type /exit or /quit to close, then run flaco.cli again[/dim]\n")
             else:
                 self.console.print(f"\n[red]❌ Update failed[/red]")
-                if result.stderr:
-                    self.console.print(f"[red]{result.stderr}[/red]")
                 self.console.print(f"\n[yellow]Try running manually: pipx upgrade flaco-ai[/yellow]\n")
 
         except subprocess.TimeoutExpired:
@@ -1150,6 +1438,9 @@ You're running the latest version of Flaco."""
 
     def cmd_agent(self, args: str):
         """Manage custom AI agents - matches desktop functionality"""
+        from rich.markdown import Markdown
+        from rich.prompt import Prompt, Confirm
+
         parts = args.split(maxsplit=1) if args else []
         action = parts[0].lower() if parts else "list"
         action_args = parts[1] if len(parts) > 1 else ""
@@ -1281,6 +1572,10 @@ You're running the latest version of Flaco."""
 
     def cmd_setup(self, args: str):
         """Interactive setup wizard for Flaco"""
+        from rich.markdown import Markdown
+        from rich.prompt import Prompt, Confirm
+        from ..config.user_config import UserConfig
+
         self.console.print("\n")
         self.console.print("╔═══════════════════════════════════════╗", style=f"bold {self.theme_color}")
         self.console.print("║                                       ║", style=f"bold {self.theme_color}")
@@ -1354,29 +1649,17 @@ You're running the latest version of Flaco."""
         self.console.print("\n[bold]Step 3:[/bold] Choose your theme color")
         self.console.print(f"[dim]Current: {user_config.theme_color}[/dim]")
 
-        color_options = [
-            ("cyan", "Cyan (Default) - Cool and professional"),
-            ("green", "Green - Fresh and vibrant"),
-            ("blue", "Blue - Calm and trustworthy"),
-            ("magenta", "Magenta - Bold and creative"),
-            ("yellow", "Yellow - Bright and energetic"),
-            ("white", "White - Clean and minimal")
-        ]
-
         self.console.print("\n[bold]Available colors:[/bold]")
-        for i, (color, desc) in enumerate(color_options, 1):
-            sample = f"[{color}]●[/{color}]"
-            self.console.print(f"  {i}. {sample} {desc}")
+        self.console.print(_COLOR_MENU)
 
         color_choice = Prompt.ask(
             "\nEnter color name or number",
             default="cyan",
-            choices=["cyan", "green", "blue", "magenta", "yellow", "white", "1", "2", "3", "4", "5", "6"]
+            choices=_COLOR_CHOICES
         )
 
         # Map number to color
-        color_map = {"1": "cyan", "2": "green", "3": "blue", "4": "magenta", "5": "yellow", "6": "white"}
-        selected_color = color_map.get(color_choice, color_choice)
+        selected_color = _COLOR_MAP.get(color_choice, color_choice)
 
         user_config.theme_color = selected_color
         user_config.save()
@@ -1391,7 +1674,7 @@ You're running the latest version of Flaco."""
             self.console.print("[yellow]ℹ️  No FLACO.md found[/yellow]")
             if Confirm.ask("Would you like to create one now?", default=True):
                 result = self.agent.create_context_file(
-                    target_dir=os.getcwd(),
+                    target_dir=str(self.cwd),
                     template_path=None,
                     overwrite=False
                 )
@@ -1400,7 +1683,7 @@ You're running the latest version of Flaco."""
 
         # Step 5: Create .flaco directory structure
         self.console.print("\n[bold]Step 5:[/bold] Setting up .flaco directory...")
-        flaco_dir = Path.cwd() / ".flaco"
+        flaco_dir = self.cwd / ".flaco"
         commands_dir = flaco_dir / "commands"
 
         if not flaco_dir.exists():
@@ -1443,6 +1726,9 @@ You're running the latest version of Flaco."""
 
     def cmd_reset_config(self, args: str):
         """Reset Flaco configuration to defaults"""
+        from rich.prompt import Confirm
+        from ..config.user_config import UserConfig
+
         if Confirm.ask("[yellow]⚠️  Reset all Flaco settings to defaults?[/yellow]", default=False):
             user_config = UserConfig()
             user_config.reset()
@@ -1461,6 +1747,8 @@ You're running the latest version of Flaco."""
           /snippet search <query>  - Search snippets
           /snippet <category>      - List snippets in category
         """
+        from ..utils.snippets import SnippetCategory
+
         if not args:
             # List all snippets
             self._list_all_snippets()
@@ -1477,6 +1765,8 @@ You're running the latest version of Flaco."""
 
     def _list_all_snippets(self):
         """List all available snippets"""
+        from ..utils.snippets import snippet_library
+
         table = Table(title="📋 Available Code Snippets", show_header=True)
         table.add_column("Name", style="cyan", no_wrap=True)
         table.add_column("Category", style="yellow")
@@ -1498,6 +1788,8 @@ You're running the latest version of Flaco."""
 
     def _search_snippets(self, query: str):
         """Search snippets by query"""
+        from ..utils.snippets import snippet_library
+
         results = snippet_library.search_snippets(query=query)
 
         if not results:
@@ -1522,6 +1814,8 @@ You're running the latest version of Flaco."""
 
     def _list_category_snippets(self, category_name: str):
         """List snippets in a specific category"""
+        from ..utils.snippets import snippet_library, SnippetCategory
+
         try:
             category = SnippetCategory(category_name)
             results = snippet_library.search_snippets(category=category)
@@ -1547,6 +1841,10 @@ You're running the latest version of Flaco."""
 
     def _insert_snippet(self, name: str):
         """Insert a specific snippet"""
+        from rich.markdown import Markdown
+        from rich.prompt import Prompt, Confirm
+        from ..utils.snippets import snippet_library
+
         snippet = snippet_library.get_snippet(name)
 
         if not snippet:
@@ -0,0 +1,152 @@
+"""Token-aware context window management"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Approximate characters per token when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+# Fraction of the budget actually used, leaving room for tokenizer mismatch
+# between cl100k and the local model's own vocabulary
+SAFETY_MARGIN = 0.9
+
+# Per-message overhead for role/formatting tokens
+MESSAGE_OVERHEAD = 4
+
+# Content prefix marking the summary that replaces compacted turns
+COMPACTED_PREFIX = "[compacted memory] "
+
+# Token counts cached by content digest, so cached entries don't keep
+# whole message texts alive
+TOKEN_CACHE_SIZE = 1024
+
+_encoder = None
+_encoder_loaded = False
+_token_cache: "OrderedDict[bytes, int]" = OrderedDict()
+
+
+def _get_encoder():
+    """Load the tiktoken encoder once per process (None if unavailable)"""
+    global _encoder, _encoder_loaded
+    if not _encoder_loaded:
+        _encoder_loaded = True
+        if tiktoken is not None:
+            try:
+                _encoder = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                _encoder = None
+    return _encoder
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens in text (estimated from length without tiktoken)
+
+    Cached because the same history messages are re-counted every LLM call.
+    """
+    if not text:
+        return 0
+    encoder = _get_encoder()
+    if encoder is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+    key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    count = _token_cache.get(key)
+    if count is not None:
+        _token_cache.move_to_end(key)
+        return count
+
+    count = len(encoder.encode(text, disallowed_special=()))
+    _token_cache[key] = count
+    if len(_token_cache) > TOKEN_CACHE_SIZE:
+        _token_cache.popitem(last=False)
+    return count
+
+
+def count_message_tokens(message: Dict[str, Any], blobs: Optional[Dict[str, str]] = None) -> int:
+    """Count tokens used by a single chat message
+
+    Tool results stored by hash (a `content_ref` with empty content) are
+    counted from `blobs`, the hash -> content store they were saved in.
+    """
+    if "content_ref" in message and blobs is not None:
+        content = blobs.get(message["content_ref"], "")
+    else:
+        content = message.get("content") or ""
+    if not isinstance(content, str):
+        content = str(content)
+    return count_tokens(content) + MESSAGE_OVERHEAD
+
+
+def truncate_text(text: str, max_tokens: int) -> str:
+    """Cut text down to max_tokens, marking it as truncated"""
+    if max_tokens <= 0 or not text:
+        return text
+
+    encoder = _get_encoder()
+    if encoder is not None:
+        tokens = encoder.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return encoder.decode(tokens[:max_tokens]) + "\n... [truncated]"
+
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars] + "\n... [truncated]"
+
+
+def truncate_messages(
+    messages: List[Dict[str, Any]],
+    max_tokens: int,
+    sink: int = 2,
+    blobs: Optional[Dict[str, str]] = None
+) -> List[Dict[str, Any]]:
+    """Drop the oldest messages until the conversation fits in max_tokens
+
+    The first `sink` messages, the first user message, compacted memory
+    summaries and the latest message are always kept. Assistant messages are
+    dropped before user messages. Stored tool results are sized via `blobs`.
+    """
+    if max_tokens <= 0 or not messages:
+        return messages
+
+    budget = int(max_tokens * SAFETY_MARGIN)
+    counts = [count_message_tokens(m, blobs) for m in messages]
+    total = sum(counts)
+    if total <= budget:
+        return messages
+
+    protected = set(range(min(sink, len(messages))))
+    protected.add(len(messages) - 1)
+    for i, message in enumerate(messages):
+        if message.get("role") == "user":
+            protected.add(i)
+            break
+    # The summary is the only record of the compacted turns, so dropping it
+    # would lose them for good rather than just trimming old context
+    protected.update(
+        i for i, message in enumerate(messages)
+        if message.get("role") == "system" and (message.get("content") or "").startswith(COMPACTED_PREFIX)
+    )
+
+    keep = [True] * len(messages)
+
+    # First pass drops anything that isn't a user message, second pass users
+    for drop_users in (False, True):
+        for i, message in enumerate(messages):
+            if total <= budget:
+                break
+            if i in protected or not keep[i]:
+                continue
+            if (message.get("role") == "user") != drop_users:
+                continue
+            keep[i] = False
+            total -= counts[i]
+
+    return [m for m, kept in zip(messages, keep) if kept]
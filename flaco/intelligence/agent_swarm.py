@@ -1,5 +1,6 @@
 """Agent Swarm - Multiple specialized agents collaborating on complex tasks"""
 
+import functools
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from enum import Enum
@@ -23,6 +24,16 @@ class SwarmTask:
     primary_agent: AgentType
     reasoning: str
 
+    @functools.cached_property
+    def summary(self) -> Dict[str, Any]:
+        """Small JSON-serializable view of the task for metrics"""
+        return {
+            "primary_agent": self.primary_agent.label,
+            "complexity": self.complexity.value,
+            "n_agents": len(self.required_agents),
+            "reasoning": self.reasoning,
+        }
+
 
 class AgentSwarm:
     """Coordinate multiple agents working together"""
@@ -85,7 +96,7 @@ class AgentSwarm:
                 complexity=complexity,
                 required_agents=domains_detected,
                 primary_agent=domains_detected[0],
-                reasoning=f"Multiple domains detected: {', '.join([a.value for a in domains_detected])}"
+                reasoning=f"Multiple domains detected: {', '.join([a.label for a in domains_detected])}"
             )
 
         return None
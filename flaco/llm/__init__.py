@@ -1,3 +1,4 @@
 from .ollama_client import OllamaClient
+from .async_client import AsyncOllamaClient
 
-__all__ = ["OllamaClient"]
+__all__ = ["OllamaClient", "AsyncOllamaClient"]
@@ -0,0 +1,127 @@
+"""Async Ollama client used for concurrent (swarm) LLM calls"""
+
+import asyncio
+import atexit
+import threading
+import weakref
+from typing import Any, Awaitable, Dict, List, Optional, TypeVar
+
+import aiohttp
+
+T = TypeVar("T")
+
+# A single event loop is kept for the whole process so aiohttp's connection
+# pool (bound to the loop) survives between calls instead of being rebuilt.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+# Clients whose sessions are closed on exit
+_clients: "weakref.WeakSet[AsyncOllamaClient]" = weakref.WeakSet()
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """Run a coroutine to completion on the shared process-wide event loop"""
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+        return _loop.run_until_complete(coro)
+
+
+@atexit.register
+def _close_clients():
+    """Close open sessions and the shared loop so aiohttp doesn't warn on exit"""
+    # A chat abandoned in a worker thread may still hold the loop
+    if not _loop_lock.acquire(timeout=1):
+        return
+    try:
+        if _loop is None or _loop.is_closed():
+            return
+        async def close_all():
+            await asyncio.gather(*[client.close() for client in list(_clients)], return_exceptions=True)
+
+        _loop.run_until_complete(close_all())
+        _loop.close()
+    finally:
+        _loop_lock.release()
+
+
+class AsyncOllamaClient:
+    """
+    Asynchronous client for the Ollama chat API.
+
+    Keeps one aiohttp session (keep-alive connection pool) per event loop so
+    several agents can be queried concurrently with ``asyncio.gather``.
+
+    Server-side concurrency is controlled by Ollama itself: set
+    ``OLLAMA_NUM_PARALLEL`` (requests served per model) and
+    ``OLLAMA_MAX_LOADED_MODELS`` on the Ollama server to benefit from fan-out.
+    """
+
+    def __init__(self, base_url: str = "http://localhost:11434", model: str = "qwen2.5-coder:7b",
+                 max_connections: int = 16, timeout: int = 120):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        _clients.add(self)
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Create the pooled session lazily (it must be created inside a running loop)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    async def chat(
+        self,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        model: Optional[str] = None,
+        keep_alive: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Send a non-streaming chat request to Ollama"""
+        payload = {
+            "model": model or self.model,
+            "messages": messages,
+            "stream": False,
+            "options": {
+                "temperature": temperature,
+            }
+        }
+
+        if max_tokens:
+            payload["options"]["num_predict"] = max_tokens
+
+        if tools:
+            payload["tools"] = tools
+
+        if keep_alive:
+            payload["keep_alive"] = keep_alive
+
+        session = await self._get_session()
+        try:
+            async with session.post(f"{self.base_url}/api/chat", json=payload) as response:
+                if response.status == 404:
+                    raise Exception(
+                        f"Model '{payload['model']}' not found on Ollama server.\n"
+                        f"Pull the model with: ollama pull {payload['model']}"
+                    )
+                response.raise_for_status()
+                return await response.json()
+        except asyncio.TimeoutError:
+            raise Exception(f"Request to Ollama timed out after {self.timeout} seconds.")
+        except aiohttp.ClientError as e:
+            raise Exception(f"Error communicating with Ollama: {str(e)}")
+
+    async def close(self):
+        """Close the pooled session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -1,12 +1,24 @@
 import json
+import os
 import requests
-from typing import List, Dict, Any, Optional, Generator
+from typing import List, Dict, Any, Optional, Generator, Tuple
 import base64
 from pathlib import Path
+import threading
 import time
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from .async_client import AsyncOllamaClient, run_sync
+from ..utils import fastjson
+
+# How long Ollama keeps the model loaded after a request, so agent loops
+# don't pay the model load time again between calls
+DEFAULT_KEEP_ALIVE = "30m"
+
+# Seconds a test_connection() result is reused for the same server
+CONNECTION_CHECK_TTL = 5.0
+
 
 class OllamaClient:
     """
@@ -17,6 +29,7 @@ class OllamaClient:
     - Automatic retry with exponential backoff
     - Streaming and non-streaming chat support
     - Function calling (tool use) support
+    - Async chat (``achat``) for concurrent requests
     - Conversation history management
 
     Performance:
@@ -24,10 +37,19 @@ class OllamaClient:
     reducing latency and improving throughput.
     """
 
-    def __init__(self, base_url: str = "http://localhost:11434", model: str = "qwen2.5-coder:7b"):
+    def __init__(self, base_url: str = "http://localhost:11434", model: str = "qwen2.5-coder:7b",
+                 keep_alive: Optional[str] = None):
         self.base_url = base_url.rstrip("/")
         self.model = model
+        self.keep_alive = keep_alive or os.getenv("OLLAMA_KEEP_ALIVE", DEFAULT_KEEP_ALIVE)
         self.conversation_history: List[Dict[str, Any]] = []
+        self._async_client: Optional[AsyncOllamaClient] = None
+        # Serialized system prompt and tool schemas, reused while unchanged
+        self._system_bytes: Optional[Tuple[str, bytes]] = None
+        self._tools_bytes: Optional[Tuple[List[Dict[str, Any]], bytes]] = None
+        # (base_url, checked_at, reachable) of the last connection check
+        self._connection_status: Optional[Tuple[str, float, bool]] = None
+        self._connection_thread: Optional[threading.Thread] = None
 
         # Create session with connection pooling
         self.session = requests.Session()
@@ -55,6 +77,13 @@ class OllamaClient:
         if hasattr(self, 'session'):
             self.session.close()
 
+    def close(self):
+        """Release pooled HTTP connections (sync and async)"""
+        self.session.close()
+        if self._async_client is not None:
+            run_sync(self._async_client.close())
+            self._async_client = None
+
     def chat(
         self,
         messages: List[Dict[str, Any]],
@@ -70,6 +99,7 @@ class OllamaClient:
             "model": self.model,
             "messages": messages,
             "stream": stream,
+            "keep_alive": self.keep_alive,
             "options": {
                 "temperature": temperature,
             }
@@ -87,7 +117,9 @@ class OllamaClient:
                 # Use session for connection pooling
                 response = self.session.post(
                     f"{self.base_url}/api/chat",
-                    json=payload,
+                    data=self._encode_chat_body(payload),
+                    headers={"Content-Type": "application/json"},
+                    stream=stream,
                     timeout=120  # Reduced from 300s to 120s
                 )
                 response.raise_for_status()
@@ -134,14 +166,70 @@ class OllamaClient:
         # Should not reach here, but just in case
         raise Exception(f"Failed after {max_retries} retries: {last_error}")
 
+    def _encode_chat_body(self, payload: Dict[str, Any]) -> bytes:
+        """Serialize a chat payload, reusing the bytes of an unchanged prefix
+
+        The system prompt and tool schemas are identical across the calls of
+        an agent loop, so only the conversation messages are encoded each time.
+        """
+        messages = payload["messages"]
+        tools = payload.get("tools")
+        head = {k: v for k, v in payload.items() if k not in ("messages", "tools")}
+
+        encoded = []
+        rest = messages
+        first = messages[0] if messages else None
+        if first is not None and first.get("role") == "system" and len(first) == 2 and "content" in first:
+            content = first["content"]
+            if self._system_bytes is None or self._system_bytes[0] != content:
+                self._system_bytes = (content, fastjson.dumps_bytes(first))
+            encoded.append(self._system_bytes[1])
+            rest = messages[1:]
+        encoded.extend(fastjson.dumps_bytes(m) for m in rest)
+
+        parts = [fastjson.dumps_bytes(head)[:-1], b',"messages":[', b",".join(encoded), b"]"]
+        if tools:
+            # Tool schema lists are built once and not mutated, so identity is enough
+            if self._tools_bytes is None or self._tools_bytes[0] is not tools:
+                self._tools_bytes = (tools, fastjson.dumps_bytes(tools))
+            parts += [b',"tools":', self._tools_bytes[1]]
+        parts.append(b"}")
+        return b"".join(parts)
+
+    async def achat(
+        self,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Async variant of chat() so several requests can be awaited together"""
+        if self._async_client is None:
+            self._async_client = AsyncOllamaClient(base_url=self.base_url, model=self.model)
+
+        # base_url/model can be changed at runtime (/setup, /model)
+        self._async_client.base_url = self.base_url
+        return await self._async_client.chat(
+            messages,
+            tools=tools,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            model=self.model,
+            keep_alive=self.keep_alive
+        )
+
     def _handle_stream(self, response) -> Generator[Dict[str, Any], None, None]:
         """Handle streaming responses from Ollama"""
-        for line in response.iter_lines():
-            if line:
-                try:
-                    yield json.loads(line)
-                except json.JSONDecodeError:
-                    continue
+        try:
+            for line in response.iter_lines():
+                if line:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+        finally:
+            # Runs when the caller stops early too, releasing the connection
+            response.close()
 
     def generate(
         self,
@@ -156,6 +244,7 @@ class OllamaClient:
             "model": self.model,
             "prompt": prompt,
             "stream": stream,
+            "keep_alive": self.keep_alive,
             "options": {
                 "temperature": temperature,
             }
@@ -214,10 +303,32 @@ class OllamaClient:
         return self.chat(messages)
 
     def test_connection(self) -> bool:
-        """Test if Ollama server is accessible"""
+        """Test if Ollama server is accessible (reused for CONNECTION_CHECK_TTL seconds)"""
+        # Wait for a check started by check_connection_async instead of probing twice
+        pending = self._connection_thread
+        if pending is not None:
+            pending.join()
+            self._connection_thread = None
+
+        status = self._connection_status
+        if status and status[0] == self.base_url and time.monotonic() - status[1] < CONNECTION_CHECK_TTL:
+            return status[2]
+        return self._probe_connection()
+
+    def check_connection_async(self):
+        """Start a connection check in the background; test_connection() picks up its result"""
+        if self._connection_thread is None:
+            self._connection_thread = threading.Thread(target=self._probe_connection, daemon=True)
+            self._connection_thread.start()
+
+    def _probe_connection(self) -> bool:
+        """Request the model list and remember whether the server answered"""
+        base_url = self.base_url
         try:
             # Use session for connection pooling
-            response = self.session.get(f"{self.base_url}/api/tags", timeout=5)
-            return response.status_code == 200
+            response = self.session.get(f"{base_url}/api/tags", timeout=5)
+            reachable = response.status_code == 200
         except:
-            return False
+            reachable = False
+        self._connection_status = (base_url, time.monotonic(), reachable)
+        return reachable
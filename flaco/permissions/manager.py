@@ -1,9 +1,10 @@
 from enum import Enum
 from typing import Dict, Any, Callable, Optional
-from rich.console import Console
 from rich.prompt import Confirm
 import sys
 
+from ..ui import CONSOLE
+
 
 class PermissionMode(Enum):
     """Permission modes for tool execution"""
@@ -17,7 +18,7 @@ class PermissionManager:
 
     def __init__(self, mode: PermissionMode = PermissionMode.INTERACTIVE):
         self.mode = mode
-        self.console = Console()
+        self.console = CONSOLE
         self.approved_tools: Dict[str, bool] = {}
         self.session_approvals: set = set()  # Tools approved for this session
 
@@ -6,6 +6,8 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+from ..utils import fastjson
+
 
 class LocalStorageManager:
     """Manages local file storage for conversations and data"""
@@ -21,42 +23,159 @@ class LocalStorageManager:
 
         self.storage_dir = Path(storage_dir)
         self.conversations_dir = self.storage_dir / 'conversations'
+        self.blobs_dir = self.conversations_dir / 'blobs'
         self.projects_dir = self.storage_dir / 'projects'
         self.activities_dir = self.storage_dir / 'activities'
 
         # Create directories
         self.conversations_dir.mkdir(parents=True, exist_ok=True)
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
         self.projects_dir.mkdir(parents=True, exist_ok=True)
         self.activities_dir.mkdir(parents=True, exist_ok=True)
 
         self.connected = True
 
+    def _conversation_path(self, session_id: str) -> Path:
+        """Path of a session's JSONL file (one message per line)"""
+        return self.conversations_dir / f"{session_id}.jsonl"
+
+    def _legacy_conversation_path(self, session_id: str) -> Path:
+        """Path of a session saved in the older single-JSON-document format"""
+        return self.conversations_dir / f"{session_id}.json"
+
+    def _append_lines(self, path: Path, data: bytes):
+        """Append newline-terminated JSON lines to a file
+
+        A partial last line left by a crash is terminated first, so it stays a
+        single unreadable line instead of swallowing the first new record.
+        """
+        # O_APPEND makes the single write land at the end even with other writers
+        fd = os.open(path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            size = os.fstat(fd).st_size
+            if size:
+                os.lseek(fd, size - 1, os.SEEK_SET)
+                if os.read(fd, 1) != b"\n":
+                    data = b"\n" + data
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+
     def save_conversation(self, session_id: str, messages: List[Dict[str, Any]]) -> bool:
-        """Save conversation to local file
+        """Rewrite a conversation file with the full message list
+
+        Only needed when history changes other than by appending (e.g. old
+        turns were compacted); otherwise use append_messages.
 
         Args:
             session_id: Unique session identifier
-            messages: List of message dictionaries
+            messages: List of message dictionaries (content_ref as in append_messages)
 
         Returns:
             True if successful
         """
         try:
-            file_path = self.conversations_dir / f"{session_id}.json"
-            data = {
-                'session_id': session_id,
-                'messages': messages,
-                'updated_at': datetime.now().isoformat()
-            }
+            file_path = self._conversation_path(session_id)
+            tmp_path = file_path.with_suffix('.jsonl.tmp')
 
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=2)
+            with open(tmp_path, 'wb') as f:
+                f.write(b"".join(fastjson.dumps_bytes(m) + b"\n" for m in messages))
+            os.replace(tmp_path, file_path)
+
+            legacy_path = self._legacy_conversation_path(session_id)
+            if legacy_path.exists():
+                legacy_path.unlink()
+
+            return True
+        except Exception as e:
+            print(f"Error saving conversation: {e}")
+            return False
+
+    def append_message(self, session_id: str, message: Dict[str, Any]) -> bool:
+        """Append one message to a conversation file"""
+        return self.append_messages(session_id, [message])
+
+    def append_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> bool:
+        """Append messages to a conversation file without rewriting it
+
+        Tool messages with large results carry an empty "content" and a
+        "content_ref" hash instead; the result itself is saved once with
+        append_blobs, which must be called first.
+
+        Args:
+            session_id: Unique session identifier
+            messages: New messages, in order
+
+        Returns:
+            True if successful
+        """
+        if not messages:
+            return True
+        try:
+            if self._legacy_conversation_path(session_id).exists():
+                # Migrate the old format first so the appended lines follow the history
+                messages = self.load_conversation(session_id) + list(messages)
+                return self.save_conversation(session_id, messages)
+
+            data = b"".join(fastjson.dumps_bytes(m) + b"\n" for m in messages)
+            self._append_lines(self._conversation_path(session_id), data)
 
             return True
         except Exception as e:
             print(f"Error saving conversation: {e}")
             return False
 
+    def append_blobs(self, session_id: str, blobs: Dict[str, str]) -> bool:
+        """Append content-addressed blobs (hash -> content) for a session
+
+        Args:
+            session_id: Unique session identifier
+            blobs: New blobs keyed by content hash
+
+        Returns:
+            True if successful
+        """
+        if not blobs:
+            return True
+        try:
+            data = b"".join(
+                fastjson.dumps_bytes({'hash': key, 'content': content}) + b"\n"
+                for key, content in blobs.items()
+            )
+            self._append_lines(self.blobs_dir / f"{session_id}.jsonl", data)
+
+            return True
+        except Exception as e:
+            print(f"Error saving conversation blobs: {e}")
+            return False
+
+    def load_blobs(self, session_id: str) -> Dict[str, str]:
+        """Load a session's content-addressed blobs
+
+        Args:
+            session_id: Unique session identifier
+
+        Returns:
+            Mapping of content hash to content (empty if none)
+        """
+        try:
+            file_path = self.blobs_dir / f"{session_id}.jsonl"
+            if not file_path.exists():
+                return {}
+
+            blobs = {}
+            with open(file_path, 'rb') as f:
+                for line in f:
+                    try:
+                        record = fastjson.loads(line)
+                    except ValueError:
+                        continue
+                    blobs[record['hash']] = record['content']
+            return blobs
+        except Exception as e:
+            print(f"Error loading conversation blobs: {e}")
+            return {}
+
     def load_conversation(self, session_id: str) -> List[Dict[str, Any]]:
         """Load conversation from local file
 
@@ -67,15 +186,27 @@ class LocalStorageManager:
             List of messages or empty list if not found
         """
         try:
-            file_path = self.conversations_dir / f"{session_id}.json"
+            file_path = self._conversation_path(session_id)
 
             if not file_path.exists():
-                return []
-
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-
-            return data.get('messages', [])
+                legacy_path = self._legacy_conversation_path(session_id)
+                if not legacy_path.exists():
+                    return []
+                with open(legacy_path, 'r') as f:
+                    data = json.load(f)
+                return data.get('messages', [])
+
+            messages = []
+            with open(file_path, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        messages.append(fastjson.loads(line))
+                    except ValueError:
+                        # A partially written line (e.g. after a crash)
+                        continue
+            return messages
         except Exception as e:
             print(f"Error loading conversation: {e}")
             return []
@@ -90,10 +221,14 @@ class LocalStorageManager:
             True if successful
         """
         try:
-            file_path = self.conversations_dir / f"{session_id}.json"
-
-            if file_path.exists():
-                file_path.unlink()
+            paths = (
+                self._conversation_path(session_id),
+                self._legacy_conversation_path(session_id),
+                self.blobs_dir / f"{session_id}.jsonl"
+            )
+            for file_path in paths:
+                if file_path.exists():
+                    file_path.unlink()
 
             return True
         except Exception as e:
@@ -109,6 +244,20 @@ class LocalStorageManager:
         try:
             conversations = []
 
+            for file_path in self.conversations_dir.glob('*.jsonl'):
+                try:
+                    stat = file_path.stat()
+                    with open(file_path, 'rb') as f:
+                        message_count = f.read().count(b"\n")
+
+                    conversations.append({
+                        'session_id': file_path.stem,
+                        'updated_at': datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                        'message_count': message_count
+                    })
+                except Exception:
+                    continue
+
             for file_path in self.conversations_dir.glob('*.json'):
                 try:
                     with open(file_path, 'r') as f:
@@ -212,7 +361,10 @@ class LocalStorageManager:
             Dictionary with storage stats
         """
         try:
-            conversation_count = len(list(self.conversations_dir.glob('*.json')))
+            conversation_count = (
+                len(list(self.conversations_dir.glob('*.jsonl'))) +
+                len(list(self.conversations_dir.glob('*.json')))
+            )
             project_count = len(list(self.projects_dir.glob('*.json')))
             activity_count = len(list(self.activities_dir.glob('*.json')))
 
@@ -3,6 +3,8 @@ from typing import Any, Dict, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+from ..utils.compat import DATACLASS_SLOTS
+
 
 class ToolStatus(Enum):
     SUCCESS = "success"
@@ -10,7 +12,7 @@ class ToolStatus(Enum):
     PERMISSION_DENIED = "permission_denied"
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class ToolResult:
     """Result from a tool execution"""
     status: ToolStatus
@@ -200,7 +200,7 @@ class EditTool(Tool):
             # Check if old_string exists
             if old_string not in content:
                 # Try to find similar strings for better error message
-                lines = content.split('\n')
+                lines = content.split('\n', 10)
                 preview = '\n'.join(lines[:10]) if len(lines) > 10 else content
                 return ToolResult(
                     status=ToolStatus.ERROR,
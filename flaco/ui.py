@@ -0,0 +1,7 @@
+"""Shared terminal UI objects"""
+
+from rich.console import Console
+
+# One console for the whole process: terminal and color detection run once,
+# and output from every component is coordinated with Live displays
+CONSOLE = Console()
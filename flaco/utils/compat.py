@@ -0,0 +1,6 @@
+"""Compatibility helpers for older Python versions"""
+
+import sys
+
+# dataclass(slots=True) is only available on Python 3.10+
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
@@ -32,15 +32,15 @@ class FlacoCompleter(Completer):
 
         # Quick action completions
         elif text.startswith('#'):
-            action_part = text[1:].lower()
-            for action in self.quick_actions.list_actions():
-                if action.name.lower().startswith(action_part):
-                    completions.append(Completion(
-                        action.name,
-                        start_position=-len(action_part),
-                        display=f"#{action.name}",
-                        display_meta=action.description
-                    ))
+            action_part = text[1:]
+            # Prefix match ignoring case and spaces ("#quickc" -> Quick commit)
+            for action in self.quick_actions.get_suggestions(action_part):
+                completions.append(Completion(
+                    action.name,
+                    start_position=-len(action_part),
+                    display=f"#{action.name}",
+                    display_meta=action.description
+                ))
 
         # Return completions
         for completion in completions:
@@ -103,9 +103,8 @@ class FlacoAutoSuggest(AutoSuggest):
         elif text.startswith('#') and len(text) > 1:
             action_part = text[1:].lower().replace(' ', '')
             # Find first matching action
-            for action in self.quick_actions.list_actions():
-                action_normalized = action.name.lower().replace(' ', '')
-                if action_normalized.startswith(action_part) and action_normalized != action_part:
+            for action in self.quick_actions.get_suggestions(action_part):
+                if action.name.lower().replace(' ', '') != action_part:
                     # Calculate the remaining part
                     # Need to match case and spacing from original
                     typed_len = len(text) - 1  # Exclude the #
@@ -0,0 +1,39 @@
+"""JSON helpers that use orjson when it is installed"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj: Any) -> str:
+    """Serialize obj to a compact JSON string"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode("utf-8")
+        except TypeError:
+            # orjson is stricter (e.g. non-str dict keys); the stdlib handles those
+            pass
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def dumps_bytes(obj: Any, pretty: bool = False) -> bytes:
+    """Serialize obj to UTF-8 encoded JSON (compact, or indented by 2 if pretty)"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+        except TypeError:
+            pass
+    if pretty:
+        return json.dumps(obj, indent=2).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse a JSON string or bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -1,9 +1,10 @@
 """Update checker for Flaco CLI"""
 import json
+import os
+import threading
 import time
 from pathlib import Path
 from typing import Optional, Tuple
-import requests
 
 
 class UpdateChecker:
@@ -12,22 +13,38 @@ class UpdateChecker:
     GITHUB_API_URL = "https://api.github.com/repos/RouraIO/flaco.cli/releases/latest"
     CACHE_FILE = Path.home() / ".flaco" / "update_check.json"
     CACHE_DURATION = 86400  # 24 hours in seconds
+    FORCE_CHECK_DURATION = 30  # Forced checks reuse a fetch this recent
+
+    _refresh_thread: Optional[threading.Thread] = None
+
+    # Last successful fetch in this process: (monotonic time, current_version, result)
+    _last_check: Optional[Tuple[float, str, Tuple[bool, Optional[str], Optional[str]]]] = None
 
     @classmethod
-    def check_for_updates(cls, current_version: str) -> Tuple[bool, Optional[str], Optional[str]]:
+    def check_for_updates(cls, current_version: str, force: bool = False) -> Tuple[bool, Optional[str], Optional[str]]:
         """
         Check if a newer version is available
 
+        With force, the 24h cache file is skipped; only a fetch from the last
+        FORCE_CHECK_DURATION seconds is reused.
+
         Returns:
             (has_update, latest_version, release_notes)
         """
-        # Check cache first
-        cached_result = cls._get_cached_result()
-        if cached_result:
-            return cached_result
+        if force:
+            last_check = cls._last_check
+            if (last_check and last_check[1] == current_version
+                    and time.monotonic() - last_check[0] < cls.FORCE_CHECK_DURATION):
+                return last_check[2]
+        else:
+            # Check cache first
+            cached_result = cls._get_cached_result()
+            if cached_result:
+                return cached_result
 
         # Fetch latest release from GitHub
         try:
+            import requests
             response = requests.get(cls.GITHUB_API_URL, timeout=3)
             response.raise_for_status()
 
@@ -36,7 +53,7 @@ class UpdateChecker:
             release_notes = data.get("body", "")
 
             # Extract first line of release notes as summary
-            summary = release_notes.split('\n')[0] if release_notes else ""
+            summary = release_notes.split('\n', 1)[0] if release_notes else ""
 
             # Compare versions
             has_update = cls._is_newer_version(latest_version, current_version)
@@ -44,6 +61,7 @@ class UpdateChecker:
             # Cache the result
             result = (has_update, latest_version, summary)
             cls._cache_result(result)
+            cls._last_check = (time.monotonic(), current_version, result)
 
             return result
 
@@ -51,6 +69,37 @@ class UpdateChecker:
             # Silently fail - don't interrupt user experience
             return (False, None, None)
 
+    @classmethod
+    def get_cached_update(cls, current_version: str, refresh: bool = True) -> Tuple[bool, Optional[str], Optional[str]]:
+        """
+        Return the last known update status without waiting on the network
+
+        If the cached check is missing or older than CACHE_DURATION and refresh
+        is set, a background check updates the cache for the next launch.
+
+        Returns:
+            (has_update, latest_version, release_notes)
+        """
+        cache = cls._read_cache()
+        if refresh and (cache is None or time.time() - cache.get('timestamp', 0) >= cls.CACHE_DURATION):
+            cls._refresh_in_background(current_version)
+
+        latest_version = cache.get('latest_version') if cache else None
+        if not latest_version:
+            return (False, None, None)
+        # Compared here so the result stays right after upgrading
+        return (cls._is_newer_version(latest_version, current_version), latest_version, cache.get('summary'))
+
+    @classmethod
+    def _refresh_in_background(cls, current_version: str):
+        """Run check_for_updates in a daemon thread (once per process)"""
+        if cls._refresh_thread is not None:
+            return
+        cls._refresh_thread = threading.Thread(
+            target=cls.check_for_updates, args=(current_version,), daemon=True
+        )
+        cls._refresh_thread.start()
+
     @classmethod
     def _is_newer_version(cls, latest: str, current: str) -> bool:
         """Compare version strings (e.g., '0.3.0' vs '0.2.9')"""
@@ -77,24 +126,27 @@ class UpdateChecker:
             return False
 
     @classmethod
-    def _get_cached_result(cls) -> Optional[Tuple[bool, Optional[str], Optional[str]]]:
-        """Get cached update check result if still valid"""
-        if not cls.CACHE_FILE.exists():
-            return None
-
+    def _read_cache(cls) -> Optional[dict]:
+        """Read the cached update check, fresh or not"""
         try:
             with open(cls.CACHE_FILE, 'r') as f:
                 cache = json.load(f)
-
-            # Check if cache is still valid
-            if time.time() - cache.get('timestamp', 0) < cls.CACHE_DURATION:
-                return (
-                    cache.get('has_update', False),
-                    cache.get('latest_version'),
-                    cache.get('summary')
-                )
+            return cache if isinstance(cache, dict) else None
         except:
-            pass
+            return None
+
+    @classmethod
+    def _get_cached_result(cls) -> Optional[Tuple[bool, Optional[str], Optional[str]]]:
+        """Get cached update check result if still valid"""
+        cache = cls._read_cache()
+
+        # Check if cache is still valid
+        if cache and time.time() - cache.get('timestamp', 0) < cls.CACHE_DURATION:
+            return (
+                cache.get('has_update', False),
+                cache.get('latest_version'),
+                cache.get('summary')
+            )
 
         return None
 
@@ -111,7 +163,10 @@ class UpdateChecker:
                 'summary': result[2]
             }
 
-            with open(cls.CACHE_FILE, 'w') as f:
+            # Written from a daemon thread, so never leave a half-written file
+            tmp_file = cls.CACHE_FILE.with_suffix(".tmp")
+            with open(tmp_file, 'w') as f:
                 json.dump(cache, f)
+            os.replace(tmp_file, cls.CACHE_FILE)
         except:
             pass  # Silently fail if can't cache
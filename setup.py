@@ -38,6 +38,12 @@ setup(
         "pydantic>=2.5.0",
         "watchdog>=3.0.0",
     ],
+    extras_require={
+        # Exact token counting for context truncation (falls back to an estimate)
+        "tokens": ["tiktoken>=0.5.0"],
+        # Faster JSON (de)serialization (falls back to the stdlib json module)
+        "speed": ["orjson>=3.9.0"],
+    },
     entry_points={
         "console_scripts": [
             "flaco.premium=flaco.cli:main",
@@ -0,0 +1,345 @@
+"""Tests for FlacoAgent helpers"""
+
+import atexit
+import json
+import unittest
+from unittest.mock import Mock, patch
+from flaco.agent import FlacoAgent, MIN_HISTORY_TOKENS, _JsonObjectScanner, _iter_json_candidates
+from flaco.tools.base import ToolResult, ToolStatus
+from flaco.context.window import COMPACTED_PREFIX
+
+
+class TestJsonToolCallExtraction(unittest.TestCase):
+    """Test fallback JSON tool call parsing"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        # Extraction doesn't touch instance state, so skip the heavy __init__
+        self.agent = FlacoAgent.__new__(FlacoAgent)
+
+    def test_iter_candidates_nested(self):
+        """Test nested objects are returned as one top-level candidate"""
+        text = 'before {"a": {"b": {"c": 1}}} middle {"d": 2} after'
+        self.assertEqual(list(_iter_json_candidates(text)), ['{"a": {"b": {"c": 1}}}', '{"d": 2}'])
+
+    def test_iter_candidates_braces_in_strings(self):
+        """Test braces and escaped quotes inside strings are ignored"""
+        text = '{"content": "def f() { return \\"}\\" }"}'
+        self.assertEqual(list(_iter_json_candidates(text)), [text])
+
+    def test_iter_candidates_unbalanced(self):
+        """Test stray closing braces and unterminated objects"""
+        self.assertEqual(list(_iter_json_candidates('} {"a": 1')), [])
+
+    def test_extract_tool_call(self):
+        """Test a tool call embedded in prose is extracted"""
+        text = 'Let me read it:\n{"name": "Read", "arguments": {"file_path": "/tmp/x.py"}}\nDone.'
+        tool_calls = self.agent._extract_json_tool_calls(text)
+
+        self.assertEqual(len(tool_calls), 1)
+        self.assertEqual(tool_calls[0]["function"]["name"], "Read")
+        self.assertEqual(tool_calls[0]["function"]["arguments"], {"file_path": "/tmp/x.py"})
+
+    def test_scanner_across_chunks(self):
+        """Test objects split across streamed chunks are completed"""
+        scanner = _JsonObjectScanner()
+        self.assertEqual(scanner.feed('text {"a": "}'), [])
+        self.assertEqual(scanner.feed('{", "b": 1'), [])
+        self.assertEqual(scanner.feed('} tail'), ['{"a": "}{", "b": 1}'])
+
+    def test_extract_ignores_non_tool_json(self):
+        """Test plain JSON objects are not treated as tool calls"""
+        text = 'Config: {"name": "app", "version": 2} and {"x": 1}'
+        self.assertEqual(self.agent._extract_json_tool_calls(text), [])
+
+
+class TestSystemPrompt(unittest.TestCase):
+    """Test per-agent system prompts"""
+
+    def test_edited_agent_prompt_not_stale(self):
+        """Test an agent whose prompt changed under the same name gets the new prompt"""
+        agent = FlacoAgent.__new__(FlacoAgent)
+        agent.base_system_prompt = "base\n"
+        agent._agent_prompt_cache = {}
+        specialist = Mock(system_prompt_addition="old")
+        specialist.name = "Helper"
+
+        self.assertEqual(agent._build_system_prompt(specialist), "base\nold")
+        specialist.system_prompt_addition = "new"
+        self.assertEqual(agent._build_system_prompt(specialist), "base\nnew")
+
+
+class TestHandleToolCalls(unittest.TestCase):
+    """Test tool call execution from parsed or string arguments"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.agent = FlacoAgent.__new__(FlacoAgent)
+        self.agent.messages = []
+        self.agent.max_tool_result_tokens = 100
+        self.agent.storage = Mock(connected=False)
+        self.agent._dirty = False
+        self.agent._blob_store = {}
+        self.agent._pending_blobs = {}
+        self.agent._execute_tool = Mock(return_value=ToolResult(status=ToolStatus.SUCCESS, output="ok"))
+        # Saves register the agent for exit; don't flush test agents then
+        self.addCleanup(atexit.unregister, self.agent._flush_conversation)
+
+    def test_dict_and_string_arguments(self):
+        """Test both argument encodings reach the tool as a dict"""
+        self.agent._handle_tool_calls([
+            {"id": "a", "function": {"name": "Read", "arguments": {"file_path": "/tmp/a"}}},
+            {"id": "b", "function": {"name": "Read", "arguments": '{"file_path": "/tmp/b"}'}},
+        ])
+        calls = [c.args for c in self.agent._execute_tool.call_args_list]
+        self.assertEqual(calls, [("Read", {"file_path": "/tmp/a"}), ("Read", {"file_path": "/tmp/b"})])
+        self.assertEqual(len(self.agent.messages), 4)
+        self.assertTrue(self.agent._dirty)
+
+    def test_large_results_deduplicated(self):
+        """Test identical large tool results are stored once and resolved by ref"""
+        output = "line\n" * 60
+        self.agent._execute_tool.return_value = ToolResult(status=ToolStatus.SUCCESS, output=output)
+        call = {"id": "a", "function": {"name": "Read", "arguments": {"file_path": "/tmp/a"}}}
+
+        self.agent._handle_tool_calls([call, call])
+
+        first, second = self.agent.messages[1], self.agent.messages[3]
+        self.assertEqual(first["content_ref"], second["content_ref"])
+        self.assertEqual(len(self.agent._blob_store), 1)
+        self.assertEqual(json.loads(self.agent.message_content(second))["output"], output)
+
+    def test_small_results_inline(self):
+        """Test small tool results stay inline"""
+        self.agent._handle_tool_calls([{"id": "a", "function": {"name": "Read", "arguments": {}}}])
+        self.assertNotIn("content_ref", self.agent.messages[1])
+        self.assertEqual(self.agent._blob_store, {})
+
+
+class TestStreamLlm(unittest.TestCase):
+    """Test streamed LLM responses"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.agent = FlacoAgent.__new__(FlacoAgent)
+        self.agent._tool_schemas = []
+        self.agent.on_stream = None
+        self.agent.llm = Mock()
+        self.closed = False
+
+    def _stream(self, chunks):
+        """Fake Ollama stream that records whether it was closed early"""
+        try:
+            for chunk in chunks:
+                yield chunk
+        finally:
+            self.closed = True
+
+    def test_collects_text_and_stats(self):
+        """Test content chunks are joined and final stats kept"""
+        self.agent.llm.chat.return_value = self._stream([
+            {"message": {"content": "Hel"}, "done": False},
+            {"message": {"content": "lo"}, "done": False},
+            {"message": {"content": ""}, "done": True, "eval_count": 7},
+        ])
+        seen = []
+        self.agent.on_stream = seen.append
+
+        response = self.agent._stream_llm([])
+
+        self.assertEqual(response["message"]["content"], "Hello")
+        self.assertEqual(response["eval_count"], 7)
+        self.assertEqual(seen, ["Hel", "lo"])
+
+    def test_reads_all_text_tool_calls(self):
+        """Test every tool call written as text is kept"""
+        self.agent.llm.chat.return_value = self._stream([
+            {"message": {"content": '{"name": "Read", "arguments": '}},
+            {"message": {"content": '{"file_path": "/tmp/a"}}\n'}},
+            {"message": {"content": '{"name": "Read", "arguments": {"file_path": "/tmp/b"}}'}},
+            {"message": {"content": ""}, "done": True},
+        ])
+
+        response = self.agent._stream_llm([])
+
+        self.assertTrue(self.closed)
+        calls = self.agent._extract_json_tool_calls(response["message"]["content"])
+        self.assertEqual([c["function"]["arguments"]["file_path"] for c in calls], ["/tmp/a", "/tmp/b"])
+
+    def test_native_tool_calls(self):
+        """Test native tool_calls from every chunk are returned on the message"""
+        first = {"function": {"name": "Bash", "arguments": {"command": "ls"}}}
+        second = {"function": {"name": "Read", "arguments": {"file_path": "/tmp/a"}}}
+        self.agent.llm.chat.return_value = self._stream([
+            {"message": {"content": "", "tool_calls": [first]}},
+            {"message": {"content": "", "tool_calls": [second]}},
+            {"message": {"content": ""}, "done": True, "eval_count": 12, "prompt_eval_count": 30},
+        ])
+        response = self.agent._stream_llm([])
+        self.assertEqual(response["message"]["tool_calls"], [first, second])
+        self.assertEqual(response["eval_count"], 12)
+        self.assertEqual(response["prompt_eval_count"], 30)
+
+    def test_estimates_missing_counts(self):
+        """Test token counts are estimated when the stream doesn't report them"""
+        self.agent.llm.chat.return_value = self._stream([
+            {"message": {"content": "Hello there"}},
+        ])
+        response = self.agent._stream_llm([{"role": "user", "content": "hi"}])
+        self.assertGreater(response["eval_count"], 0)
+        self.assertGreater(response["prompt_eval_count"], 0)
+
+
+class TestContextWindow(unittest.TestCase):
+    """Test context message selection"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.agent = FlacoAgent.__new__(FlacoAgent)
+        self.agent.context_limit = 10
+        self.agent.sink_size = 4
+
+    def test_short_history_untouched(self):
+        """Test histories within the limit are returned as-is"""
+        self.agent.messages = [{"role": "user", "content": str(i)} for i in range(10)]
+        self.assertIs(self.agent._select_context_messages(), self.agent.messages)
+
+    def test_keeps_sink_and_recent(self):
+        """Test the first messages are pinned and the tail is kept"""
+        self.agent.messages = [{"role": "user", "content": str(i)} for i in range(30)]
+        selected = [m["content"] for m in self.agent._select_context_messages()]
+        self.assertEqual(selected, ["0", "1", "2", "3"] + [str(i) for i in range(24, 30)])
+
+    def test_window_starts_at_user_turn(self):
+        """Test the recent window doesn't begin mid tool exchange"""
+        messages = [{"role": "user", "content": str(i)} for i in range(16)]
+        messages += [{"role": "assistant", "tool_calls": []}, {"role": "tool", "content": "x"}]
+        messages += [{"role": "user", "content": "next"}, {"role": "assistant", "content": "ok"}]
+        messages += [{"role": "user", "content": "last"}, {"role": "assistant", "content": "ok"}]
+        self.agent.messages = messages
+        selected = self.agent._select_context_messages()
+        self.assertEqual(selected[4]["content"], "next")
+        self.assertEqual(len(selected), 8)
+
+    def test_oversized_prompt_keeps_history_budget(self):
+        """Test a system prompt larger than the window still leaves a positive budget"""
+        self.agent.messages = [{"role": "user", "content": "hi"}]
+        self.agent.current_agent = None
+        self.agent.swarm_notes = ""
+        self.agent.base_system_prompt = "x" * 100000
+        self.agent.max_context_tokens = 1000
+        self.agent._stream_llm = Mock(return_value={})
+
+        with patch("flaco.agent.truncate_messages", side_effect=lambda m, budget: m) as truncate:
+            self.agent._call_llm()
+
+        self.assertEqual(truncate.call_args[0][1], MIN_HISTORY_TOKENS)
+
+
+class TestCompaction(unittest.TestCase):
+    """Test summarizing old turns into a compacted memory"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.agent = FlacoAgent.__new__(FlacoAgent)
+        self.agent.sink_size = 2
+        self.agent.max_context_tokens = 100
+        self.agent.compact_threshold = 0.8
+        self.agent.compact_keep_recent = 2
+        self.agent._dirty = False
+        self.agent._blob_store = {}
+        self.agent.storage = Mock(connected=False)
+        self.agent.llm = Mock()
+        self.agent.llm.chat.return_value = {"message": {"content": "edited /tmp/app.py"}}
+        # Saves register the agent for exit; don't flush test agents then
+        self.addCleanup(atexit.unregister, self.agent._flush_conversation)
+
+    def test_no_compaction_under_threshold(self):
+        """Test small histories are left alone"""
+        self.agent.messages = [{"role": "user", "content": "hi"}]
+        self.assertFalse(self.agent._compact_if_needed())
+        self.agent.llm.chat.assert_not_called()
+
+    def test_compacts_middle_turns(self):
+        """Test old turns after the sink are replaced by one memory message"""
+        roles = ["user", "assistant"] * 5
+        self.agent.messages = [{"role": r, "content": "z" * 80} for r in roles]
+        sink = self.agent.messages[:2]
+        recent = self.agent.messages[-2:]
+
+        self.assertTrue(self.agent._compact_if_needed())
+        self.assertEqual(self.agent.messages[:2], sink)
+        self.assertEqual(self.agent.messages[-2:], recent)
+        self.assertEqual(len(self.agent.messages), 5)
+        self.assertTrue(self.agent.messages[2]["content"].startswith(COMPACTED_PREFIX))
+        self.assertNotIn("compacted", self.agent.messages[2])
+        self.assertIn("/tmp/app.py", self.agent.messages[2]["content"])
+
+
+class TestConversationFlush(unittest.TestCase):
+    """Test coalesced conversation saves"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.agent = FlacoAgent.__new__(FlacoAgent)
+        self.agent.session_id = "s1"
+        self.agent.messages = [{"role": "user", "content": "hi"}]
+        self.agent.storage = Mock(connected=True)
+        self.agent._dirty = False
+        self.agent._persisted_count = 0
+        self.agent._pending_blobs = {}
+        # Saves register the agent for exit; don't flush test agents then
+        self.addCleanup(atexit.unregister, self.agent._flush_conversation)
+
+    def test_saves_are_coalesced(self):
+        """Test repeated saves result in a single append on flush"""
+        self.agent._save_conversation()
+        self.agent._save_conversation()
+        self.agent.storage.append_messages.assert_not_called()
+
+        self.agent._flush_conversation()
+        self.agent._flush_conversation()
+        self.agent.storage.append_messages.assert_called_once_with("s1", self.agent.messages)
+
+    def test_only_new_messages_appended(self):
+        """Test a flush appends just the messages added since the last one"""
+        self.agent._save_conversation()
+        self.agent._flush_conversation()
+        self.agent.messages.append({"role": "assistant", "content": "hello"})
+        self.agent._save_conversation()
+        self.agent._flush_conversation()
+
+        last_args = self.agent.storage.append_messages.call_args.args
+        self.assertEqual(last_args, ("s1", [{"role": "assistant", "content": "hello"}]))
+        self.agent.storage.save_conversation.assert_not_called()
+
+    def test_rewrite_after_compaction(self):
+        """Test rewritten history is saved in full"""
+        self.agent._persisted_count = None
+        self.agent._save_conversation()
+        self.agent._flush_conversation()
+        self.agent.storage.save_conversation.assert_called_once_with("s1", self.agent.messages)
+        self.assertEqual(self.agent._persisted_count, 1)
+
+    def test_exit_hook_only_while_dirty(self):
+        """Test the agent is registered for exit only while it has unwritten history"""
+        with patch("flaco.agent.atexit") as atexit_mock:
+            self.agent._save_conversation()
+            self.agent._save_conversation()
+            atexit_mock.register.assert_called_once_with(self.agent._flush_conversation)
+
+            self.agent._flush_conversation()
+            atexit_mock.unregister.assert_called_once_with(self.agent._flush_conversation)
+
+    def test_failed_write_stays_dirty(self):
+        """Test a failed write is retried by a later flush"""
+        self.agent.storage.append_messages.return_value = False
+        self.agent._save_conversation()
+        self.agent._flush_conversation()
+
+        self.assertTrue(self.agent._dirty)
+        self.assertEqual(self.agent._persisted_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+"""Tests for specialized agent routing"""
+
+import unittest
+from flaco.agents import AgentRouter, AgentType, SpecializedAgent
+from flaco.agents.specialized_agents import _compile_matcher
+
+
+class TestAgentRouter(unittest.TestCase):
+    """Test keyword-based agent routing"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.router = AgentRouter()
+
+    def assertRoutes(self, message, agent_type):
+        """Assert a message is routed to the given agent type"""
+        self.assertEqual(self.router.route(message).agent_type, agent_type)
+
+    def test_routes_by_keyword(self):
+        """Test each category is recognized"""
+        self.assertRoutes("Optimize this SQL query", AgentType.DATABASE)
+        self.assertRoutes("set up an n8n webhook", AgentType.N8N)
+        self.assertRoutes("build a flask backend", AgentType.BACKEND)
+        self.assertRoutes("fix the xss bug", AgentType.SECURITY)
+        self.assertRoutes("create a react component", AgentType.FRONTEND)
+        self.assertRoutes("deploy to kubernetes", AgentType.DEVOPS)
+        self.assertRoutes("review my code", AgentType.CODE_REVIEW)
+        self.assertRoutes("write swagger docs", AgentType.API)
+        self.assertRoutes("open a tcp socket", AgentType.NETWORKING)
+
+    def test_priority_order(self):
+        """Test earlier categories win when several match"""
+        self.assertRoutes("secure the database", AgentType.DATABASE)
+        self.assertRoutes("explain rest api design", AgentType.BACKEND)
+        self.assertRoutes("add a ci/cd pipeline", AgentType.DEVOPS)
+
+    def test_whole_words_only(self):
+        """Test keywords inside other words don't trigger a category"""
+        # 'ui' in 'rebuild', 'orm' in 'format'
+        self.assertRoutes("please rebuild and format the project", AgentType.GENERAL)
+        self.assertRoutes("migrate the databases", AgentType.DATABASE)
+
+    def test_inflected_keywords(self):
+        """Test inflected forms of keywords still route to the specialist"""
+        self.assertRoutes("refactoring the parser", AgentType.CODE_REVIEW)
+        self.assertRoutes("reviewing this PR", AgentType.CODE_REVIEW)
+        self.assertRoutes("deployment is failing", AgentType.DEVOPS)
+        self.assertRoutes("write a dockerfile", AgentType.DEVOPS)
+        self.assertRoutes("containerize the app", AgentType.DEVOPS)
+        self.assertRoutes("migrate to postgresql", AgentType.DATABASE)
+        self.assertRoutes("add indexes", AgentType.DATABASE)
+        self.assertRoutes("slow queries", AgentType.DATABASE)
+        self.assertRoutes("networking issue", AgentType.NETWORKING)
+        self.assertRoutes("fetching data", AgentType.NETWORKING)
+        self.assertRoutes("automating emails", AgentType.N8N)
+
+    def test_repeat_messages_cached(self):
+        """Test repeated messages (modulo case/whitespace) reuse the cached route"""
+        self.router.route("Deploy  to kubernetes")
+        hits = self.router._route_impl.cache_info().hits
+        self.assertRoutes("deploy to   Kubernetes", AgentType.DEVOPS)
+        self.assertEqual(self.router._route_impl.cache_info().hits, hits + 1)
+
+    def test_long_messages_routed(self):
+        """Test long messages bypass the cache but are still routed"""
+        self.assertRoutes("x " * 2000 + "docker", AgentType.DEVOPS)
+
+    def test_default_agent(self):
+        """Test messages without keywords go to the general agent"""
+        self.assertRoutes("tell me a joke", AgentType.GENERAL)
+        self.assertIs(self.router.route("hi!"), self.router.default_agent)
+
+    def test_get_agent_by_type(self):
+        """Test every agent type resolves to its own agent"""
+        for agent_type in AgentType:
+            self.assertEqual(self.router.get_agent(agent_type).agent_type, agent_type)
+        self.assertEqual(AgentType.CODE_REVIEW.label, "code_review")
+
+    def test_compiled_matcher(self):
+        """Test the generated matcher checks rules in order"""
+        match = _compile_matcher((
+            (AgentType.API, lambda m: "api gateway" in m),
+            (AgentType.DEVOPS, lambda m: "docker" in m),
+        ))
+        self.assertEqual(match("docker"), AgentType.DEVOPS)
+        self.assertEqual(match("docker api gateway"), AgentType.API)
+        self.assertEqual(match("hello"), AgentType.GENERAL)
+
+
+class TestSpecializedAgent(unittest.TestCase):
+    """Test agent system prompt additions"""
+
+    def test_prompt_addition_from_type(self):
+        """Test built-in agents get their specialization prompt"""
+        agent = AgentRouter().get_agent(AgentType.SECURITY)
+        self.assertIn("Security", agent.system_prompt_addition)
+        self.assertEqual(agent.get_system_prompt_addition(), agent.system_prompt_addition)
+
+    def test_prompt_addition_override(self):
+        """Test an explicit prompt addition (custom agents) is kept"""
+        agent = SpecializedAgent(
+            name="Rust Expert", agent_type=AgentType.GENERAL, emoji="🦀",
+            expertise="Rust", personality="Rust", thinking_messages=["Borrowing"],
+            system_prompt_addition="\n# Rust Expert\n"
+        )
+        self.assertEqual(agent.system_prompt_addition, "\n# Rust Expert\n")
+
+    def test_thinking_messages(self):
+        """Test thinking messages are frozen and picked from the agent's list"""
+        agent = AgentRouter().get_agent(AgentType.DATABASE)
+        self.assertIsInstance(agent.thinking_messages, tuple)
+        self.assertIn(agent.get_random_thinking_message(), agent.thinking_messages)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+"""Tests for agent swarm task analysis"""
+
+import json
+import unittest
+from flaco.agents import AgentRouter
+from flaco.intelligence import AgentSwarm
+
+
+class TestAgentSwarm(unittest.TestCase):
+    """Test swarm detection"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.swarm = AgentSwarm(AgentRouter())
+
+    def test_summary_is_serializable(self):
+        """Test the metrics summary is small, JSON-safe and cached"""
+        task = self.swarm.analyze_task("Build a full stack todo app")
+
+        summary = task.summary
+        self.assertEqual(summary["complexity"], task.complexity.value)
+        self.assertEqual(summary["primary_agent"], "backend")
+        self.assertEqual(summary["n_agents"], len(task.required_agents))
+        self.assertEqual(json.loads(json.dumps(summary)), summary)
+        self.assertIs(task.summary, summary)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,207 @@
+"""Tests for CLI helpers"""
+
+import asyncio
+import io
+import os
+import threading
+import unittest
+from unittest.mock import Mock, patch
+from rich.console import Console
+from rich.markdown import Markdown
+from flaco import cli
+from flaco.commands.quick_actions import QuickActionManager
+
+
+class TestRunShellCommands(unittest.TestCase):
+    """Test quick action shell command batches"""
+
+    def run_commands(self, commands):
+        """Run commands and return what was printed"""
+        output = io.StringIO()
+        with patch.object(cli, "console", Console(file=output, width=120)):
+            cli.run_shell_commands(commands)
+        return output.getvalue()
+
+    def test_one_shell_for_the_batch(self):
+        """Test state carries over and failures don't stop later commands"""
+        output = self.run_commands(["X=42", "false", "echo value=$X"])
+
+        self.assertIn("→ false", output)
+        self.assertIn("Command failed with exit code 1", output)
+        self.assertIn("value=42", output)
+
+    def test_empty_batch(self):
+        """Test nothing runs for an empty batch"""
+        self.assertEqual(self.run_commands([]), "")
+
+
+class TestPrintMarkdown(unittest.TestCase):
+    """Test the plain-text fast path for responses"""
+
+    def render(self, text):
+        """Return (fast path output, Markdown output) for text"""
+        output = io.StringIO()
+        with patch.object(cli, "console", Console(file=output, width=60)):
+            cli.print_markdown(text)
+        expected = io.StringIO()
+        Console(file=expected, width=60).print(Markdown(text))
+        return output.getvalue(), expected.getvalue()
+
+    def test_plain_prose_matches_markdown(self):
+        """Test plain text prints as Markdown would render it (minus line padding)"""
+        for text in ["Yes.", "It costs 5 dollars, about 3:30 :smile:", "First paragraph.\n\nSecond one."]:
+            with self.subTest(text=text):
+                self.assertIsNone(cli._MARKDOWN_RE.search(text))
+                fast, expected = self.render(text)
+                self.assertEqual(fast.splitlines(), [line.rstrip() for line in expected.splitlines()])
+
+    def test_markdown_detected(self):
+        """Test markdown syntax and soft line breaks take the Markdown path"""
+        for text in ["# Title", "use `x`", "- item", "1. step", "a | b", "line one\nline two", "    code"]:
+            with self.subTest(text=text):
+                self.assertIsNotNone(cli._MARKDOWN_RE.search(text))
+        self.assertIsNone(cli._MARKDOWN_RE.search("Sure, that works. It's 42 - done!"))
+
+
+class TestPrefixHandlers(unittest.TestCase):
+    """Test dispatch of '/', '#' and '@' input"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.ctx = cli._PromptContext(Mock(), Mock(commands={"help": None}), QuickActionManager())
+        self.output = io.StringIO()
+        patcher = patch.object(cli, "console", Console(file=self.output, width=120))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def dispatch(self, user_input):
+        """Run the handler for user_input and return whether it was handled"""
+        return cli._PREFIX_HANDLERS[user_input[:1]](user_input, self.ctx)
+
+    def test_slash_command(self):
+        """Test slash commands go to the handler and '/' lists them"""
+        self.assertTrue(self.dispatch("/help"))
+        self.ctx.slash_handler.handle_command.assert_called_once_with("/help")
+
+        self.assertTrue(self.dispatch("/"))
+        self.assertIn("/help", self.output.getvalue())
+
+    def test_quick_action_runs_slash_commands(self):
+        """Test a quick action's slash commands are run in order"""
+        self.assertTrue(self.dispatch("#fresh start"))
+        self.ctx.slash_handler.handle_command.assert_called_once_with("/clear")
+        self.assertIn("Quick action completed", self.output.getvalue())
+
+    def test_unknown_quick_action(self):
+        """Test unknown actions list what is available"""
+        self.assertTrue(self.dispatch("#nope"))
+        self.assertIn("Unknown quick action", self.output.getvalue())
+
+    def test_at_without_image_is_chat(self):
+        """Test '@' input that isn't an image attachment falls through to chat"""
+        self.assertFalse(self.dispatch("@team what's next?"))
+        self.ctx.agent.chat_with_image.assert_not_called()
+
+    def test_image_attachment(self):
+        """Test @image: input is answered by the vision model"""
+        self.ctx.agent.chat_with_image.return_value = "A cat."
+        self.assertTrue(self.dispatch("@image:/tmp/cat.png"))
+        self.ctx.agent.chat_with_image.assert_called_once_with("What's in this image?", "/tmp/cat.png")
+        self.assertIn("A cat.", self.output.getvalue())
+
+
+class TestRunChatTurn(unittest.TestCase):
+    """Test waiting on a chat turn"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.loop = asyncio.new_event_loop()
+        self.agent = Mock(on_stream=None)
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.loop.close()
+
+    def test_returns_chat_result(self):
+        """Test the response and metrics are returned once the chat finishes"""
+        self.agent.chat.return_value = ("hi", {"tokens": 3})
+        result = self.loop.run_until_complete(cli._run_chat_turn(self.agent, "hello"))
+
+        self.assertEqual(result, ("hi", {"tokens": 3}))
+        self.agent.chat.assert_called_once_with("hello")
+
+    def test_escape_interrupts_and_stops_stream(self):
+        """Test ESC ends the wait and the chat stops at its next chunk"""
+        release = threading.Event()
+        stopped = []
+
+        def chat(message):
+            release.wait(5)
+            try:
+                self.agent.on_stream("more")
+            except KeyboardInterrupt:
+                stopped.append(True)
+                raise
+            return "late", {}
+
+        self.agent.chat.side_effect = chat
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, b"\x1b")
+        try:
+            result = self.loop.run_until_complete(cli._run_chat_turn(self.agent, "hello", read_fd))
+        finally:
+            release.set()
+            os.close(read_fd)
+            os.close(write_fd)
+            cli.interrupt_requested = False
+        self.loop.run_until_complete(self.loop.shutdown_default_executor())
+
+        self.assertIsNone(result)
+        self.assertEqual(stopped, [True])
+        # The abandoned chat put the original hook back, so later chats stream normally
+        self.assertIsNone(self.agent.on_stream)
+
+    def test_interrupt_only_stops_its_own_chat(self):
+        """Test an interrupted turn's hook doesn't abort chats run outside it"""
+        release = threading.Event()
+        finished = threading.Event()
+        received = []
+
+        def chat(message):
+            if message == "hello":
+                release.wait(5)
+                finished.set()
+                return "late", {}
+            self.agent.on_stream("chunk")
+            return "ok", {}
+
+        self.agent.chat.side_effect = chat
+        self.agent.on_stream = received.append
+        original = self.agent.on_stream
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, b"\x1b")
+        try:
+            result = self.loop.run_until_complete(cli._run_chat_turn(self.agent, "hello", read_fd))
+            # A chat started directly (e.g. by /review) while the old one is still running
+            self.assertEqual(self.agent.chat("review"), ("ok", {}))
+        finally:
+            release.set()
+            os.close(read_fd)
+            os.close(write_fd)
+            cli.interrupt_requested = False
+        finished.wait(5)
+        self.loop.run_until_complete(self.loop.shutdown_default_executor())
+
+        self.assertIsNone(result)
+        self.assertEqual(received, ["chunk"])
+        self.assertIs(self.agent.on_stream, original)
+
+    def test_hook_restored_after_chat(self):
+        """Test the agent's stream hook is put back once a turn completes"""
+        self.agent.chat.return_value = ("hi", {})
+        self.loop.run_until_complete(cli._run_chat_turn(self.agent, "hello"))
+        self.assertIsNone(self.agent.on_stream)
+
+
+if __name__ == '__main__':
+    unittest.main()
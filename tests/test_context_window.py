@@ -0,0 +1,99 @@
+"""Tests for token-aware context window helpers"""
+
+import unittest
+from unittest.mock import Mock, patch
+from flaco.context import window
+from flaco.context.window import COMPACTED_PREFIX, count_message_tokens, count_tokens, truncate_messages, truncate_text
+
+
+@patch.object(window, "_get_encoder", return_value=None)
+class TestContextWindow(unittest.TestCase):
+    """Test truncation using the length-based token estimate"""
+
+    def test_truncate_text_short(self, _):
+        """Test text under the limit is unchanged"""
+        self.assertEqual(truncate_text("hello", 10), "hello")
+
+    def test_truncate_text_long(self, _):
+        """Test long text is cut and marked"""
+        result = truncate_text("x" * 100, 5)
+        self.assertTrue(result.startswith("x" * 20))
+        self.assertTrue(result.endswith("[truncated]"))
+
+    def test_messages_within_budget(self, _):
+        """Test nothing is dropped when the budget fits"""
+        messages = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+        self.assertEqual(truncate_messages(messages, 1000), messages)
+
+    def test_drops_assistant_before_user(self, _):
+        """Test old assistant turns go first and the first user message stays"""
+        big = "y" * 400  # ~100 tokens each
+        messages = [
+            {"role": "user", "content": "goal " + big},
+            {"role": "assistant", "content": big},
+            {"role": "user", "content": big},
+            {"role": "assistant", "content": big},
+            {"role": "user", "content": "latest"},
+        ]
+        result = truncate_messages(messages, 300, sink=1)
+
+        self.assertIs(result[0], messages[0])
+        self.assertIs(result[-1], messages[-1])
+        self.assertNotIn(messages[1], result)
+        self.assertNotIn(messages[3], result)
+        self.assertIn(messages[2], result)
+
+    def test_counts_stored_tool_results(self, _):
+        """Test a tool message stored by hash is sized from the blob store"""
+        message = {"role": "tool", "content": "", "content_ref": "abc"}
+        self.assertEqual(count_message_tokens(message, {"abc": "z" * 400}), 100 + window.MESSAGE_OVERHEAD)
+        self.assertEqual(count_message_tokens(message), window.MESSAGE_OVERHEAD)
+
+    def test_keeps_compacted_summary(self, _):
+        """Test a compacted memory message is never evicted"""
+        big = "y" * 400
+        messages = [
+            {"role": "user", "content": "goal"},
+            {"role": "system", "content": COMPACTED_PREFIX + big},
+            {"role": "assistant", "content": big},
+            {"role": "user", "content": "latest"},
+        ]
+        result = truncate_messages(messages, 120, sink=1)
+
+        self.assertIn(messages[1], result)
+        self.assertNotIn(messages[2], result)
+
+
+
+class TestTokenCache(unittest.TestCase):
+    """Test token counts are cached by content digest"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        window._token_cache.clear()
+        self.encoder = Mock()
+        self.encoder.encode.side_effect = lambda text, **_: text.split()
+
+    def tearDown(self):
+        """Drop counts from the fake encoder"""
+        window._token_cache.clear()
+
+    def test_repeated_text_encoded_once(self):
+        """Test the same text is only tokenized once"""
+        with patch.object(window, "_get_encoder", return_value=self.encoder):
+            self.assertEqual(count_tokens("a b c"), 3)
+            self.assertEqual(count_tokens("a b c"), 3)
+        self.assertEqual(self.encoder.encode.call_count, 1)
+
+    def test_cache_does_not_hold_text(self):
+        """Test cache keys are fixed-size digests and the cache is bounded"""
+        with patch.object(window, "_get_encoder", return_value=self.encoder), \
+                patch.object(window, "TOKEN_CACHE_SIZE", 2):
+            for text in ("a " * 1000, "b", "c"):
+                count_tokens(text)
+        self.assertEqual(len(window._token_cache), 2)
+        self.assertTrue(all(len(key) == 16 for key in window._token_cache))
+
+
+if __name__ == '__main__':
+    unittest.main()
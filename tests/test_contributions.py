@@ -0,0 +1,179 @@
+"""Tests for contribution tracking"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from flaco.analytics import ContributionTracker, contributions
+from flaco.analytics.contributions import Activity, ActivityType
+
+
+class TestContributionTracker(unittest.TestCase):
+    """Test activity logging and statistics"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.tracker = ContributionTracker(config_dir=self.temp_dir)
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.tracker.flush()
+        shutil.rmtree(self.temp_dir)
+
+    def _add(self, days_ago: int, activity_type: ActivityType = ActivityType.CHAT_MESSAGE):
+        """Add an activity dated days_ago days before now"""
+        timestamp = (datetime.now() - timedelta(days=days_ago)).isoformat()
+        self.tracker._add_activity(Activity(type=activity_type.label, timestamp=timestamp, details={}))
+
+    def test_contribution_map_counts(self):
+        """Test activities are counted on their day"""
+        self._add(0)
+        self._add(0)
+        self._add(2)
+        self._add(400)
+
+        contribution_map = self.tracker.get_contribution_map(days=30)
+        today = datetime.now().date().isoformat()
+        two_days_ago = (datetime.now() - timedelta(days=2)).date().isoformat()
+
+        self.assertEqual(contribution_map[today], 2)
+        self.assertEqual(contribution_map[two_days_ago], 1)
+        self.assertEqual(sum(contribution_map.values()), 3)
+
+    def test_activities_for_date(self):
+        """Test activities are selected by calendar day"""
+        self._add(0)
+        self._add(1)
+
+        today = self.tracker.get_activities_for_date(datetime.now())
+        self.assertEqual(len(today), 1)
+        self.assertEqual(today[0].date_str, datetime.now().date().isoformat())
+
+    def test_log_activity_persists(self):
+        """Test logged activities are reloaded by a new tracker"""
+        self.tracker.log_activity(ActivityType.GIT_COMMIT, {"message": "init"}, project="flaco")
+        self.tracker.flush()
+
+        reloaded = ContributionTracker(config_dir=self.temp_dir)
+        self.assertEqual(len(reloaded.activities), 1)
+        self.assertEqual(reloaded.activities[0].project, "flaco")
+
+    def test_log_lines_compact(self):
+        """Test log lines have no whitespace padding or null project"""
+        self.tracker.log_activity(ActivityType.TOOL_EXECUTION, {"tool": "Read"})
+        self.tracker.flush()
+
+        line = self.tracker.activities_file.read_text().splitlines()[0]
+        self.assertNotIn(", ", line)
+        self.assertNotIn("project", line)
+        self.assertIsNone(ContributionTracker(config_dir=self.temp_dir).activities[0].project)
+
+    def test_log_writes_debounced(self):
+        """Test a burst of activities is written in one flush"""
+        with patch.object(contributions, "FLUSH_INTERVAL", 60):
+            for i in range(3):
+                self.tracker.log_activity(ActivityType.TOOL_EXECUTION, {"i": i})
+            self.assertFalse(self.tracker.activities_file.exists())
+
+            self.tracker.flush()
+            self.assertEqual(len(self.tracker.activities_file.read_text().splitlines()), 3)
+            self.assertEqual(self.tracker._pending, [])
+
+    def test_legacy_json_migrated(self):
+        """Test the old activities.json is converted to the NDJSON log"""
+        legacy = self.tracker.legacy_activities_file
+        legacy.write_text(json.dumps([{"type": "git_commit", "timestamp": "2025-01-01T10:00:00", "details": {}}]))
+
+        tracker = ContributionTracker(config_dir=self.temp_dir)
+        self.assertEqual(len(tracker.activities), 1)
+        self.assertFalse(legacy.exists())
+        self.assertEqual(len(ContributionTracker(config_dir=self.temp_dir).activities), 1)
+
+    def test_log_trimmed_past_cap(self):
+        """Test the log is rewritten down to the cap once it overflows"""
+        with patch.object(contributions, "MAX_ACTIVITIES", 3), patch.object(contributions, "_LOG_SLACK", 2), \
+                patch.object(contributions, "FLUSH_INTERVAL", 0):
+            for i in range(6):
+                self.tracker.log_activity(ActivityType.CHAT_MESSAGE, {"i": i})
+
+            with open(self.tracker.activities_file) as f:
+                lines = f.readlines()
+            self.assertEqual(len(lines), 3)
+            self.assertEqual([a.details["i"] for a in self.tracker.activities], [3, 4, 5])
+            self.assertEqual(sum(self.tracker._daily_counts.values()), 3)
+            self.assertEqual(self.tracker._timestamps, [a.timestamp for a in self.tracker.activities])
+            self.assertEqual(len(self.tracker._types), 3)
+
+    def test_stats_and_streak(self):
+        """Test period stats and the current streak"""
+        self._add(0)
+        self._add(1, ActivityType.GIT_COMMIT)
+        self._add(2)
+        self._add(4)
+
+        self.assertEqual(self.tracker.calculate_streak(), 3)
+        stats = self.tracker.get_stats("week")
+        self.assertEqual(stats.total_activities, 4)
+        self.assertEqual(stats.chat_messages, 3)
+        self.assertEqual(stats.git_commits, 1)
+
+    def test_streak_needs_activity_today(self):
+        """Test the streak is zero without activity today, whatever came before"""
+        for days_ago in range(1, 30):
+            self._add(days_ago)
+        self.assertEqual(self.tracker.calculate_streak(), 0)
+
+        self._add(0)
+        self.assertEqual(self.tracker.calculate_streak(), 30)
+
+    def test_stats_bisects_ordered_log(self):
+        """Test periods are sliced from time-ordered activities"""
+        for days_ago in (40, 20, 6, 3, 0):
+            self._add(days_ago)
+
+        self.assertTrue(self.tracker._in_order)
+        self.assertEqual(self.tracker.get_stats("week").total_activities, 3)
+        self.assertEqual(self.tracker.get_stats("month").total_activities, 4)
+
+        self._add(10)
+        self.assertFalse(self.tracker._in_order)
+        self.assertEqual(self.tracker.get_stats("month").total_activities, 5)
+
+    def test_stats_tokens_and_projects(self):
+        """Test chat tokens are summed and projects collected once"""
+        now = datetime.now().isoformat()
+        self.tracker._add_activity(Activity(type="chat_message", timestamp=now, details={"tokens": 40}, project="a"))
+        self.tracker._add_activity(Activity(type="chat_message", timestamp=now, details={"tokens": 2}, project="a"))
+        self.tracker._add_activity(Activity(type="tool_execution", timestamp=now, details={"tokens": 99}, project="b"))
+
+        stats = self.tracker.get_stats("day")
+        self.assertEqual(stats.total_tokens, 42)
+        self.assertEqual(sorted(stats.projects_worked_on), ["a", "b"])
+        self.assertEqual(stats.most_active_day, now[:10])
+
+    def test_type_labels(self):
+        """Test integer activity types are logged under their readable names"""
+        self.tracker.log_activity(ActivityType.AGENT_SWARM, {})
+        self.assertEqual(self.tracker.activities[0].type, "agent_swarm")
+        self.assertEqual(self.tracker._types, [ActivityType.AGENT_SWARM])
+        self.assertEqual(self.tracker.get_stats("day").agent_swarms, 1)
+
+    def test_contribution_graph_rows(self):
+        """Test each day lands on its weekday row with the right intensity"""
+        for _ in range(4):
+            self._add(0)
+
+        lines = self.tracker.generate_contribution_graph(days=30).splitlines()
+        rows = lines[2:9]
+        today_row = rows[datetime.now().weekday()]
+
+        self.assertTrue(all(len(row) == len(rows[0]) for row in rows))
+        self.assertTrue(today_row.rstrip().endswith("▪"))
+        self.assertEqual(sum(row.count("·") for row in rows), 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
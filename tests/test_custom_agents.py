@@ -0,0 +1,62 @@
+"""Tests for custom agent management"""
+
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from flaco.agents.custom_agents import CustomAgentManager
+from flaco.utils import fastjson
+
+
+class TestCustomAgentManager(unittest.TestCase):
+    """Test custom agent storage"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.manager = CustomAgentManager(storage_dir=self.temp_dir)
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_create_persists(self):
+        """Test created agents are saved and reloaded"""
+        agent = self.manager.create_agent("🦀", "Rust Expert", "Rust and systems programming")
+
+        reloaded = CustomAgentManager(storage_dir=self.temp_dir)
+        self.assertEqual(reloaded.get_agent(agent.id).name, "Rust Expert")
+        self.assertFalse((reloaded.agents_file.with_suffix(".tmp")).exists())
+
+    def test_lookup_by_id_and_name(self):
+        """Test agents are found by id or case-insensitive name, and indexes follow edits"""
+        agent = self.manager.create_agent("🦀", "Rust Expert", "Rust")
+        self.assertIs(self.manager.get_agent(agent.id), agent)
+        self.assertIs(self.manager.get_agent("rust expert"), agent)
+
+        self.manager.update_agent(agent.id, name="Crab")
+        self.assertIsNone(self.manager.get_agent("rust expert"))
+        self.assertEqual(self.manager.get_agent("CRAB").id, agent.id)
+        self.assertEqual(agent.to_dict()["name"], "Crab")
+
+        self.manager.delete_agent(agent.id)
+        self.assertIsNone(self.manager.get_agent(agent.id))
+        self.assertEqual(len(self.manager.get_all_agents()), 3)
+
+    def test_unchanged_file_not_reparsed(self):
+        """Test lookups don't re-read agents.json when it hasn't changed"""
+        with patch.object(fastjson, "loads", wraps=fastjson.loads) as loads:
+            for _ in range(5):
+                self.manager.get_all_agents()
+            loads.assert_not_called()
+
+    def test_sees_other_manager_changes(self):
+        """Test a selection saved by another manager is picked up"""
+        other = CustomAgentManager(storage_dir=self.temp_dir)
+        other.set_current_agent("default_devops")
+
+        self.assertEqual(self.manager.get_current_agent().id, "default_devops")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+"""Tests for JSON helpers"""
+
+import unittest
+from unittest.mock import patch
+from flaco.utils import fastjson
+
+
+class TestFastJson(unittest.TestCase):
+    """Test orjson/stdlib JSON helpers"""
+
+    def test_round_trip(self):
+        """Test dumps output parses back to the same object"""
+        data = {"status": "success", "output": "héllo\n", "metadata": {"n": [1, 2.5, None]}}
+        self.assertEqual(fastjson.loads(fastjson.dumps(data)), data)
+
+    def test_non_string_keys_fall_back(self):
+        """Test objects orjson rejects are serialized by the stdlib"""
+        self.assertEqual(fastjson.loads(fastjson.dumps({1: "a"})), {"1": "a"})
+
+    def test_without_orjson(self):
+        """Test the stdlib path is used when orjson is missing"""
+        with patch.object(fastjson, "orjson", None):
+            self.assertEqual(fastjson.dumps({"a": [1, 2]}), '{"a":[1,2]}')
+            self.assertEqual(fastjson.loads(b'{"a": 1}'), {"a": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""Tests for local conversation storage"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from flaco.storage import LocalStorageManager
+
+
+class TestLocalStorage(unittest.TestCase):
+    """Test JSONL conversation persistence"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.storage = LocalStorageManager(storage_dir=self.temp_dir)
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_append_and_load(self):
+        """Test appended messages load back in order"""
+        self.storage.append_message("s1", {"role": "user", "content": "hi\nthere"})
+        self.storage.append_messages("s1", [{"role": "assistant", "content": "hello"}])
+
+        messages = self.storage.load_conversation("s1")
+        self.assertEqual([m["content"] for m in messages], ["hi\nthere", "hello"])
+
+    def test_save_rewrites(self):
+        """Test save_conversation replaces the stored history"""
+        self.storage.append_messages("s1", [{"role": "user", "content": str(i)} for i in range(3)])
+        self.storage.save_conversation("s1", [{"role": "system", "content": "summary"}])
+
+        self.assertEqual(self.storage.load_conversation("s1"), [{"role": "system", "content": "summary"}])
+
+    def test_partial_line_skipped(self):
+        """Test a truncated trailing line doesn't lose the rest of the history"""
+        self.storage.append_message("s1", {"role": "user", "content": "hi"})
+        with open(Path(self.temp_dir) / "conversations" / "s1.jsonl", "ab") as f:
+            f.write(b'{"role": "assis')
+
+        self.assertEqual(self.storage.load_conversation("s1"), [{"role": "user", "content": "hi"}])
+
+    def test_append_after_partial_line(self):
+        """Test a message appended after a crash isn't merged into the partial line"""
+        self.storage.append_message("s1", {"role": "user", "content": "hi"})
+        with open(Path(self.temp_dir) / "conversations" / "s1.jsonl", "ab") as f:
+            f.write(b'{"role": "assis')
+        self.storage.append_message("s1", {"role": "user", "content": "again"})
+
+        self.assertEqual([m["content"] for m in self.storage.load_conversation("s1")], ["hi", "again"])
+
+    def test_legacy_json_migrated(self):
+        """Test sessions in the old JSON format still load and accept appends"""
+        legacy = Path(self.temp_dir) / "conversations" / "old.json"
+        legacy.write_text(json.dumps({"session_id": "old", "messages": [{"role": "user", "content": "a"}]}))
+
+        self.assertEqual(len(self.storage.load_conversation("old")), 1)
+        self.storage.append_message("old", {"role": "assistant", "content": "b"})
+
+        self.assertFalse(legacy.exists())
+        self.assertEqual([m["content"] for m in self.storage.load_conversation("old")], ["a", "b"])
+        self.assertEqual(self.storage.list_conversations()[0]["message_count"], 2)
+
+    def test_blobs_round_trip(self):
+        """Test blobs are appended, reloaded, and removed with the session"""
+        self.storage.append_blobs("s1", {"h1": "one"})
+        self.storage.append_blobs("s1", {"h2": "two"})
+        self.assertEqual(self.storage.load_blobs("s1"), {"h1": "one", "h2": "two"})
+        self.assertEqual(self.storage.list_conversations(), [])
+
+        self.storage.clear_conversation("s1")
+        self.assertEqual(self.storage.load_blobs("s1"), {})
+
+    def test_clear_and_missing(self):
+        """Test clearing a session and loading one that doesn't exist"""
+        self.storage.append_message("s1", {"role": "user", "content": "hi"})
+        self.storage.clear_conversation("s1")
+        self.assertEqual(self.storage.load_conversation("s1"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,7 @@
 """Tests for Ollama client"""
 
+import asyncio
+import json
 import unittest
 from unittest.mock import Mock, patch, MagicMock
 from flaco.llm.ollama_client import OllamaClient
@@ -91,6 +93,74 @@ class TestOllamaClient(unittest.TestCase):
         result = self.client.test_connection()
         self.assertFalse(result)
 
+    def test_chat_keeps_model_loaded(self):
+        """Test chat requests ask Ollama to keep the model resident"""
+        self.client.session.post = Mock()
+        self.client.session.post.return_value.json.return_value = {"message": {"content": "hi"}}
+
+        self.client.chat([{"role": "user", "content": "Hello"}])
+
+        payload = json.loads(self.client.session.post.call_args.kwargs["data"])
+        self.assertEqual(payload["keep_alive"], self.client.keep_alive)
+
+    def test_encode_chat_body_reuses_prefix(self):
+        """Test the encoded body matches the payload and caches the prefix"""
+        tools = [{"type": "function", "function": {"name": "Read"}}]
+        payload = {
+            "model": "test-model",
+            "messages": [{"role": "system", "content": "sys"}, {"role": "user", "content": "hi"}],
+            "stream": False,
+            "tools": tools
+        }
+
+        self.assertEqual(json.loads(self.client._encode_chat_body(payload)), payload)
+        system_bytes = self.client._system_bytes[1]
+
+        payload["messages"].append({"role": "assistant", "content": "hello"})
+        self.assertEqual(json.loads(self.client._encode_chat_body(payload)), payload)
+        self.assertIs(self.client._system_bytes[1], system_bytes)
+
+        payload["messages"][0] = {"role": "system", "content": "changed"}
+        self.assertEqual(json.loads(self.client._encode_chat_body(payload)), payload)
+
+    def test_connection_result_cached(self):
+        """Test repeated connection checks reuse the result for the same server"""
+        self.client.session.get = Mock(return_value=Mock(status_code=200))
+
+        self.assertTrue(self.client.test_connection())
+        self.assertTrue(self.client.test_connection())
+        self.assertEqual(self.client.session.get.call_count, 1)
+
+        self.client.base_url = "http://other:11434"
+        self.assertTrue(self.client.test_connection())
+        self.assertEqual(self.client.session.get.call_count, 2)
+
+    def test_connection_checked_in_background(self):
+        """Test test_connection picks up the result of a background check"""
+        self.client.session.get = Mock(return_value=Mock(status_code=500))
+
+        self.client.check_connection_async()
+        self.assertFalse(self.client.test_connection())
+        self.client.session.get.assert_called_once()
+
+
+
+class TestAsyncClientCleanup(unittest.TestCase):
+    """Test the async client's pooled session is released"""
+
+    def test_sessions_closed_on_exit(self):
+        """Test the exit hook closes open sessions and the shared loop"""
+        from flaco.llm import async_client
+        client = async_client.AsyncOllamaClient()
+        session = async_client.run_sync(client._get_session())
+
+        async_client._close_clients()
+
+        self.assertTrue(session.closed)
+        self.assertTrue(async_client._loop.is_closed())
+        # The next call starts a fresh loop
+        self.assertEqual(async_client.run_sync(asyncio.sleep(0, "ok")), "ok")
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,69 @@
+"""Tests for quick actions"""
+
+import unittest
+from unittest.mock import Mock
+from prompt_toolkit.document import Document
+from flaco.commands.quick_actions import QuickActionManager
+from flaco.utils.completers import FlacoCompleter
+
+
+class TestQuickActionManager(unittest.TestCase):
+    """Test quick action lookup"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.manager = QuickActionManager()
+
+    def test_get_action_ignores_case_and_spaces(self):
+        """Test names match regardless of case and spacing"""
+        self.assertEqual(self.manager.get_action("quickcommit").name, "Quick commit")
+        self.assertEqual(self.manager.get_action("QUICK COMMIT").name, "Quick commit")
+        self.assertIsNone(self.manager.get_action("deploy"))
+
+    def test_suggestions_by_prefix(self):
+        """Test suggestions are the actions starting with the typed text"""
+        self.manager.add_custom_action("Status page", "Open status page", ["open http://localhost"])
+        names = [a.name for a in self.manager.get_suggestions("stat")]
+        self.assertEqual(names, ["Status check", "Status page"])
+        self.assertEqual(self.manager.get_suggestions("zzz"), [])
+
+    def test_add_and_remove(self):
+        """Test custom actions can be looked up and removed"""
+        self.manager.add_custom_action("Lint", "Run linters", ["ruff check ."])
+        self.assertIsNotNone(self.manager.get_action("lint"))
+
+        self.assertTrue(self.manager.remove_action("Lint"))
+        self.assertIsNone(self.manager.get_action("lint"))
+        self.assertFalse(self.manager.remove_action("Lint"))
+
+    def test_actions_are_hashable(self):
+        """Test custom actions can be used as set members"""
+        self.manager.add_custom_action("Lint", "Run linters", ["ruff check ."])
+        actions = set(self.manager.list_actions())
+        self.assertIn(self.manager.get_action("lint"), actions)
+
+    def test_managers_do_not_share_custom_actions(self):
+        """Test default actions are shared but each manager's list is its own"""
+        other = QuickActionManager()
+        self.manager.add_custom_action("Lint", "Run linters", ["ruff check ."])
+
+        self.assertIsNone(other.get_action("lint"))
+        self.assertIs(other.get_action("quickcommit"), self.manager.get_action("quickcommit"))
+        with self.assertRaises(AttributeError):
+            other.get_action("quickcommit").name = "Changed"
+
+
+class TestQuickActionCompletion(unittest.TestCase):
+    """Test '#' completions in the prompt"""
+
+    def test_hash_completions(self):
+        """Test typed '#' text completes to matching action names"""
+        completer = FlacoCompleter(Mock(commands={}), QuickActionManager())
+        completions = list(completer.get_completions(Document("#quick c"), None))
+
+        self.assertEqual([c.text for c in completions], ["Quick commit"])
+        self.assertEqual(completions[0].start_position, -len("quick c"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,451 @@
+"""Tests for slash command handling"""
+
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+from rich.console import Console
+from flaco.permissions import PermissionMode
+from flaco.analytics.contributions import ActivityStats
+from flaco.intelligence.project_scanner import ProjectInsight, ProjectType
+from flaco.tools.file_tools import ReadTool
+from flaco.commands.slash_commands import (
+    SlashCommandHandler, _COLOR_CHOICES, _COLOR_MAP, _COLOR_OPTIONS,
+    _batch_by_tokens, _build_help_table, _count_lines, _find_python_files
+)
+
+
+class TestSlashCommandHandler(unittest.TestCase):
+    """Test the slash command handler"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.handler = SlashCommandHandler(Mock())
+        self.output = io.StringIO()
+        self.handler.console = Console(file=self.output, width=120)
+
+    def test_dispatch_builtin(self):
+        """Test built-in commands resolve through the class table"""
+        self.handler.handle_command("/MODEL llama3")
+        self.assertEqual(self.handler.agent.llm.model, "llama3")
+        for method_name in SlashCommandHandler.COMMANDS.values():
+            self.assertTrue(callable(getattr(self.handler, method_name)))
+
+    def test_command_parsing(self):
+        """Test command names and arguments are split like str.split"""
+        self.handler.handle_command("/model  llama3:8b ")
+        self.assertEqual(self.handler.agent.llm.model, "llama3:8b")
+        self.handler.handle_command("/Model\tmistral")
+        self.assertEqual(self.handler.agent.llm.model, "mistral")
+
+        self.handler.handle_command("/")
+        self.assertIn("Unknown command: /", self.output.getvalue())
+
+    def test_help_table_built_once(self):
+        """Test /help reuses the same table and lists the commands"""
+        self.handler.handle_command("/help")
+        self.handler.handle_command("/help")
+        self.assertEqual(_build_help_table.cache_info().currsize, 1)
+        self.assertIn("/setup", self.output.getvalue())
+
+    def test_load_template_cached_by_mtime(self):
+        """Test templates are re-read only when the file changes"""
+        with tempfile.TemporaryDirectory() as tmp:
+            docs = Path(tmp) / "docs"
+            docs.mkdir()
+            template = docs / "T.template"
+            template.write_text("v1")
+            with patch("flaco.commands.slash_commands._REPO_ROOT", Path(tmp)):
+                self.assertEqual(self.handler._load_template("T.template", "default"), "v1")
+                os.utime(template, ns=(0, 0))
+                template.write_text("v2")
+                os.utime(template, ns=(1, 1))
+                self.assertEqual(self.handler._load_template("T.template", "default"), "v2")
+                self.assertEqual(self.handler._load_template("missing", "default"), "default")
+
+    def test_todos_read_from_working_dir(self):
+        """Test /todos reads the todo file from the working directory"""
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                self.handler.handle_command("/todos")
+                self.assertIn("No active todo list", self.output.getvalue())
+
+                Path(tmp, ".flaco_todos.json").write_text('[{"status": "pending", "content": "Ship it"}]')
+                self.handler.handle_command("/todos")
+            finally:
+                os.chdir(cwd)
+        self.assertIn("Ship it", self.output.getvalue())
+        self.assertIsNone(self.handler._cwd)
+
+    def test_history_prints_messages_verbatim(self):
+        """Test /history headers and that message text isn't parsed as markup"""
+        messages = [{"role": "user", "content": "[red]x[/red]"}, {"role": "tool", "content": "y" * 600}]
+        self.handler.agent.messages = messages
+        self.handler.agent.message_content.side_effect = lambda m: m["content"]
+
+        self.handler.handle_command("/history")
+
+        output = self.output.getvalue()
+        self.assertIn("User (#1):", output)
+        self.assertIn("[red]x[/red]", output)
+        self.assertIn("Tool Result (#2):", output)
+        self.assertIn("y" * 100 + "...", output.replace("\n", ""))
+
+    def test_models_switch_by_name(self):
+        """Test /models switches by exact model name"""
+        self.handler.agent.llm.list_models.return_value = [{"name": "a:7b"}, {"name": "b:13b"}]
+
+        self.handler.handle_command("/models b:13b")
+        self.assertEqual(self.handler.agent.llm.model, "b:13b")
+
+        self.handler.handle_command("/models c")
+        self.assertIn("Model not found: c", self.output.getvalue())
+        self.assertEqual(self.handler.agent.llm.model, "b:13b")
+
+    def test_models_listing_cached(self):
+        """Test back-to-back /models calls reuse the listing for the same server"""
+        llm = self.handler.agent.llm
+        llm.base_url = "http://localhost:11434"
+        llm.list_models.return_value = [{"name": "a:7b"}, {"name": "b:13b"}]
+
+        self.handler.handle_command("/models")
+        self.handler.handle_command("/models 2")
+        self.assertEqual(llm.model, "b:13b")
+        self.assertEqual(llm.list_models.call_count, 1)
+
+        llm.base_url = "http://other:11434"
+        self.handler.handle_command("/models")
+        self.assertEqual(llm.list_models.call_count, 2)
+
+        with patch("flaco.commands.slash_commands.MODELS_CACHE_TTL", 0):
+            self.handler.handle_command("/models")
+        self.assertEqual(llm.list_models.call_count, 3)
+
+    def test_usage_bar(self):
+        """Test usage bars fill in twentieths and clamp out-of-range values"""
+        self.assertEqual(self.handler._build_usage_bar(0), "░" * 20)
+        self.assertEqual(self.handler._build_usage_bar(35), "█" * 7 + "░" * 13)
+        self.assertEqual(self.handler._build_usage_bar(150), "█" * 20)
+        self.assertEqual(self.handler._build_usage_bar(-5), "░" * 20)
+
+    def test_permissions(self):
+        """Test /permissions maps names to modes and rejects unknown ones"""
+        self.handler.handle_command("/permissions AUTO")
+        self.handler.agent.set_permission_mode.assert_called_once_with(PermissionMode.AUTO_APPROVE)
+
+        self.handler.handle_command("/permissions root")
+        self.assertIn("Invalid mode: root", self.output.getvalue())
+        self.assertEqual(self.handler.agent.set_permission_mode.call_count, 1)
+
+    def test_subcommand_dispatch(self):
+        """Test /project and /git match whole action words"""
+        with patch("flaco.projects.ProjectManager") as manager:
+            self.handler.handle_command("/project createsomething")
+            manager.return_value.create_project.assert_not_called()
+            self.assertIn("Available actions: list, create", self.output.getvalue())
+
+            self.handler.handle_command("/project CREATE api")
+            manager.return_value.create_project.assert_called_once()
+            self.assertEqual(manager.return_value.create_project.call_args.args[0], "api")
+
+        with patch("flaco.projects.GitAutoVersioning") as git:
+            git.return_value.auto_commit.return_value = (True, "Committed")
+            self.handler.handle_command("/git commit")
+            git.return_value.auto_commit.assert_called_once_with(None)
+
+    def test_long_cells_truncated_by_table(self):
+        """Test long project paths and commit messages end in an ellipsis"""
+        with patch("flaco.projects.ProjectManager") as manager:
+            project = Mock(path="/home/user/" + "nested/" * 10 + "app", project_type="python", last_accessed=None)
+            project.name = "app"
+            manager.return_value.list_projects.return_value = [project]
+            self.handler.handle_command("/project list")
+
+        with patch("flaco.projects.GitAutoVersioning") as git:
+            commit = Mock(hash="abc123", message="Refactor " + "everything " * 10, author="dev", date="today")
+            git.return_value.get_commit_history.return_value = [commit]
+            self.handler.handle_command("/git history")
+
+        lines = self.output.getvalue().splitlines()
+        path_row = next(line for line in lines if "/home/user/" in line)
+        self.assertIn("…", path_row)
+        self.assertLessEqual(len(path_row.split("│")[3].strip()), 43)
+        message_row = next(line for line in lines if "abc123" in line)
+        self.assertIn("Refactor everything", message_row)
+        self.assertIn("…", message_row)
+
+    def test_invalid_period(self):
+        """Test /stats and /recap reject unknown periods"""
+        with patch("flaco.analytics.ContributionTracker") as tracker:
+            for command in ("/stats decade", "/recap decade"):
+                self.handler.handle_command(command)
+        tracker.return_value.get_stats.assert_not_called()
+        self.assertEqual(self.output.getvalue().count("Invalid period"), 2)
+
+    def _review(self, tmp, selections, continues=()):
+        """Run /review on a directory with scripted prompt answers"""
+        self.handler.agent.tools = {"Read": Mock(wraps=ReadTool())}
+        self.handler.agent.chat.return_value = ("Looks good", {"total_time": 1.5, "total_tokens": 100})
+        self.handler.agent.max_context_tokens = 8192
+        with patch("rich.prompt.Prompt.ask", side_effect=selections), \
+                patch("rich.prompt.Confirm.ask", side_effect=continues), \
+                patch("flaco.tools.file_tools.SecurityValidator.validate_file_path", return_value=(True, None)):
+            self.handler.handle_command(f"/review {tmp}")
+        return self.handler.agent.tools["Read"]
+
+    def test_review_reads_each_file_once(self):
+        """Test /review reuses reads across the listing, review and later rounds"""
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("a.py", "b.py", "c.py"):
+                Path(tmp, name).write_text("x = 1\ny = 2\n")
+            read = self._review(tmp, ["1", "1-2"], [True])
+
+        self.assertEqual(read.execute.call_count, 3)
+        self.assertIn("Selected 1 file(s) (2 lines total)", self.output.getvalue())
+        prompt = self.handler.agent.chat.call_args.args[0]
+        self.assertEqual(prompt.count("### File: "), 2)
+        self.assertTrue(prompt.endswith("y = 2\n\n```\n"))
+        self.assertEqual(self.handler.agent.chat.call_count, 2)
+        self.assertIn("All files reviewed", self.output.getvalue())
+        self.assertEqual(self.output.getvalue().count("Selection format:"), 1)
+        self.assertEqual(self.handler._read_cache, {})
+
+    def test_review_interrupt_clears_reads(self):
+        """Test file reads aren't kept when a review is interrupted"""
+        with tempfile.TemporaryDirectory() as tmp:
+            Path(tmp, "a.py").write_text("pass\n")
+            self.handler.agent.chat.side_effect = KeyboardInterrupt
+            with self.assertRaises(KeyboardInterrupt):
+                self._review(tmp, ["1"])
+
+        self.assertEqual(self.handler._read_cache, {})
+
+    def test_review_stops_with_files_remaining(self):
+        """Test /review reports remaining and reviewed counts when the user stops"""
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("a.py", "b.py", "c.py"):
+                Path(tmp, name).write_text("pass\n")
+            self._review(tmp, ["1-2"], [False])
+
+        output = self.output.getvalue()
+        self.assertIn("1 file(s) remaining", output)
+        self.assertIn("Reviewed 2 file(s)", output)
+
+    def test_review_estimates_large_files(self):
+        """Test /review estimates line counts of large files from their size"""
+        with tempfile.TemporaryDirectory() as tmp:
+            Path(tmp, "small.py").write_text("x = 1\n" * 10)
+            Path(tmp, "big.py").write_text("x = 1\n" * 100)
+            with patch("flaco.commands.slash_commands.EXACT_LINE_COUNT_LIMIT", 100), \
+                    patch("flaco.commands.slash_commands._count_lines", wraps=_count_lines) as count:
+                self._review(tmp, ["all"])
+
+        count.assert_called_once_with(os.path.join(tmp, "small.py"))
+        output = self.output.getvalue()
+        self.assertIn("~15", output)
+        self.assertIn("(~25 lines total)", output)
+
+    def test_review_batches_by_context_window(self):
+        """Test /review splits large selections into requests that fit the context window"""
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("a.py", "b.py", "c.py"):
+                Path(tmp, name).write_text("x = 1\n" * 50)
+            with patch("flaco.commands.slash_commands.REVIEW_PROMPT_SHARE", 0.02):
+                self._review(tmp, ["all"])
+
+        prompts = [call.args[0] for call in self.handler.agent.chat.call_args_list]
+        self.assertEqual(len(prompts), 3)
+        self.assertTrue(all(prompt.count("### File: ") == 1 for prompt in prompts))
+        self.assertIn("Please analyze these 1 files", prompts[0])
+        output = self.output.getvalue()
+        self.assertIn("Code Review Results (part 3/3)", output)
+        self.assertIn("Review completed in 4.50s | Tokens: 300 | Files analyzed: 3", output)
+
+    def test_batch_by_tokens(self):
+        """Test sections are grouped in order within the token budget"""
+        sections = ["a" * 10, "b" * 10, "c" * 100, "d"]
+        with patch("flaco.context.window.count_tokens", len):
+            self.assertEqual(_batch_by_tokens(sections, 20), [sections[:2], sections[2:3], sections[3:]])
+            self.assertEqual(_batch_by_tokens(sections, 0), [sections])
+            self.assertEqual(_batch_by_tokens([], 20), [])
+
+    def test_review_without_python_files(self):
+        """Test /review stops when the directory has no Python files"""
+        with tempfile.TemporaryDirectory() as tmp:
+            Path(tmp, "notes.txt").write_text("nothing to review")
+            read = self._review(tmp, [])
+
+        read.execute.assert_not_called()
+        self.assertIn("No Python files found", self.output.getvalue())
+
+    def test_parse_file_selection(self):
+        """Test /review selections accept numbers, ranges and all within bounds"""
+        parse = self.handler._parse_file_selection
+        self.assertEqual(parse("all", 3), [1, 2, 3])
+        self.assertEqual(parse(" 1-10 ", 4), [1, 2, 3, 4])
+        self.assertEqual(parse("1,3, 5 - 6", 10), [1, 3, 5, 6])
+        self.assertEqual(parse("5-6,1,2-5", 10), [1, 2, 3, 4, 5, 6])
+        self.assertEqual(parse("0-2,9,x,1-,-3,4-3", 5), [1, 2])
+        self.assertEqual(parse("", 5), [])
+
+    def test_find_python_files(self):
+        """Test the /review walk skips hidden and cache directories and lists newest first"""
+        with tempfile.TemporaryDirectory() as tmp:
+            for index, name in enumerate(("old.py", "pkg/new.py", "pkg/notes.txt", ".venv/x.py",
+                                          "pkg/__pycache__/y.py", "node_modules/z.py", ".hidden.py")):
+                path = Path(tmp, name)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text("pass\n")
+                os.utime(path, (index, index))
+
+            found = _find_python_files(tmp)
+
+        self.assertEqual(found, [(os.path.join(tmp, "pkg", "new.py"), 5), (os.path.join(tmp, "old.py"), 5)])
+
+    def test_count_lines(self):
+        """Test line counts match splitlines without reading through the Read tool"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "f.py")
+            for content in (b"", b"a", b"a\n", b"a\nb", b"a\n\nb\n", b"x\n" * 100000):
+                path.write_bytes(content)
+                self.assertEqual(_count_lines(str(path)), len(content.splitlines()))
+
+    def test_stats_report(self):
+        """Test /stats renders the counters in one panel"""
+        stats = ActivityStats(
+            period="day", start_date="", end_date="", total_activities=1234, chat_messages=7,
+            files_created=0, files_modified=0, git_commits=0, tool_executions=0, agent_swarms=0,
+            streak_days=3, projects_worked_on=["flaco"]
+        )
+        with patch("flaco.analytics.ContributionTracker") as tracker:
+            tracker.return_value.get_stats.return_value = stats
+            self.handler.handle_command("/stats day")
+
+        output = self.output.getvalue()
+        self.assertIn("Today's Statistics", output)
+        self.assertIn("1,234", output)
+        self.assertIn("3 days!", output)
+        self.assertIn("flaco", output)
+        self.assertNotIn("Tokens Used", output)
+        self.assertNotIn("**", output)
+
+    def test_scan_report(self):
+        """Test /scan renders markup-free facts and the suggestions"""
+        insight = ProjectInsight(
+            project_type=ProjectType.PYTHON, framework=None, languages=["Python"],
+            dependencies={"rich": "13"}, entry_points=[], config_files=[], test_framework=None,
+            has_ci=False, has_docker=False, has_tests=True, file_count=12, total_lines=3456,
+            suggestions=["Add CI"], health_score=85.0
+        )
+        with patch("flaco.intelligence.ProjectScanner") as scanner:
+            scanner.return_value.scan.return_value = insight
+            self.handler.handle_command("/scan")
+
+        output = self.output.getvalue()
+        self.assertIn("PYTHON", output)
+        self.assertIn("85/100", output)
+        self.assertIn("3,456 lines of code", output)
+        self.assertIn("Not configured", output)
+        self.assertIn("Add CI", output)
+        self.assertNotIn("[green]", output)
+
+    def test_clear_without_subprocess(self):
+        """Test /clear resets the chat and clears through the console"""
+        self.handler.console = Mock()
+        with patch("os.system") as system:
+            self.handler.handle_command("/clear")
+        system.assert_not_called()
+        self.handler.console.clear.assert_called_once_with()
+        self.handler.agent.reset_conversation.assert_called_once_with()
+
+    def _run_update(self, script):
+        """Run /run-update with pipx replaced by a Python script"""
+        popen = subprocess.Popen
+        with patch("flaco.utils.update_checker.UpdateChecker.check_for_updates", return_value=(True, "9.9.9", "")), \
+                patch("rich.prompt.Confirm.ask", return_value=True), \
+                patch("subprocess.Popen", side_effect=lambda command, **kwargs: popen(
+                    [sys.executable, "-c", script], **kwargs)):
+            self.handler.handle_command("/run-update")
+        return self.output.getvalue()
+
+    def test_run_update_streams_output(self):
+        """Test pipx output is printed verbatim and success reported"""
+        output = self._run_update("print('upgraded [flaco-ai]')")
+        self.assertIn("upgraded [flaco-ai]", output)
+        self.assertIn("Successfully updated to v9.9.9", output)
+
+    def test_run_update_timeout(self):
+        """Test a hung pipx is killed after UPDATE_TIMEOUT"""
+        with patch("flaco.commands.slash_commands.UPDATE_TIMEOUT", 0.2):
+            output = self._run_update("import time; print('working', flush=True); time.sleep(30)")
+        self.assertIn("working", output)
+        self.assertIn("Update timed out", output)
+
+    def test_unknown_command(self):
+        """Test unknown commands point to /help"""
+        self.handler.handle_command("/nope")
+        self.assertIn("Unknown command: /nope", self.output.getvalue())
+
+    def test_custom_commands(self):
+        """Test .flaco/commands/*.md become commands next to the built-ins"""
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            commands_dir = Path(tmp) / ".flaco" / "commands"
+            commands_dir.mkdir(parents=True)
+            (commands_dir / "deploy.md").write_text("Deploy {args}")
+            os.chdir(tmp)
+            try:
+                handler = SlashCommandHandler(Mock())
+            finally:
+                os.chdir(cwd)
+            handler.console = Console(file=io.StringIO())
+            handler.agent.chat.return_value = ("done", {})
+
+            self.assertIn("deploy", handler.commands)
+            self.assertIn("help", handler.commands)
+            self.assertNotIn("deploy", SlashCommandHandler.COMMANDS)
+
+            handler.handle_command("/deploy staging")
+            handler.agent.chat.assert_called_once_with("Deploy staging")
+
+            # Edits are picked up without restarting
+            (commands_dir / "deploy.md").write_text("Ship it")
+            os.utime(commands_dir / "deploy.md", ns=(1, 1))
+            handler.handle_command("/deploy prod")
+            handler.agent.chat.assert_called_with("Ship it\n\nprod")
+
+    def test_managers_created_lazily(self):
+        """Test managers are only built when a command needs them"""
+        self.assertNotIn("agent_manager", vars(self.handler))
+        self.assertNotIn("quick_actions", vars(self.handler))
+
+        actions = self.handler.quick_actions
+        self.assertIs(self.handler.quick_actions, actions)
+        self.assertIsNotNone(actions.get_action("quickcommit"))
+
+    def test_console_shared(self):
+        """Test handlers write to the process-wide console"""
+        from flaco.ui import CONSOLE
+        self.assertIs(SlashCommandHandler(Mock()).console, CONSOLE)
+        self.assertIs(SlashCommandHandler(Mock()).console, CONSOLE)
+
+    def test_color_choices(self):
+        """Test /setup colors can be picked by name or by their menu number"""
+        self.assertEqual(_COLOR_MAP["1"], "cyan")
+        self.assertEqual(_COLOR_MAP[str(len(_COLOR_OPTIONS))], _COLOR_OPTIONS[-1][0])
+        self.assertEqual(set(_COLOR_CHOICES), {c for c, _ in _COLOR_OPTIONS} | set(_COLOR_MAP))
+
+    def test_theme_color_fallback(self):
+        """Test an unreadable config falls back to cyan"""
+        with patch("flaco.config.user_config.UserConfig", side_effect=OSError):
+            self.assertEqual(self.handler.theme_color, "cyan")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""Tests for the update checker"""
+
+import json
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from flaco.utils.update_checker import UpdateChecker
+
+
+class TestCachedUpdate(unittest.TestCase):
+    """Test startup update status from the cache"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_file = Path(self.temp_dir) / "update_check.json"
+        patch.object(UpdateChecker, "CACHE_FILE", self.cache_file).start()
+        self.refresh = patch.object(UpdateChecker, "_refresh_in_background").start()
+        self.addCleanup(patch.stopall)
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir)
+
+    def _write_cache(self, age: float, latest: str):
+        """Write a cache entry checked age seconds ago"""
+        self.cache_file.write_text(json.dumps({
+            "timestamp": time.time() - age, "has_update": True,
+            "latest_version": latest, "summary": "Faster startup"
+        }))
+
+    def test_fresh_cache_no_refresh(self):
+        """Test a fresh cache is used without a background check"""
+        self._write_cache(60, "1.2.0")
+        self.assertEqual(UpdateChecker.get_cached_update("1.0.0"), (True, "1.2.0", "Faster startup"))
+        self.refresh.assert_not_called()
+
+    def test_stale_cache_refreshes(self):
+        """Test a stale cache is still shown while a refresh is started"""
+        self._write_cache(UpdateChecker.CACHE_DURATION + 1, "1.2.0")
+        self.assertEqual(UpdateChecker.get_cached_update("1.0.0")[1], "1.2.0")
+        self.refresh.assert_called_once_with("1.0.0")
+
+    def test_compared_to_running_version(self):
+        """Test an update already installed is not reported"""
+        self._write_cache(60, "1.2.0")
+        self.assertFalse(UpdateChecker.get_cached_update("1.2.0")[0])
+
+    def test_offline_without_cache(self):
+        """Test no cache and no refresh reports nothing"""
+        self.assertEqual(UpdateChecker.get_cached_update("1.0.0", refresh=False), (False, None, None))
+        self.refresh.assert_not_called()
+
+
+class TestForcedCheck(unittest.TestCase):
+    """Test /check-update and /run-update checks"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_file = Path(self.temp_dir) / "update_check.json"
+        patch.object(UpdateChecker, "CACHE_FILE", self.cache_file).start()
+        patch.object(UpdateChecker, "_last_check", None).start()
+        self.get = patch("requests.get").start()
+        self.get.return_value.json.return_value = {"tag_name": "v1.2.0", "body": "Faster startup\nMore"}
+        self.addCleanup(patch.stopall)
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_force_skips_cache_file(self):
+        """Test a forced check fetches even with a fresh cache file, and keeps the file"""
+        self.cache_file.write_text(json.dumps({"timestamp": time.time(), "latest_version": "1.1.0"}))
+
+        self.assertEqual(UpdateChecker.check_for_updates("1.0.0", force=True), (True, "1.2.0", "Faster startup"))
+        self.get.assert_called_once()
+        self.assertEqual(json.loads(self.cache_file.read_text())["latest_version"], "1.2.0")
+
+    def test_force_reuses_recent_fetch(self):
+        """Test back-to-back forced checks make one request"""
+        UpdateChecker.check_for_updates("1.0.0", force=True)
+        UpdateChecker.check_for_updates("1.0.0", force=True)
+        self.assertEqual(self.get.call_count, 1)
+
+        with patch.object(UpdateChecker, "FORCE_CHECK_DURATION", 0):
+            UpdateChecker.check_for_updates("1.0.0", force=True)
+        self.assertEqual(self.get.call_count, 2)
+
+    def test_failed_fetch_not_reused(self):
+        """Test a failed check is retried on the next forced check"""
+        self.get.side_effect = OSError
+        self.assertEqual(UpdateChecker.check_for_updates("1.0.0", force=True), (False, None, None))
+        UpdateChecker.check_for_updates("1.0.0", force=True)
+        self.assertEqual(self.get.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()